@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from enum import Enum
 from pydantic import Field, field_validator
-from typing import Optional
+from typing import Dict, List, Optional
 import os
 
 
@@ -35,7 +35,58 @@ class AppSettings(BaseSettings):
 
     #concurrency and performance
     max_sessions: int = Field(default=20, env="MAX_SESSIONS")
-    session_timeout_seconds: int = 300
+    # Idle sessions are expired and their resources (buffers, transcript
+    # writer, LLM KV cache) released by the lifespan reaper every interval.
+    session_timeout_seconds: int = Field(default=300, env="SESSION_TIMEOUT_SECONDS")
+    session_reap_interval_seconds: float = Field(default=30.0, env="SESSION_REAP_INTERVAL_SECONDS")
+
+    # Session state store. Live sessions stay in the worker; their state and
+    # conversation history are persisted so another worker (or this one after
+    # a restart) can resume them.
+    # OPTIONS: memory (process-local, lost on restart) | redis
+    session_store: str = Field(default="memory", env="SESSION_STORE")
+    redis_url: str = Field(default="redis://localhost:6379", env="REDIS_URL")
+    # WHY: per-frame state changes are buffered and written in one pipelined
+    # round-trip per interval instead of one round-trip per frame
+    session_store_flush_interval_ms: float = Field(default=100.0, env="SESSION_STORE_FLUSH_INTERVAL_MS")
+    # Local read-through cache of session records; entries are revalidated
+    # with a one-field version read instead of reloading the whole record
+    session_cache_size: int = Field(default=1024, env="SESSION_CACHE_SIZE")
+    session_history_max_messages: int = Field(default=200, env="SESSION_HISTORY_MAX_MESSAGES")
+    session_store_ttl_seconds: int = Field(default=86400, env="SESSION_STORE_TTL_SECONDS")
+
+    # Admission control: new sessions are admitted by live load, not only by
+    # MAX_SESSIONS. Each signal is divided by its target; the largest ratio is
+    # the worker's pressure.
+    admission_enabled: bool = Field(default=True, env="ADMISSION_ENABLED")
+    admission_sample_interval_ms: float = Field(default=1000.0, env="ADMISSION_SAMPLE_INTERVAL_MS")
+    admission_asr_queue_ms_target: float = Field(default=300.0, env="ADMISSION_ASR_QUEUE_MS_TARGET")
+    # WHY: 20 ms is one audio frame; lag beyond it delays VAD for every session
+    admission_loop_lag_ms_target: float = Field(default=20.0, env="ADMISSION_LOOP_LAG_MS_TARGET")
+    admission_llm_in_flight_target: float = Field(default=2.0, env="ADMISSION_LLM_IN_FLIGHT_TARGET")
+    admission_cpu_load_target: float = Field(default=0.9, env="ADMISSION_CPU_LOAD_TARGET")
+    admission_gpu_util_target: float = Field(default=0.9, env="ADMISSION_GPU_UTIL_TARGET")
+    # WHY: degrade (greedy ASR/LLM decoding) before refusing anyone; refuse
+    # new sessions only once degrading did not bring pressure down
+    admission_degrade_at: float = Field(default=0.7, env="ADMISSION_DEGRADE_AT")
+    admission_shed_at: float = Field(default=1.0, env="ADMISSION_SHED_AT")
+    admission_retry_after_seconds: float = Field(default=5.0, env="ADMISSION_RETRY_AFTER_SECONDS")
+    # URL clients should use to reach this worker; published with its load so
+    # a shedding worker can point new sessions at the least-loaded peer
+    admission_advertise_url: Optional[str] = Field(default=None, env="ADMISSION_ADVERTISE_URL")
+    # WHY: sessions are spread over shards with their own lock, so creating or
+    # closing one session never waits behind another shard; reads take no lock
+    session_shards: int = Field(default=16, env="SESSION_SHARDS")
+
+    # Voice session stages: bounded queues between VAD, segmentation, ASR,
+    # LLM and output. A full queue stalls the stage before it (backpressure).
+    session_vad_queue_size: int = Field(default=50, env="SESSION_VAD_QUEUE_SIZE")
+    # WHY: 50 x 20ms frames = 1s of audio between VAD and segmentation
+    session_utterance_queue_size: int = Field(default=4, env="SESSION_UTTERANCE_QUEUE_SIZE")
+    session_transcript_queue_size: int = Field(default=4, env="SESSION_TRANSCRIPT_QUEUE_SIZE")
+    # WHY: a caller who keeps talking while ASR/LLM lag should stall ingress
+    # (which drops oldest) rather than queue minutes of stale turns
+    session_output_queue_size: int = Field(default=32, env="SESSION_OUTPUT_QUEUE_SIZE")
     model_config = SettingsConfigDict(
         env_file=".env",
         env_prefix="SALETECH_",
@@ -43,6 +94,67 @@ class AppSettings(BaseSettings):
     
     )
 
+    # Startup model preloading (loaded concurrently by the model registry)
+    preload_vad_model: bool = Field(default=True, env="PRELOAD_VAD_MODEL")
+    preload_asr_model: bool = Field(default=True, env="PRELOAD_ASR_MODEL")
+    preload_llm_model: bool = Field(default=False, env="PRELOAD_LLM_MODEL")
+
+    # Pre-fork serving (scripts/serve_prefork.py): weights load once in the
+    # parent and forked workers share them copy-on-write. CPU devices only.
+    prefork_workers: int = Field(default=2, env="PREFORK_WORKERS")
+    prefork_memory_report_delay_seconds: float = Field(default=30.0, env="PREFORK_MEMORY_REPORT_DELAY_SECONDS")
+
+    # Observability: /metrics exposes per-worker collectors. The loop monitor
+    # pings the event loop every interval and records how late it answered.
+    loop_monitor_interval_ms: float = Field(default=100.0, env="LOOP_MONITOR_INTERVAL_MS")
+    # WHY: 20 ms is one audio frame; a longer stall delays every session on
+    # the worker, so it is logged with sampled stacks of the blocking call
+    loop_stall_threshold_ms: float = Field(default=20.0, env="LOOP_STALL_THRESHOLD_MS")
+    loop_stall_sample_interval_ms: float = Field(default=2.0, env="LOOP_STALL_SAMPLE_INTERVAL_MS")
+
+    # Logging: "queue" renders and writes on a background thread in batches;
+    # "sync" renders and writes inline on the calling thread.
+    log_mode: str = Field(default="queue", env="LOG_MODE")
+    log_queue_size: int = Field(default=10000, env="LOG_QUEUE_SIZE")
+    log_batch_size: int = Field(default=256, env="LOG_BATCH_SIZE")
+    log_flush_interval_ms: float = Field(default=50.0, env="LOG_FLUSH_INTERVAL_MS")
+    # WHY: callsite lookup walks the stack on every call; per-frame and
+    # per-utterance loggers skip it (the logger name already locates them)
+    log_hot_loggers: List[str] = Field(
+        default=["saletech.audio", "saletech.vad", "saletech.asr", "saletech.transcriber", "saletech.llm"],
+        env="LOG_HOT_LOGGERS",
+    )
+    # Keep 1 in N of these per-frame events (JSON, e.g. {"event": 100}).
+    log_sample_rates: Dict[str, int] = Field(
+        default={
+            "Queue full, dropped oldest frame.": 100,
+            "Buffer closed, rejecting frame.": 100,
+            "empty_audio_frame_ignored": 100,
+        },
+        env="LOG_SAMPLE_RATES",
+    )
+
+    # Transcripts: records are written by a background I/O thread and
+    # group-committed per session file every N records or M ms.
+    transcript_flush_records: int = Field(default=32, env="TRANSCRIPT_FLUSH_RECORDS")
+    transcript_flush_interval_ms: float = Field(default=200.0, env="TRANSCRIPT_FLUSH_INTERVAL_MS")
+    transcript_fsync: str = Field(default="none", env="TRANSCRIPT_FSYNC")
+    # OPTIONS: none (OS page cache) | commit (fsync every group commit) | close
+    transcript_max_pending: int = Field(default=1000, env="TRANSCRIPT_MAX_PENDING")
+    # WHY: bounds per-session memory when the disk stalls; write() waits instead
+    transcript_layout: str = Field(default="segments", env="TRANSCRIPT_LAYOUT")
+    # OPTIONS: segments (all sessions in rolling indexed segment files) | files (one file per session)
+    transcript_segment_max_bytes: int = Field(default=64 * 1024 * 1024, env="TRANSCRIPT_SEGMENT_MAX_BYTES")
+    transcript_segment_max_age_seconds: float = Field(default=3600.0, env="TRANSCRIPT_SEGMENT_MAX_AGE_SECONDS")
+    # WHY: segments sealed by other workers become readable after at most this
+    # long; lookups of unknown sessions never rescan the directory more often
+    transcript_index_refresh_seconds: float = Field(default=5.0, env="TRANSCRIPT_INDEX_REFRESH_SECONDS")
+    # Live Parquet sink (needs pyarrow); batch export: scripts/export_transcripts.py
+    transcript_columnar_sink: bool = Field(default=False, env="TRANSCRIPT_COLUMNAR_SINK")
+    transcript_columnar_dir: str = Field(default="transcripts_columnar", env="TRANSCRIPT_COLUMNAR_DIR")
+    transcript_columnar_flush_rows: int = Field(default=10000, env="TRANSCRIPT_COLUMNAR_FLUSH_ROWS")
+    transcript_columnar_flush_interval_seconds: float = Field(default=300.0, env="TRANSCRIPT_COLUMNAR_FLUSH_INTERVAL_SECONDS")
+
     #GPU Configuration
     cuda_visible_device: str= Field(default="0", env="CUDA_VISIBLE_DEVICE")
     gpu_memory_fraction: float = Field(default=0.9, env="GPU_MEMORY_FRACTION")
@@ -67,6 +179,38 @@ class AppSettings(BaseSettings):
     llm_top_p: float = Field(default=0.9, env="LLM_TOP_P")
     llm_max_conversation_history: int = Field(default=12, env="LLM_MAX_CONVERSATION_HISTORY")
     llm_warmup_enabled: bool = Field(default=False, env="LLM_WARMUP_ENABLED")
+
+    # LLM: CPU inference profile
+    llm_cpu_quantization: str = Field(default="none", env="LLM_CPU_QUANTIZATION")
+    # OPTIONS: none | int8_dynamic | int4_weight_only
+    llm_cpu_quantization_group_size: int = Field(default=64, env="LLM_CPU_QUANTIZATION_GROUP_SIZE")
+    llm_quantized_cache_dir: Optional[str] = Field(default="./model_cache/quantized", env="LLM_QUANTIZED_CACHE_DIR")
+    # WHY: Quantized weights are written once and memory-mapped on later boots
+    llm_cpu_threads: int = Field(default=0, env="LLM_CPU_THREADS")  # 0 = torch default
+    llm_cpu_affinity: Optional[str] = Field(default=None, env="LLM_CPU_AFFINITY")  # e.g. "0-7"
+
+    # LLM: sentence/clause chunking of the token stream for early TTS handoff
+    llm_chunk_min_clause_chars: int = Field(default=24, env="LLM_CHUNK_MIN_CLAUSE_CHARS")
+    llm_chunk_max_chars: int = Field(default=160, env="LLM_CHUNK_MAX_CHARS")
+
+    # LLM: opt-in semantic response cache for frequent FAQ turns. A similar
+    # (not identical) question hits only above LLM_RESPONSE_CACHE_SIMILARITY
+    # and with the same content words, numbers and negations.
+    llm_response_cache_enabled: bool = Field(default=False, env="LLM_RESPONSE_CACHE_ENABLED")
+    llm_response_cache_max_entries: int = Field(default=512, env="LLM_RESPONSE_CACHE_MAX_ENTRIES")
+    llm_response_cache_ttl_seconds: int = Field(default=3600, env="LLM_RESPONSE_CACHE_TTL_SECONDS")
+    llm_response_cache_similarity: float = Field(default=0.9, env="LLM_RESPONSE_CACHE_SIMILARITY")
+    llm_response_cache_context_turns: int = Field(default=1, env="LLM_RESPONSE_CACHE_CONTEXT_TURNS")
+    # WHY context turns: "yes" after "want a demo?" and after "shall I call
+    # back?" need different answers, so recent turns are part of the key.
+
+    # LLM: speculative (assisted) decoding with a small draft model
+    llm_speculative_enabled: bool = Field(default=False, env="LLM_SPECULATIVE_ENABLED")
+    llm_draft_model_path: str = Field(default="Qwen/Qwen2.5-0.5B-Instruct", env="LLM_DRAFT_MODEL_PATH")
+    llm_draft_num_tokens: int = Field(default=4, env="LLM_DRAFT_NUM_TOKENS")
+    llm_draft_baseline_ratio: float = Field(default=0.1, env="LLM_DRAFT_BASELINE_RATIO")
+    # WHY: A fraction of turns runs without the draft model so the worker
+    # keeps a live plain-decoding tokens/s baseline to compute the uplift.
     
     #Model Paths(Free, top-tier)
     vad_model_name:str = "silero_vad"
@@ -78,6 +222,19 @@ class AppSettings(BaseSettings):
     sample_rate:int =Field(default=16000, env= "SAMPLE_RATE")
     chunk_duration_ms: int = Field(default=20, env="CHUNK_DURATION_MS")
 
+    # Websocket audio framing (media/framing.py). Clients say hello with the
+    # codecs and sample rates they can send; the server answers with the
+    # codec and how many CHUNK_DURATION_MS frames to batch per message.
+    ws_handshake_timeout_seconds: float = Field(default=5.0, env="WS_HANDSHAKE_TIMEOUT_SECONDS")
+    ws_frames_per_message: int = Field(default=1, env="WS_FRAMES_PER_MESSAGE")
+    # WHY: under load (admission degraded/shedding) fewer, larger messages
+    # cut per-message receive/parse overhead for a little added latency
+    ws_frames_per_message_under_load: int = Field(default=4, env="WS_FRAMES_PER_MESSAGE_UNDER_LOAD")
+    ws_max_frames_per_message: int = Field(default=16, env="WS_MAX_FRAMES_PER_MESSAGE")
+    # WHY: lost frames are concealed so VAD timing stays true; past ~1s the
+    # turn has ended anyway, so a longer outage is not padded out
+    ws_max_concealed_frames: int = Field(default=50, env="WS_MAX_CONCEALED_FRAMES")
+
 
     # ========================================
     # Streaming ASR Configuration
@@ -118,6 +275,10 @@ class AppSettings(BaseSettings):
     vad_aggressiveness: int = 3
     vad_frame_duration_ms: int = 32
     speech_onset_threshold: float = 0.5
+    # WHY: frames below the SNR floor are never speech, so Silero inference
+    # can be skipped for them; off by default because Silero is stateful
+    # and skipping frames changes the context it sees
+    vad_silero_snr_gate: bool = Field(default=False, env="VAD_SILERO_SNR_GATE")
     speech_offset_threshold: float = 0.3
     min_speech_duration_ms: int = 200  # REDUCED from 300ms to 200 ms
     max_speech_duration_ms: int = 15000  # 15 seconds
@@ -135,6 +296,9 @@ class AppSettings(BaseSettings):
     barge_in_energy_threshold: float = 0.6
     barge_in_delay_ms: int = 300
     barge_in_grace_period_ms: int = 500
+    # Barge-in reaction (caller starts talking -> reply silenced, LLM
+    # cancelled) above this is logged and counted as slow
+    barge_in_target_ms: int = 500
     #
     #performance tuning 
     # Audio buffer sizes
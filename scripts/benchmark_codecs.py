@@ -0,0 +1,100 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import logging
+
+import numpy as np
+import structlog
+
+from config.settings import settings
+from saletech.media.codecs import create_decoder, encode_g711, opus_available
+from saletech.media.framing import FRAME_HEADER, MESSAGE_HEADER
+
+
+def speech_like(seconds: float, sample_rate: int) -> np.ndarray:
+    """Voiced bursts (harmonics under a syllable-rate envelope) with pauses, plus a little noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 120 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None) * (np.sin(2 * np.pi * 0.2 * t) > -0.3)
+    audio = 0.3 * voiced * envelope + 0.005 * rng.standard_normal(len(t))
+    return np.clip(audio, -1, 1).astype(np.float32)
+
+
+def encode(audio: np.ndarray, codec: str, frame_samples: int, sample_rate: int) -> list:
+    frames = [audio[i:i + frame_samples] for i in range(0, len(audio) - frame_samples + 1, frame_samples)]
+    if codec == "pcm16":
+        return [(frame * 32767).astype(np.int16).tobytes() for frame in frames]
+    if codec in ("mulaw", "alaw"):
+        return [encode_g711(frame, codec) for frame in frames]
+    import opuslib
+
+    encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+    encoder.inband_fec = True
+    return [encoder.encode((frame * 32767).astype(np.int16).tobytes(), frame_samples) for frame in frames]
+
+
+def time_frames(decode, payloads: list, repeat: int) -> np.ndarray:
+    """Per-frame decode time in microseconds (best of `repeat` passes per frame)."""
+    best = np.full(len(payloads), np.inf)
+    for _ in range(repeat):
+        for i, payload in enumerate(payloads):
+            start = time.perf_counter()
+            decode(payload)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-codec ingress decode cost and wire bitrate")
+    parser.add_argument("--seconds", type=float, default=60.0, help="audio per codec")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    sample_rate, frame_samples = settings.sample_rate, settings.chunk_size_samples
+    frame_us = frame_samples / sample_rate * 1e6
+    audio = speech_like(args.seconds, sample_rate)
+    codecs = ["pcm16", "mulaw", "alaw"] + (["opus"] if opus_available() else [])
+
+    print(f"{args.seconds:.0f} s of speech-like audio, {frame_samples}-sample frames at {sample_rate} Hz")
+    print(f"{'codec':<14}{'p50 us':>9}{'p99 us':>9}{'x realtime':>12}{'kbps @1/msg':>13}{'kbps @4/msg':>13}")
+
+    def row(name, timings, payloads):
+        seconds = len(payloads) * frame_samples / sample_rate
+        payload_bytes = sum(len(p) for p in payloads)
+        kbps = [
+            (payload_bytes + len(payloads) * FRAME_HEADER.size + len(payloads) / batch * MESSAGE_HEADER.size)
+            * 8 / seconds / 1000
+            for batch in (1, 4)
+        ]
+        p50, p99 = np.percentile(timings, [50, 99])
+        print(f"{name:<14}{p50:9.2f}{p99:9.2f}{frame_us / p50:12.0f}{kbps[0]:13.1f}{kbps[1]:13.1f}")
+
+    pcm_payloads = encode(audio, "pcm16", frame_samples, sample_rate)
+    legacy = lambda pcm: np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0  # noqa: E731
+    row("pcm16 (before)", time_frames(legacy, pcm_payloads, args.repeat), pcm_payloads)
+
+    for codec in codecs:
+        payloads = encode(audio, codec, frame_samples, sample_rate)
+        decoder = create_decoder(codec, frame_samples, sample_rate)
+        row(codec, time_frames(decoder.decode, payloads, args.repeat), payloads)
+
+    if not opus_available():
+        print("opus: skipped (poetry install --with codecs, and libopus)")
+
+
+if __name__ == "__main__":
+    main()
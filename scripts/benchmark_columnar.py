@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import logging
+
+import numpy as np
+import structlog
+
+from saletech.transcriber.columnar import daily_percentile, export_transcripts
+
+
+def generate(source_dir: str, rows: int, days: int, sessions_per_file: int = 200) -> None:
+    """Synthetic utterance payloads spread over `days`, in per-session JSONL files."""
+    rng = random.Random(0)
+    start = time.time() - days * 86400
+    per_session = 40
+    for first in range(0, rows, per_session * sessions_per_file):
+        path = os.path.join(source_dir, f"session_bench{first}_0.jsonl")
+        with open(path, "w") as f:
+            for i in range(first, min(rows, first + per_session * sessions_per_file)):
+                ts = start + rng.random() * days * 86400
+                f.write(json.dumps({
+                    "session_id": f"s{i // per_session}",
+                    "utterance_id": f"u{i}",
+                    "vad_start_ts": ts - 2.0,
+                    "vad_end_ts": ts - 0.3,
+                    "speech_duration_ms": rng.uniform(300, 6000),
+                    "asr_latency_ms": rng.lognormvariate(5.3, 0.4),
+                    "text": "yes that works for me, can we schedule the demo for thursday",
+                    "confidence": rng.uniform(0.5, 1.0),
+                    "timestamp": ts,
+                }) + "\n")
+
+
+def p95_from_jsonl(source_dir: str) -> dict:
+    """What analysts do today: json.loads every line."""
+    by_day = {}
+    for filename in os.listdir(source_dir):
+        with open(os.path.join(source_dir, filename)) as f:
+            for line in f:
+                record = json.loads(line)
+                day = time.strftime("%Y-%m-%d", time.gmtime(record["timestamp"]))
+                by_day.setdefault(day, []).append(record["asr_latency_ms"])
+    return {day: float(np.percentile(values, 95)) for day, values in sorted(by_day.items())}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="p95 asr_latency_ms per day: JSONL scan vs Parquet")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, out = os.path.join(tmp, "jsonl"), os.path.join(tmp, "parquet")
+        os.makedirs(source)
+        generate(source, args.rows, args.days)
+
+        start = time.perf_counter()
+        export_transcripts(source, out)
+        export_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = p95_from_jsonl(source)
+        jsonl_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        got = daily_percentile(out, "asr_latency_ms", 95)
+        parquet_s = time.perf_counter() - start
+
+        worst = max(abs(got[day] - expected[day]) / expected[day] for day in expected)
+        print(f"{args.rows} utterances over {args.days} days")
+        print(f"one-off export          {export_s:6.2f} s")
+        print(f"p95/day from JSONL      {jsonl_s:6.2f} s")
+        print(f"p95/day from Parquet    {parquet_s:6.2f} s  (max rel. diff vs exact {worst:.2%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from transformers import AutoModelForCausalLM, Qwen2Config
+
+try:
+    from transformers.cache_utils import DynamicCache
+except Exception:  # pragma: no cover - compatibility with older transformers
+    DynamicCache = None
+
+from saletech.services.llm_quantization import (
+    QUANTIZATION_MODES,
+    apply_cpu_profile,
+    load_or_quantize,
+    model_memory_bytes,
+)
+
+
+def tiny_qwen_loader():
+    """A randomly initialised two-layer Qwen2, small enough for CI."""
+    config = Qwen2Config(
+        vocab_size=2048,
+        hidden_size=256,
+        intermediate_size=512,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        max_position_embeddings=4096,
+    )
+    torch.manual_seed(0)
+    return AutoModelForCausalLM.from_config(config).eval()
+
+
+def pretrained_loader(model_name: str):
+    def load():
+        return AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32).eval()
+    return load
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+
+@torch.no_grad()
+def measure(model, vocab_size: int, prompt_tokens: int, new_tokens: int, repeats: int) -> dict:
+    input_ids = torch.randint(0, vocab_size, (1, prompt_tokens))
+
+    # Warm up kernels and allocator once.
+    model(input_ids=input_ids[:, :8])
+
+    prefill_s = 0.0
+    decode_s = 0.0
+    for _ in range(repeats):
+        cache = DynamicCache()
+        start = time.perf_counter()
+        logits = model(input_ids=input_ids, past_key_values=cache, use_cache=True).logits
+        prefill_s += time.perf_counter() - start
+
+        token = logits[:, -1:].argmax(-1)
+        start = time.perf_counter()
+        for _ in range(new_tokens):
+            logits = model(input_ids=token, past_key_values=cache, use_cache=True).logits
+            token = logits[:, -1:].argmax(-1)
+        decode_s += time.perf_counter() - start
+
+    return {
+        "prefill_tok_s": prompt_tokens * repeats / prefill_s,
+        "decode_tok_s": new_tokens * repeats / decode_s,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark LLM CPU quantization modes (prefill/decode tokens/s and memory).")
+    parser.add_argument("--model", default="tiny", help="HF model name/path, or 'tiny' for a local two-layer Qwen2.")
+    parser.add_argument("--modes", nargs="+", default=list(QUANTIZATION_MODES), choices=QUANTIZATION_MODES)
+    parser.add_argument("--prompt-tokens", type=int, default=256)
+    parser.add_argument("--new-tokens", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--group-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--affinity", help="CPU list to pin to, for example 0-7.")
+    parser.add_argument("--cache-dir", help="Quantized checkpoint cache directory (also times a cache reload).")
+    args = parser.parse_args()
+
+    profile = apply_cpu_profile(num_threads=args.threads, affinity=args.affinity)
+    print(f"cpu profile: {profile}")
+
+    loader = tiny_qwen_loader if args.model == "tiny" else pretrained_loader(args.model)
+
+    header = f"{'mode':<18}{'load_s':>9}{'weights_MB':>12}{'rss_MB':>10}{'prefill_tok/s':>15}{'decode_tok/s':>14}"
+    print(header)
+    print("-" * len(header))
+
+    for mode in args.modes:
+        start = time.perf_counter()
+        model = load_or_quantize(loader, args.model, mode, args.cache_dir, args.group_size)
+        load_s = time.perf_counter() - start
+
+        result = measure(model, model.config.vocab_size, args.prompt_tokens, args.new_tokens, args.repeats)
+        print(
+            f"{mode:<18}{load_s:>9.2f}{model_memory_bytes(model) / 1e6:>12.1f}"
+            f"{rss_bytes() / 1e6:>10.1f}{result['prefill_tok_s']:>15.1f}{result['decode_tok_s']:>14.1f}"
+        )
+
+        if args.cache_dir and mode != "none":
+            start = time.perf_counter()
+            load_or_quantize(loader, args.model, mode, args.cache_dir, args.group_size)
+            print(f"{'  cache reload':<18}{time.perf_counter() - start:>9.2f}")
+
+        del model
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import structlog
+
+from saletech.utils.logger import setup_logging, shutdown_logging
+
+
+# name -> setup_logging overrides. "legacy" is the previous configuration:
+# inline rendering and callsite lookup on every logger.
+CONFIGS = {
+    "legacy": dict(mode="sync", hot_loggers=(), sample_rates={}),
+    "sync_hot": dict(mode="sync"),
+    "queue_hot": dict(mode="queue"),
+}
+
+
+def _timed(log, calls: int, interval: float) -> float:
+    """Mean microseconds spent inside the logging call itself."""
+    spent = 0.0
+    for i in range(calls):
+        start = time.perf_counter()
+        log(i)
+        spent += time.perf_counter() - start
+        if interval:
+            # Idle like the event loop between frames; the writer runs here.
+            time.sleep(interval)
+    return spent / calls * 1e6
+
+
+def bench(config: dict, calls: int, interval: float, log_dir: str) -> dict:
+    # Keep stdout for the results table.
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        setup_logging(log_dir=log_dir, **config)
+
+        # Fresh proxies: configure() does not rebind loggers already cached.
+        utterance = structlog.get_logger("saletech.transcriber.pipeline")
+        frame = structlog.get_logger("saletech.audio.frame_buffer")
+
+        frame_us = _timed(
+            lambda i: frame.warning("Queue full, dropped oldest frame.", queue_size=i),
+            calls,
+            interval,
+        )
+        utterance_us = _timed(
+            lambda i: utterance.info(
+                "utterance_transcribed",
+                session_id="bench",
+                duration_ms=1840.0,
+                asr_latency_ms=212.5,
+                stages_ms={"vad": 3.1, "asr_decode": 198.2, "writer_enqueue": 0.4},
+            ),
+            calls,
+            interval,
+        )
+
+        start = time.perf_counter()
+        shutdown_logging()
+        drain_ms = (time.perf_counter() - start) * 1000
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return {"utterance_us": utterance_us, "frame_warning_us": frame_us, "drain_ms": drain_ms}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-call cost of logging on the calling thread")
+    # Default burst fits the log queue, so nothing is dropped.
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument(
+        "--interval-us",
+        type=float,
+        default=200.0,
+        help="idle time between calls (0 = tight loop, writer competes for the GIL)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'config':<10} {'utterance_info':>16} {'frame_warning':>15} {'drain':>10}")
+    for name, config in CONFIGS.items():
+        with tempfile.TemporaryDirectory() as log_dir:
+            result = bench(config, args.calls, args.interval_us / 1e6, log_dir)
+        print(
+            f"{name:<10} {result['utterance_us']:>13.1f} us {result['frame_warning_us']:>12.1f} us "
+            f"{result['drain_ms']:>7.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
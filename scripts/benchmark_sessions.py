@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import structlog
+
+from saletech.core.session import VoiceSession
+from saletech.core.session_manager import SessionManager
+from saletech.models.schemas import SessionState
+from saletech.utils.histogram import LatencyHistogram
+
+
+class LockedSessionManager:
+    """The previous manager: one asyncio.Lock, full scan on cleanup."""
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = asyncio.Lock()
+
+    async def create_session(self):
+        async with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError("Max session limit reached")
+            session = VoiceSession(session_id=f"s{len(self._sessions)}-{time.perf_counter_ns()}")
+            session.last_active = datetime.now()
+            self._sessions[session.session_id] = session
+            return session
+
+    async def get_session(self, session_id):
+        async with self._lock:
+            return self._sessions.get(session_id)
+
+    async def update_state(self, session_id, new_state):
+        async with self._lock:
+            session = self._sessions.get(session_id)
+            if not session:
+                return
+            session.state = new_state
+            session.last_active = datetime.now()
+
+    async def cleanup_inactive_sessions(self, timeout_seconds):
+        async with self._lock:
+            now = datetime.now()
+            to_remove = [
+                sid for sid, s in self._sessions.items()
+                if (now - s.last_active) > timedelta(seconds=timeout_seconds)
+            ]
+            for sid in to_remove:
+                self._sessions.pop(sid).tracer.close()
+            return to_remove
+
+
+async def run(manager, sessions: int, workers: int, ops: int, idle_fraction: float) -> dict:
+    ids = [(await manager.create_session()).session_id for _ in range(sessions)]
+
+    op_us = LatencyHistogram()
+    sweep_us = LatencyHistogram()
+    stop = asyncio.Event()
+
+    async def worker():
+        for _ in range(ops):
+            session_id = random.choice(ids)
+            start = time.perf_counter()
+            await manager.get_session(session_id)
+            await manager.update_state(session_id, SessionState.PROCESSING)
+            op_us.record((time.perf_counter() - start) * 1e6)
+            await asyncio.sleep(0)
+
+    async def sweeper():
+        # Steady state: the reaper runs far more often than sessions time out.
+        while not stop.is_set():
+            start = time.perf_counter()
+            await manager.cleanup_inactive_sessions(timeout_seconds=300)
+            sweep_us.record((time.perf_counter() - start) * 1e6)
+            await asyncio.sleep(0.005)
+
+    sweep_task = asyncio.create_task(sweeper())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sweep_task
+
+    # Expiry: everything but `idle_fraction` is touched after a pause, so a
+    # sweep with a timeout shorter than the pause expires exactly the idle ones.
+    await asyncio.sleep(0.2)
+    idle = set(random.sample(ids, int(sessions * idle_fraction)))
+    for session_id in ids:
+        if session_id not in idle:
+            await manager.update_state(session_id, SessionState.LISTENING)
+    start = time.perf_counter()
+    expired = await manager.cleanup_inactive_sessions(timeout_seconds=0.1)
+    expire_ms = (time.perf_counter() - start) * 1e3
+    assert len(expired) == len(idle)
+
+    return {
+        "ops_per_s": workers * ops / elapsed,
+        "op_p50_us": op_us.percentile(50),
+        "op_p99_us": op_us.percentile(99),
+        "sweep_p50_us": sweep_us.percentile(50),
+        "expire_ms": expire_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session registry under concurrent access")
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=500)
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--idle-fraction", type=float, default=0.01)
+    parser.add_argument("--shards", type=int, default=16)
+    args = parser.parse_args()
+
+    # Per-session create/close logs would dominate the output.
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    configs = {
+        "global-lock": lambda: LockedSessionManager(max_sessions=args.sessions),
+        f"sharded/{args.shards}": lambda: SessionManager(shards=args.shards, max_sessions=args.sessions),
+    }
+
+    print(f"{args.sessions} sessions, {args.workers} tasks x {args.ops} get+update, "
+          f"{args.idle_fraction:.0%} idle")
+    print(f"{'config':<14} {'ops/s':>9} {'op p50':>10} {'op p99':>10} {'idle sweep':>12} {'expiry sweep':>13}")
+    for name, make in configs.items():
+        random.seed(0)
+        result = asyncio.run(run(make(), args.sessions, args.workers, args.ops, args.idle_fraction))
+        print(
+            f"{name:<14} {result['ops_per_s']:>9.0f} {result['op_p50_us']:>7.1f} us "
+            f"{result['op_p99_us']:>7.1f} us {result['sweep_p50_us']:>9.1f} us {result['expire_ms']:>10.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
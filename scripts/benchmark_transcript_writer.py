@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import structlog
+
+from saletech.transcriber.writer import TranscriptIO, TranscriptWriter
+from saletech.utils.histogram import LatencyHistogram
+
+
+class InlineWriter:
+    """The previous writer: json.dump + flush on the event loop per record."""
+
+    def __init__(self, session_id: str, output_dir: str, fsync: bool = False):
+        self.fsync = fsync
+        self._file = open(os.path.join(output_dir, f"session_{session_id}.jsonl"), "a", encoding="utf-8")
+
+    async def write(self, record):
+        json.dump(record, self._file, ensure_ascii=False)
+        self._file.write("\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    async def close(self):
+        self._file.close()
+
+
+# name -> writer factory(session_id, output_dir)
+def _configs():
+    def queued(**io_args):
+        io = TranscriptIO(**io_args)
+        return lambda session_id, output_dir: TranscriptWriter(session_id, output_dir, io=io)
+
+    return {
+        "inline": lambda: (lambda s, d: InlineWriter(s, d)),
+        "inline+fsync": lambda: (lambda s, d: InlineWriter(s, d, fsync=True)),
+        "group/none": lambda: queued(fsync="none"),
+        "group/close": lambda: queued(fsync="close"),
+        "group/commit": lambda: queued(fsync="commit"),
+        "per-record/commit": lambda: queued(flush_records=1, fsync="commit"),
+    }
+
+
+def _record(session_id: str, n: int) -> dict:
+    now = time.time()
+    return {
+        "session_id": session_id,
+        "utterance_id": f"{session_id}-{n}",
+        "vad_start_ts": now - 2.1,
+        "vad_end_ts": now - 0.3,
+        "speech_duration_ms": 1840.0,
+        "asr_latency_ms": 212.5,
+        "text": "yes that works for me, can we schedule the demo for thursday afternoon",
+        "confidence": 0.93,
+        "timestamp": now,
+    }
+
+
+async def run(factory, sessions: int, records: int, output_dir: str) -> dict:
+    write_us = LatencyHistogram()
+
+    async def session(index: int):
+        session_id = f"bench{index}"
+        writer = factory(session_id, output_dir)
+        for n in range(records):
+            start = time.perf_counter()
+            await writer.write(_record(session_id, n))
+            write_us.record((time.perf_counter() - start) * 1e6)
+            await asyncio.sleep(0)  # other sessions' frames run here
+        return writer
+
+    start = time.perf_counter()
+    writers = await asyncio.gather(*(session(i) for i in range(sessions)))
+    queued_s = time.perf_counter() - start
+    await asyncio.gather(*(writer.close() for writer in writers))
+    total_s = time.perf_counter() - start
+
+    return {
+        "records_per_s": sessions * records / total_s,
+        "queued_s": queued_s,
+        "total_s": total_s,
+        "write_p50_us": write_us.percentile(50),
+        "write_p99_us": write_us.percentile(99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Transcript writer durability vs throughput")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--records", type=int, default=50)
+    parser.add_argument("--only", nargs="*", help="config names to run")
+    args = parser.parse_args()
+
+    # Writer open/close logs would dominate the output.
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{args.sessions} concurrent sessions x {args.records} records")
+    print(f"{'config':<18} {'records/s':>10} {'write p50':>11} {'write p99':>11} {'total':>8}")
+    for name, make in _configs().items():
+        if args.only and name not in args.only:
+            continue
+        with tempfile.TemporaryDirectory() as output_dir:
+            result = asyncio.run(run(make(), args.sessions, args.records, output_dir))
+        print(
+            f"{name:<18} {result['records_per_s']:>10.0f} {result['write_p50_us']:>8.1f} us "
+            f"{result['write_p99_us']:>8.1f} us {result['total_s']:>6.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from saletech.transcriber.store import compact_segments
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge old sealed transcript segments")
+    parser.add_argument("root", nargs="?", default="transcripts", help="segment store directory")
+    parser.add_argument("--min-age-hours", type=float, default=24.0, help="only merge segments older than this")
+    parser.add_argument("--target-mb", type=float, default=512.0, help="size of merged segments")
+    args = parser.parse_args()
+
+    summary = compact_segments(
+        args.root,
+        min_age_seconds=args.min_age_hours * 3600,
+        target_bytes=int(args.target_mb * 1024 * 1024),
+    )
+    print(
+        f"merged {summary['segments_in']} segments into {summary['segments_out']} "
+        f"({summary['bytes'] / 1e6:.1f} MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from saletech.transcriber.columnar import daily_percentile, export_transcripts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export transcript JSONL to partitioned Parquet")
+    parser.add_argument("source", nargs="?", default="transcripts", help="segment store / transcript directory")
+    parser.add_argument("out", nargs="?", default="transcripts_columnar", help="Parquet dataset directory")
+    parser.add_argument("--report", action="store_true", help="print p95 asr_latency_ms per day afterwards")
+    args = parser.parse_args()
+
+    summary = export_transcripts(args.source, args.out)
+    print(f"exported {summary['rows']} rows from {summary['sources']} files into {summary['files']} Parquet files")
+
+    if args.report:
+        for day, p95 in daily_percentile(args.out, "asr_latency_ms", 95).items():
+            print(f"{day}  p95 asr_latency_ms = {p95:.1f}")
+
+
+if __name__ == "__main__":
+    main()
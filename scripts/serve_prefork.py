@@ -0,0 +1,43 @@
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from config.settings import settings
+from saletech.utils.prefork import PreforkServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve SaleTech with models loaded once and shared copy-on-write by forked workers."
+    )
+    parser.add_argument("--workers", type=int, default=settings.prefork_workers)
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument(
+        "--report-delay",
+        type=float,
+        default=settings.prefork_memory_report_delay_seconds,
+        help="Seconds after start-up to log the per-worker memory report (also sent on SIGUSR1).",
+    )
+    args = parser.parse_args()
+
+    from saletech.main import app
+
+    PreforkServer(
+        app,
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        report_delay_seconds=args.report_delay,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
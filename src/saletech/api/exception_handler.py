@@ -1,8 +1,8 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
 
-from src.saletech.utils.errors import SaleTechException
-from src.saletech.utils.logger import get_logger
+from saletech.utils.errors import SaleTechException
+from saletech.utils.logger import get_logger
 
 logger = get_logger("saletech.api")
 
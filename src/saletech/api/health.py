@@ -1,11 +1,24 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
 
 @router.get("/health", tags=["health"])
 async def health_check():
+    """Liveness: the process is up and serving requests."""
     return {
         "status": "ok",
         "service": "saletech"
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/ready", tags=["health"])
+async def readiness_check(request: Request):
+    """Readiness: every required model is loaded and warmed up."""
+    registry = getattr(request.app.state, "model_registry", None)
+    if registry is None:
+        return JSONResponse(status_code=503, content={"ready": False, "models": {}})
+
+    snapshot = registry.snapshot()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
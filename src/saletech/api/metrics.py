@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from saletech.utils.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter()
+
+
+@router.get("/metrics", tags=["health"])
+async def metrics():
+    """Prometheus text exposition of every registered subsystem collector."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
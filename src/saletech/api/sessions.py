@@ -1,5 +1,13 @@
+import asyncio
+from typing import Optional
+
 from fastapi import APIRouter, Request, HTTPException, Depends
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from saletech.transcriber.store import get_segment_store
+from saletech.utils.errors import SessionRejectedError
+from saletech.utils.tracing import session_latency, worker_latency
 
 
 router = APIRouter()
@@ -12,12 +20,55 @@ async def create_session(request: Request):
         session_manager = get_session_manager(request)
         session = await session_manager.create_session()
         return {"session_id": session.session_id}
-    except RuntimeError as e:
-        raise HTTPException(status_code=503, detail=str(e))
+    except SessionRejectedError as e:
+        # Retry-After instead of a bare 503; with a less-loaded peer known,
+        # a 307 sends the client there (POST is preserved).
+        headers = {"Retry-After": str(e.retry_after or 1)}
+        if e.preferred_worker:
+            headers["Location"] = e.preferred_worker.rstrip("/") + "/session"
+            status_code = 307
+        else:
+            status_code = 503
+        return JSONResponse(
+            status_code=status_code,
+            content={"detail": e.message, **e.context},
+            headers=headers,
+        )
 
 
 @router.delete("/session/{session_id}")
 async def close_session(session_id: str, request: Request):
     session_manager = get_session_manager(request)
     await session_manager.close_session(session_id)
-    return {"status": "closed"}
\ No newline at end of file
+    return {"status": "closed"}
+
+
+@router.get("/session/{session_id}/latency")
+async def get_session_latency(session_id: str):
+    """Per-stage latency breakdown for one live session."""
+    summary = session_latency(session_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    return summary
+
+
+@router.get("/latency")
+async def get_worker_latency():
+    """Per-stage latency aggregated over every utterance this worker traced."""
+    return worker_latency()
+
+
+@router.get("/session/{session_id}/transcript")
+async def get_session_transcript(
+    session_id: str,
+    start_ts: Optional[float] = None,
+    end_ts: Optional[float] = None,
+):
+    """Transcript records of a session, read from the segment store by offset."""
+    store = get_segment_store()
+    # Segments sealed by other workers are picked up by the store's own
+    # throttled refresh, not by a directory scan per unknown id.
+    records = await asyncio.to_thread(store.read_session, session_id, start_ts, end_ts)
+    if not records:
+        raise HTTPException(status_code=404, detail=f"No transcript for session {session_id}")
+    return {"session_id": session_id, "records": records}
@@ -1,36 +1,202 @@
-import numpy as np
-import time
+import asyncio
+import json
 import uuid
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from src.saletech.transcriber.pipeline import TranscriptionPipeline
-from src.saletech.transcriber.session import sess
 
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.websockets import WebSocketState
 
-from src.saletech.utils.logger import get_logger
+from config.settings import settings
+from saletech.core.admission import NORMAL, peek_admission_controller
+from saletech.media.buffer.frame_chunking import AudioIngressBuffer
+from saletech.media.codecs import create_decoder, to_float32
+from saletech.media.framing import SequenceTracker, decode_message, negotiate
+from saletech.utils.errors import FramingError, SessionRejectedError
+from saletech.utils.logger import get_logger
 
 router = APIRouter()
 
 logger = get_logger("saletech.transcriber.ws")
 
+# Close codes (RFC 6455): session expired by the reaper, handshake / frame
+# violations, undecodable payloads, and sessions refused by admission control.
+WS_GOING_AWAY = 1001
+WS_PROTOCOL_ERROR = 1002
+WS_INVALID_PAYLOAD = 1007
+WS_TRY_AGAIN_LATER = 1013
+# A close frame's reason may carry at most 123 bytes.
+_MAX_CLOSE_REASON = 123
+
+
 @router.websocket("/ws/transcribe")
 async def websocket_transcribe(ws: WebSocket):
     """
     websocket endpoint for real time speech transcription
+
+    Protocol (media/framing.py): the client opens with a JSON hello and gets
+    a JSON "ready" naming the codec and frames per message; every binary
+    message after that carries one or more sequenced frames, decoded here
+    to float32 (media/codecs.py); frames lost in transit are concealed so
+    the pipeline's VAD keeps real time. A client that sends binary first is
+    served the legacy way: raw PCM16, one frame per message, no sequence
+    numbers.
+
+    New streams go through admission control before anything is built; a
+    refused client gets close code 1013 with the retry hints as JSON in the
+    close reason. An admitted stream is a session of the app's
+    SessionManager, owning the pipeline: every message marks it active, and
+    a stream that stays silent past the idle timeout is reaped like any
+    other session and closed with 1001.
     """
-    await ws.accept()
+    admission = peek_admission_controller()
+    manager = getattr(ws.app.state, "session_manager", None)
+    session = None
+    try:
+        if manager is not None:
+            session = await manager.create_session(metadata={"source": "transcriber"})
+        elif admission is not None:
+            decision = await admission.check()
+            if not decision.admitted:
+                raise SessionRejectedError("Worker overloaded", context=decision.to_dict())
+    except SessionRejectedError as e:
+        logger.warning("transcriber_session_rejected", **e.context)
+        # Accepted only so the close frame (code and reason) reaches the client.
+        await ws.accept()
+        await ws.close(code=WS_TRY_AGAIN_LATER, reason=_retry_hint(e.context))
+        return
 
-    session_id = str(uuid.uuid4())
+    session_id = session.session_id if session is not None else str(uuid.uuid4())
+    ingress = AudioIngressBuffer()
+    try:
+        await ws.accept()
+        logger.info("Transcriber session started", session_id=session_id)
 
-    logger.info("Transcriber session started", session_id=session_id)
+        # Imported here so the API process does not load the audio stack until
+        # a transcription actually starts.
+        from saletech.transcriber.pipeline import TranscriptionPipeline
 
-    pipeline = TranscriptionPipeline(session_id=session_id)
+        pipeline = TranscriptionPipeline(session_id=session_id)
+        if session is not None:
+            # Closing the session (reaper, shutdown) closes both.
+            session.pipeline = pipeline
+            session.ingress = ingress
+        await pipeline.initialize()
+    except BaseException:
+        # Client gone before accept, or the pipeline failed to load: give
+        # the admission slot back now rather than when the reaper notices.
+        if session is not None:
+            await manager.close_session(session_id)
+        raise
 
-    await pipeline.initialize()
+    consumer = asyncio.create_task(_transcribe_ingress(pipeline, ingress, ws, session_id))
+    tracker = SequenceTracker()
 
     try:
-        while True:
-            audio_bytes = await ws.receive_bytes()
+        first = await asyncio.wait_for(ws.receive(), timeout=settings.ws_handshake_timeout_seconds)
+        if first["type"] == "websocket.disconnect":
+            return
+
+        if first.get("text") is not None:
+            under_load = admission is not None and admission.mode != NORMAL
+            hello = json.loads(first["text"])
+            if not isinstance(hello, dict):
+                raise ValueError("hello must be a JSON object")
+            ready = negotiate(hello, under_load=under_load)
+            decoder = create_decoder(ready["codec"], ready["frame_samples"], ready["sample_rate"])
+            frame_seconds = ready["frame_samples"] / ready["sample_rate"]
+            await ws.send_json({**ready, "session_id": session_id})
+            logger.info(
+                "transcriber_stream_negotiated",
+                session_id=session_id,
+                codec=ready["codec"],
+                frames_per_message=ready["frames_per_message"],
+            )
+
+            while True:
+                for frame in decode_message(await _receive_bytes(ws, manager, session_id)):
+                    if frame.codec != ready["codec"] or frame.samples != ready["frame_samples"]:
+                        raise FramingError(
+                            "Frame does not match the negotiated stream",
+                            {"seq": frame.seq, "codec": frame.codec, "samples": frame.samples},
+                        )
+                    lost = tracker.accept(frame.seq)
+                    if lost < 0:
+                        continue  # late or duplicate
+                    if lost:
+                        concealed = decoder.conceal(lost, frame.payload)
+                        for back, audio in enumerate(concealed):
+                            at = frame.timestamp - (len(concealed) - back) * frame_seconds
+                            ingress.put_nowait(audio, at)
+                    ingress.put_nowait(decoder.decode(frame.payload), frame.timestamp)
+        else:
+            ingress.put_nowait(first["bytes"])
+            while True:
+                ingress.put_nowait(await _receive_bytes(ws, manager, session_id))
+
+    except WebSocketDisconnect:
+        logger.info("Transcriber client disconnected", session_id=session_id)
+    except asyncio.TimeoutError:
+        logger.warning("transcriber_handshake_timeout", session_id=session_id)
+        await ws.close(code=WS_PROTOCOL_ERROR)
+    except (FramingError, ValueError, TypeError) as e:
+        # ValueError / TypeError: hello not a JSON object or with mistyped
+        # fields, or a text message where audio was expected
+        logger.warning("transcriber_protocol_error", session_id=session_id, error=str(e))
+        await ws.close(code=WS_INVALID_PAYLOAD if isinstance(e, FramingError) else WS_PROTOCOL_ERROR)
+    finally:
+        ingress.close()
+        await consumer
+        await pipeline.flush()
+        if session is not None:
+            await manager.close_session(session_id)  # shuts the pipeline down
+        else:
+            await pipeline.shutdown()
+        logger.info("Transcriber session ended", session_id=session_id, **tracker.metrics)
+
+
+async def _receive_bytes(ws: WebSocket, manager, session_id: str) -> bytes:
+    """
+    Next binary message, marking the session active; a text message after
+    the handshake is a protocol error.
+    """
+    message = await ws.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    data = message.get("bytes")
+    if data is None:
+        raise ValueError("expected a binary audio message")
+    if manager is not None:
+        manager.touch(session_id)
+    return data
+
+
+def _retry_hint(context: dict) -> str:
+    """Retry hints for the close reason, dropping what does not fit in 123 bytes."""
+    hint = {
+        "retry_after": context.get("retry_after"),
+        "preferred_worker": context.get("preferred_worker"),
+        "reason": context.get("reason"),
+    }
+    while True:
+        reason = json.dumps(hint, separators=(",", ":"))
+        if len(reason.encode()) <= _MAX_CLOSE_REASON or len(hint) == 1:
+            return reason[:_MAX_CLOSE_REASON]
+        hint.popitem()
 
-            audio_np= np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32)
 
-            audio/=32768.0
+async def _transcribe_ingress(pipeline, ingress: AudioIngressBuffer, ws: WebSocket, session_id: str) -> None:
+    """Feed queued frames to the pipeline until the socket closes and the queue drains."""
+    while True:
+        item = await ingress.get()
+        if item is None:
+            if not ingress.closed:
+                continue
+            if ws.client_state == WebSocketState.CONNECTED and ws.application_state == WebSocketState.CONNECTED:
+                # Closed under a live socket: the session was reaped.
+                logger.info("transcriber_session_expired", session_id=session_id)
+                await ws.close(code=WS_GOING_AWAY)
+            return
+        pcm, _ = item
+        try:
+            await pipeline.process_frame(to_float32(pcm))
+        except Exception:
+            pass  # logged by the pipeline; keep transcribing the rest
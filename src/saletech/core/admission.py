@@ -0,0 +1,326 @@
+import asyncio
+import math
+import os
+import socket
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+from saletech.core.session_store import SessionStore
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.logger import get_logger
+from saletech.utils.loop_monitor import get_loop_monitor
+from saletech.utils.metrics import MetricFamily, counter, gauge, register_collector
+
+
+logger = get_logger("saletech.admission")
+
+NORMAL = "normal"
+DEGRADED = "degraded"
+SHEDDING = "shedding"
+MODES = (NORMAL, DEGRADED, SHEDDING)
+
+
+class AdmissionDecision:
+    """Outcome of an admission check for a new session."""
+
+    __slots__ = ("admitted", "mode", "pressure", "reason", "retry_after", "preferred_worker")
+
+    def __init__(
+        self,
+        admitted: bool,
+        mode: str = NORMAL,
+        pressure: float = 0.0,
+        reason: Optional[str] = None,
+        retry_after: Optional[int] = None,
+        preferred_worker: Optional[str] = None,
+    ):
+        self.admitted = admitted
+        self.mode = mode
+        self.pressure = pressure
+        self.reason = reason
+        self.retry_after = retry_after
+        self.preferred_worker = preferred_worker
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class AdmissionController:
+    """
+    Admits new sessions by live load, degrading service before refusing.
+
+    Design:
+    - every `interval` seconds it samples ASR queue wait (p95 over the
+      window), event-loop lag (p95; every VAD frame waits on the loop), LLM
+      requests in flight, CPU load per core and GPU utilisation; each is
+      divided by its target and the largest ratio is the pressure
+    - pressure >= degrade_at switches ASR and LLM to greedy decoding;
+      pressure >= shed_at refuses new sessions. Leaving a mode needs the
+      pressure to fall 10% below its threshold, so it does not flap
+    - sessions already on this worker are never shed (affinity): only
+      create_session asks for admission
+    - a refusal carries retry_after (scaled by pressure) and, when workers
+      share a Redis session store, the URL of the least-loaded fresh peer
+    """
+
+    HYSTERESIS = 0.9
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        interval: float = 1.0,
+        targets: Optional[Dict[str, float]] = None,
+        degrade_at: float = 0.7,
+        shed_at: float = 1.0,
+        retry_after: float = 5.0,
+        advertise_url: Optional[str] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.store = store
+        self.interval = interval
+        self.targets = targets if targets is not None else {
+            "asr_queue_ms": 300.0,
+            "loop_lag_ms": 20.0,
+            "llm_in_flight": 2.0,
+            "cpu_load": 0.9,
+            "gpu_util": 0.9,
+        }
+        self.degrade_at = degrade_at
+        self.shed_at = shed_at
+        self.retry_after = retry_after
+        self.advertise_url = advertise_url
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+        self.mode = NORMAL
+        self.pressure = 0.0
+        self.signals: Dict[str, Optional[float]] = {}
+        self.admitted = 0
+        self.rejected = 0
+        self.mode_changes = 0
+
+        self._asr_seen: Optional[LatencyHistogram] = None
+        self._lag_seen: Optional[LatencyHistogram] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="saletech-admission")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception:
+                logger.error("admission_sample_failed", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    # ------------------------------------------------------------------
+
+    def sample(self, signals: Optional[Dict[str, Optional[float]]] = None) -> float:
+        """Read load signals (or take them as given), update mode; returns pressure."""
+        self.signals = signals if signals is not None else self._read_signals()
+        ratios = [
+            value / self.targets[name]
+            for name, value in self.signals.items()
+            if value is not None and self.targets.get(name)
+        ]
+        self.pressure = max(ratios, default=0.0)
+        self._set_mode(self._next_mode(self.pressure))
+
+        if self.store is not None:
+            self.store.report_load(self.worker_id, {
+                "url": self.advertise_url,
+                "pressure": round(self.pressure, 3),
+                "mode": self.mode,
+                "ts": time.time(),
+            })
+        return self.pressure
+
+    def _next_mode(self, pressure: float) -> str:
+        if pressure >= self.shed_at:
+            return SHEDDING
+        if self.mode == SHEDDING and pressure >= self.shed_at * self.HYSTERESIS:
+            return SHEDDING
+        if pressure >= self.degrade_at:
+            return DEGRADED
+        if self.mode != NORMAL and pressure >= self.degrade_at * self.HYSTERESIS:
+            return DEGRADED
+        return NORMAL
+
+    def _set_mode(self, mode: str) -> None:
+        if mode != self.mode:
+            logger.warning(
+                "admission_mode_changed",
+                previous=self.mode,
+                mode=mode,
+                pressure=round(self.pressure, 3),
+                signals=self.signals,
+            )
+            self.mode = mode
+            self.mode_changes += 1
+        # Re-applied every sample, so a service loaded later picks it up too.
+        degraded = mode != NORMAL
+        for service in _loaded_services():
+            service.degraded = degraded
+
+    def _read_signals(self) -> Dict[str, Optional[float]]:
+        signals: Dict[str, Optional[float]] = {}
+
+        asr_module = sys.modules.get("saletech.services.streaming_asr")
+        asr = asr_module.peek_asr_service() if asr_module is not None else None
+        if asr is not None:
+            signals["asr_queue_ms"], self._asr_seen = _window_p95(asr.queue_wait_ms, self._asr_seen)
+
+        monitor = get_loop_monitor()
+        if monitor.running:
+            signals["loop_lag_ms"], self._lag_seen = _window_p95(monitor.lag_ms, self._lag_seen)
+
+        llm_module = sys.modules.get("saletech.services.llm")
+        llm = llm_module.peek_llm_kvcache_service() if llm_module is not None else None
+        if llm is not None:
+            signals["llm_in_flight"] = float(llm.generations_in_flight)
+
+        try:
+            signals["cpu_load"] = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            pass
+
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            try:
+                signals["gpu_util"] = torch.cuda.utilization() / 100
+            except Exception:
+                pass  # needs pynvml; go without the GPU signal
+
+        return signals
+
+    # ------------------------------------------------------------------
+
+    async def check(self, at_capacity: bool = False) -> AdmissionDecision:
+        """Admission decision for one new session."""
+        if self.mode != SHEDDING and not at_capacity:
+            self.admitted += 1
+            return AdmissionDecision(True, self.mode, self.pressure)
+
+        self.rejected += 1
+        overload = max(self.pressure / self.shed_at, 1.0)
+        reason = "capacity" if at_capacity else self._top_signal()
+        return AdmissionDecision(
+            False,
+            self.mode,
+            self.pressure,
+            reason=reason,
+            retry_after=math.ceil(self.retry_after * min(overload, 4.0)),
+            preferred_worker=await self._preferred_worker(),
+        )
+
+    def _top_signal(self) -> Optional[str]:
+        ratios = {
+            name: value / self.targets[name]
+            for name, value in self.signals.items()
+            if value is not None and self.targets.get(name)
+        }
+        return max(ratios, key=ratios.get) if ratios else None
+
+    async def _preferred_worker(self) -> Optional[str]:
+        if self.store is None:
+            return None
+        try:
+            loads = await self.store.worker_loads()
+        except Exception:
+            return None
+        fresh_after = time.time() - 3 * self.interval
+        peers = [
+            load for worker_id, load in loads.items()
+            if worker_id != self.worker_id
+            and load.get("url")
+            and load.get("ts", 0) >= fresh_after
+            and load.get("pressure", math.inf) < self.degrade_at
+        ]
+        if not peers:
+            return None
+        return min(peers, key=lambda load: load["pressure"])["url"]
+
+
+def _window_p95(histogram: LatencyHistogram, seen: Optional[LatencyHistogram]):
+    """p95 of values recorded since the last sample (0 if none), and the new mark."""
+    window = histogram.since(seen) if seen is not None else histogram.snapshot()
+    p95 = window.percentile(95) if window.count else 0.0
+    return p95, histogram.snapshot()
+
+
+def _loaded_services():
+    # Only services this worker already loaded; never import the ML stack.
+    asr_module = sys.modules.get("saletech.services.streaming_asr")
+    llm_module = sys.modules.get("saletech.services.llm")
+    services = [
+        asr_module.peek_asr_service() if asr_module is not None else None,
+        llm_module.peek_llm_kvcache_service() if llm_module is not None else None,
+    ]
+    return [service for service in services if service is not None]
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller(store: Optional[SessionStore] = None) -> Optional[AdmissionController]:
+    """The worker's admission controller, or None if ADMISSION_ENABLED is off."""
+    global _controller
+    if _controller is None and settings.admission_enabled:
+        _controller = AdmissionController(
+            store=store,
+            interval=settings.admission_sample_interval_ms / 1000,
+            targets={
+                "asr_queue_ms": settings.admission_asr_queue_ms_target,
+                "loop_lag_ms": settings.admission_loop_lag_ms_target,
+                "llm_in_flight": settings.admission_llm_in_flight_target,
+                "cpu_load": settings.admission_cpu_load_target,
+                "gpu_util": settings.admission_gpu_util_target,
+            },
+            degrade_at=settings.admission_degrade_at,
+            shed_at=settings.admission_shed_at,
+            retry_after=settings.admission_retry_after_seconds,
+            advertise_url=settings.admission_advertise_url,
+        )
+    return _controller
+
+
+def peek_admission_controller() -> Optional[AdmissionController]:
+    """The controller if the lifespan created one; never creates it."""
+    return _controller
+
+
+def _collect_admission_metrics():
+    if _controller is None:
+        return []
+    signals = MetricFamily("saletech_admission_signal", "gauge", "Latest admission load signals.")
+    for name, value in _controller.signals.items():
+        if value is not None:
+            signals.add(value, {"signal": name})
+    mode = MetricFamily("saletech_admission_mode", "gauge", "Current admission mode (1 = active).")
+    for name in MODES:
+        mode.add(1.0 if _controller.mode == name else 0.0, {"mode": name})
+    return [
+        gauge("saletech_admission_pressure", "Largest load signal / target ratio.", _controller.pressure),
+        signals,
+        mode,
+        counter("saletech_admission_admitted_total", "New sessions admitted.", _controller.admitted),
+        counter("saletech_admission_rejected_total", "New sessions refused with retry-after.", _controller.rejected),
+    ]
+
+
+register_collector("admission", _collect_admission_metrics)
@@ -1,20 +1,44 @@
 import asyncio
+import sys
 import uuid
 import time
-from typing import Optional
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
 from datetime import datetime
+
+from config.settings import settings
 from ..models.schemas import (
-    SessionState,ConversationMessage,SessionMetrics
+    SessionState,ConversationMessage,MessageRole,SessionMetrics
 )
-from ..services.vad_adv_service import VADService
-from ..services.streaming_asr import StreamingASR
-from saletech.core import session_manager
 from ..utils.logger import SessionLogger
+from saletech.core.stages import END, StageQueue
+from saletech.media.codecs import to_float32
+from saletech.utils.tracing import SessionTracer, UtteranceTrace
+
+if TYPE_CHECKING:
+    from ..media.buffer.frame_chunking import AudioIngressBuffer
 
 from ..utils.logger import get_logger
 
 logger= get_logger("Saletech.session")
 
+OutputHandler = Callable[[str], Awaitable[None]]
+
+
+class _Reply:
+    """One assistant reply on its way out; `done` resolves with the chunks actually spoken."""
+
+    __slots__ = ("trace", "spoken", "cancelled_at", "done")
+
+    def __init__(self, trace: UtteranceTrace):
+        self.trace = trace
+        self.spoken: list[str] = []
+        self.cancelled_at: Optional[float] = None
+        self.done: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancelled_at is not None
+
 
 class VoiceSession:
     """
@@ -25,28 +49,53 @@ class VoiceSession:
     def __init__(
             self,
             session_id:str,
-            customer_name: Optional[str] = None
+            customer_name: Optional[str] = None,
+            metadata: Optional[dict] = None
             ):
         
         self.session_id = session_id
         self.customer_name = customer_name 
+        self.metadata = metadata or {}
 
         #atate
         self.state = SessionState.IDLE
-        self.created_at = datetime.now
-        self.last_activity = datetime.now
+        self.created_at = datetime.now()
+        self.last_active = self.created_at
 
         #conversation
         self.conversation: list[ConversationMessage]=[]
         self.metrics =  SessionMetrics(session_id=session_id)
+        self.tracer = SessionTracer(session_id, metrics=self.metrics)
 
         #services
         self._vad_service = None
         self._asr_service = None
+        self._llm_service = None
+
+        #audio in, response chunks out, and the stage queues between them
+        self.ingress: Optional["AudioIngressBuffer"] = None
+        self.on_output: Optional[OutputHandler] = None
+        self._segmenter = None
+        self._queues: dict = {}
+
+        #reply being spoken, the output call in flight, and barge-in tracking
+        self._reply: Optional[_Reply] = None
+        self._speaking: Optional[asyncio.Task] = None
+        self._speaking_since = 0.0
+        self._barge_in_onset: Optional[float] = None
+        self._barge_in_ms = 0.0
+
+        #persistence hooks, set by the session manager
+        self.on_state: Optional[Callable[["VoiceSession"], None]] = None
+        self.on_message: Optional[Callable[["VoiceSession", ConversationMessage], None]] = None
+        #called with the session id for every frame the VAD takes (idle tracking)
+        self.on_audio: Optional[Callable[[str], None]] = None
+
+        #transcription pipeline feeding this session, if any
+        self.pipeline = None
 
         #control
         self._running = False
-        self_state_lock = asyncio.Lock()
         self._main_task: Optional[asyncio.Task] = None
 
         self.logger = SessionLogger(session_id)
@@ -56,25 +105,420 @@ class VoiceSession:
             customer_name=customer_name
             )
         
-    async def start(self):
+    def snapshot(self) -> dict:
+        """Persisted fields for the session store (history is stored separately)."""
+        return {
+            "state": self.state.value,
+            "customer_name": self.customer_name,
+            "metadata": self.metadata,
+            "created_at": self.created_at.timestamp(),
+            "last_active": self.last_active.timestamp(),
+        }
+
+    @classmethod
+    def restore(cls, session_id: str, record: dict, history: list) -> "VoiceSession":
+        """Rebuild a session persisted by another worker or before a restart."""
+        session = cls(
+            session_id=session_id,
+            customer_name=record.get("customer_name"),
+            metadata=record.get("metadata"),
+        )
+        session.state = SessionState(record.get("state", SessionState.IDLE.value))
+        if "created_at" in record:
+            session.created_at = datetime.fromtimestamp(record["created_at"])
+        if "last_active" in record:
+            session.last_active = datetime.fromtimestamp(record["last_active"])
+        session.conversation = list(history)
+        return session
+
+    # ------------------------------------------------------------------
+    # state and history (the session manager persists both via the hooks)
+
+    def set_state(self, state: SessionState) -> None:
+        self.state = state
+        self.last_active = datetime.now()
+        if self.on_state is not None:
+            self.on_state(self)
+
+    def add_message(self, message: ConversationMessage) -> None:
+        self.conversation.append(message)
+        self.last_active = datetime.now()
+        if self.on_message is not None:
+            self.on_message(self, message)
+
+    # ------------------------------------------------------------------
+
+    async def start(self, ingress: "AudioIngressBuffer", on_output: Optional[OutputHandler] = None):
         """
-        Start session with all advanced features.
+        Start the conversation loop reading audio from `ingress`.
+
+        Response chunks (speakable sentences) are passed to `on_output` in
+        order, e.g. to a TTS engine or the client socket.
         """
         if self._running:
             return
-        
-        # loading services (singleton)
-        self._vad_service = await VADService()
-        self._asr_service= await StreamingASR()
 
-        self._running = True
-        self._main_task = asyncio.create_task(self._audio_loop())
-        logger.info("session_started.", session_id=self.session_id)
-        logger.info("session_started.",session_id=self.session_id)
+        # loading services; imported here so the API process does not pay
+        # for the ML stack until a session actually starts. Services set
+        # beforehand (e.g. in tests) are kept.
+        if self._vad_service is None:
+            from ..services.vad_adv_service import VADService
+            vad_service = VADService()  # per session: holds the turn-taking state
+            await vad_service.initialize()
+            self._vad_service = vad_service
+        if self._asr_service is None:
+            from ..services.streaming_asr import get_asr_service
+            self._asr_service = await get_asr_service()
+        if self._llm_service is None:
+            from ..services.llm import get_llm_kvcache_service
+            self._llm_service = await get_llm_kvcache_service()
 
+        from ..media.buffer.StreamingVadBuffer import StreamingBuffer
+        self._segmenter = StreamingBuffer()
 
+        self.ingress = ingress
+        self.on_output = on_output
+        self._running = True
+        self.set_state(SessionState.LISTENING)
+        self._main_task = asyncio.create_task(self._audio_loop(), name=f"session-{self.session_id}")
+        logger.info("session_started", session_id=self.session_id)
+
+    async def stop(self) -> None:
+        """Stop taking audio and let queued utterances finish."""
+        if self.ingress is not None:
+            self.ingress.close()
+        if self._main_task is not None:
+            await self._main_task
 
     async def _audio_loop(self):
-        # ...existing code or placeholder...
-        pass
+        """
+        Run the conversation as concurrent stages joined by bounded queues:
+
+            ingress -> vad -> segment -> asr -> llm -> output
+
+        Design:
+        - each stage is its own task, so ASR of utterance N runs while VAD
+          and segmentation are already consuming utterance N+1, and the LLM
+          streams a reply while the next utterance is transcribed
+        - queues are bounded (SESSION_*_QUEUE_SIZE): a slow stage stalls the
+          one before it, and ultimately the ingress buffer drops its oldest
+          frames instead of the session growing without limit
+        - closing the ingress buffer ends the loop: each stage flushes and
+          passes END downstream, so queued utterances are still answered
+        - the VAD stage reads ingress directly, ahead of every queue, so it
+          notices the caller talking over a reply (barge-in) within a frame
+        - a failure on one item is logged and counted; the stage carries on
+        """
+        self._queues = {
+            "segment": StageQueue("segment", settings.session_vad_queue_size),
+            "asr": StageQueue("asr", settings.session_utterance_queue_size),
+            "llm": StageQueue("llm", settings.session_transcript_queue_size),
+            "output": StageQueue("output", settings.session_output_queue_size),
+        }
+        tasks = [
+            asyncio.create_task(self._vad_stage(self._queues["segment"]), name=f"{self.session_id}-vad"),
+            asyncio.create_task(
+                self._segment_stage(self._queues["segment"], self._queues["asr"]), name=f"{self.session_id}-segment"
+            ),
+            asyncio.create_task(
+                self._asr_stage(self._queues["asr"], self._queues["llm"]), name=f"{self.session_id}-asr"
+            ),
+            asyncio.create_task(
+                self._llm_stage(self._queues["llm"], self._queues["output"]), name=f"{self.session_id}-llm"
+            ),
+            asyncio.create_task(self._output_stage(self._queues["output"]), name=f"{self.session_id}-output"),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._running = False
+            logger.info(
+                "session_audio_loop_stopped",
+                session_id=self.session_id,
+                queues={name: queue.metrics for name, queue in self._queues.items()},
+            )
+
+    async def _vad_stage(self, out: StageQueue) -> None:
+        try:
+            while True:
+                frame = await self.ingress.get()
+                if frame is None:
+                    if self.ingress.closed:
+                        return
+                    continue  # timeout: no audio yet
+
+                pcm, timestamp = frame
+                if self.on_audio is not None:
+                    self.on_audio(self.session_id)
+                audio = to_float32(pcm)
+                vad_started = time.perf_counter()
+                try:
+                    is_speech, confidence, is_eot, _ = self._vad_service.detect_speech(audio)
+                except Exception:
+                    logger.error("session_vad_failed", session_id=self.session_id, exc_info=True)
+                    continue
+                vad_ms = (time.perf_counter() - vad_started) * 1000
+                self.tracer.record_vad_frame(vad_ms)
+                self._check_barge_in(is_speech, confidence, len(audio), vad_started)
+                await out.put((audio, timestamp, is_speech, is_eot, vad_started, vad_ms))
+        finally:
+            await out.put(END)
+
+    async def _segment_stage(self, source: StageQueue, out: StageQueue) -> None:
+        trace: Optional[UtteranceTrace] = None
+        while True:
+            item = await source.get()
+            started = time.perf_counter()
+
+            if item is END:
+                result = self._segmenter.flush(time.time())
+                if result is not None:
+                    trace = self._finalize_trace(trace, started)
+                    await out.put((result[0], result[1], trace))
+                await out.put(END)
+                return
+
+            audio, timestamp, is_speech, is_eot, vad_started, vad_ms = item
+            try:
+                if is_speech and trace is None:
+                    trace = self.tracer.start_utterance()
+                    trace.mark("speech_start", vad_started)
+                if trace is not None:
+                    trace.add("vad", vad_ms)
+
+                result = self._segmenter.add_frame(
+                    audio=audio, is_speech=is_speech, is_eot=is_eot, timestamp=timestamp
+                )
+                if result is None:
+                    if is_eot:
+                        trace = None  # too short: the buffer dropped it
+                else:
+                    utterance = (result[0], result[1], self._finalize_trace(trace, started))
+                    trace = None
+                    await out.put(utterance)
+            except Exception:
+                source.record_error()
+                logger.error("session_segment_failed", session_id=self.session_id, exc_info=True)
+            source.record((time.perf_counter() - started) * 1000)
+
+    def _finalize_trace(self, trace: Optional[UtteranceTrace], eot_at: float) -> UtteranceTrace:
+        trace = trace or self.tracer.start_utterance()
+        trace.mark("eot", eot_at)
+        trace.add("finalize", (time.perf_counter() - eot_at) * 1000)
+        trace.between("speech", "speech_start", "eot")
+        return trace
+
+    async def _asr_stage(self, source: StageQueue, out: StageQueue) -> None:
+        while True:
+            item = await source.get()
+            if item is END:
+                await out.put(END)
+                return
+
+            audio, buffer_meta, trace = item
+            started = time.perf_counter()
+            try:
+                with trace.activate():
+                    result = await self._asr_service.transcribe(audio=audio, session_id=self.session_id)
+                trace.mark("transcript")
+                trace.between("eot_to_transcript", "eot", "transcript")
+
+                text = result.text.strip()
+                if text:
+                    logger.info(
+                        "utterance_transcribed",
+                        session_id=self.session_id,
+                        duration_ms=buffer_meta["duration_ms"],
+                        confidence=result.confidence,
+                    )
+                    await out.put((text, trace))
+                else:
+                    self.tracer.finish(trace)
+            except Exception:
+                source.record_error()
+                logger.error("session_asr_failed", session_id=self.session_id, exc_info=True)
+            source.record((time.perf_counter() - started) * 1000)
+
+    async def _llm_stage(self, source: StageQueue, out: StageQueue) -> None:
+        while True:
+            item = await source.get()
+            if item is END:
+                await out.put(END)
+                return
+
+            text, trace = item
+            started = time.perf_counter()
+            self.add_message(ConversationMessage(role=MessageRole.USER, content=text))
+            self.set_state(SessionState.PROCESSING)
+
+            reply = self._reply = _Reply(trace)
+            try:
+                with trace.activate():
+                    async for chunk in self._llm_service.generate_sentences(
+                        session_id=self.session_id,
+                        conversation_history=self.conversation,
+                        customer_name=self.customer_name,
+                    ):
+                        # After a barge-in keep draining: the model stops at its
+                        # next token and leaves the KV cache consistent.
+                        if not reply.cancelled:
+                            await out.put((reply, chunk))
+            except Exception:
+                source.record_error()
+                logger.error("session_llm_failed", session_id=self.session_id, exc_info=True)
+            if not reply.cancelled:
+                await out.put((reply, None))  # end of this reply
+
+            # The next turn must see only what the caller actually heard.
+            spoken = " ".join(await reply.done)
+            self._reply = None
+            if spoken:
+                self.add_message(ConversationMessage(role=MessageRole.ASSISTANT, content=spoken))
+            if reply.cancelled:
+                trace.add("barge_in_llm_stop", (time.perf_counter() - reply.cancelled_at) * 1000)
+                self._llm_service.truncate_session_cache(self.session_id, spoken)
+                self.tracer.finish(trace)
+                # The cancelled reply never reaches the output stage's LISTENING.
+                self.set_state(SessionState.LISTENING)
+            source.record((time.perf_counter() - started) * 1000)
+
+    async def _output_stage(self, source: StageQueue) -> None:
+        while True:
+            item = await source.get()
+            if item is END:
+                return
+
+            reply, chunk = item
+            if reply.cancelled:
+                continue
+            started = time.perf_counter()
+            if chunk is None:
+                self.tracer.finish(reply.trace)
+                self.set_state(SessionState.LISTENING)
+                reply.done.set_result(reply.spoken)
+                continue
+
+            if not reply.spoken:
+                reply.trace.mark("first_output")
+                reply.trace.between("eot_to_first_output", "eot", "first_output")
+                self._speaking_since = time.perf_counter()
+                self.set_state(SessionState.SPEAKING)
+            if self.on_output is not None:
+                # Own task, so a barge-in can cut the chunk off mid-synthesis.
+                speaking = self._speaking = asyncio.create_task(self.on_output(chunk))
+                try:
+                    await asyncio.wait((speaking,))
+                finally:
+                    speaking.cancel()
+                    self._speaking = None
+                if speaking.cancelled():
+                    continue
+                if speaking.exception() is not None:
+                    source.record_error()
+                    logger.error(
+                        "session_output_failed", session_id=self.session_id, exc_info=speaking.exception()
+                    )
+                    continue
+            reply.spoken.append(chunk)
+            source.record((time.perf_counter() - started) * 1000)
+
+    # ------------------------------------------------------------------
+    # barge-in
+
+    def _check_barge_in(self, is_speech: bool, confidence: float, samples: int, at: float) -> None:
+        """
+        Called for every VAD frame: the caller talking over a reply for
+        BARGE_IN_DELAY_MS of confident speech interrupts it.
+
+        BARGE_IN_ENERGY_THRESHOLD gates on the VAD speech probability, stricter
+        than VAD_THRESHOLD, so echo of our own audio does not interrupt; the
+        first BARGE_IN_GRACE_PERIOD_MS of a reply are ignored for the same reason.
+        """
+        if (
+            not settings.barge_in_enabled
+            or self.state != SessionState.SPEAKING
+            or not is_speech
+            or confidence < settings.barge_in_energy_threshold
+            or (at - self._speaking_since) * 1000 < settings.barge_in_grace_period_ms
+        ):
+            self._barge_in_onset = None
+            return
+
+        if self._barge_in_onset is None:
+            self._barge_in_onset = at
+            self._barge_in_ms = 0.0
+        self._barge_in_ms += samples * 1000 / settings.sample_rate
+        if self._barge_in_ms >= settings.barge_in_delay_ms:
+            onset, self._barge_in_onset = self._barge_in_onset, None
+            self._barge_in(onset)
+
+    def _barge_in(self, onset: float) -> None:
+        """Silence the reply now; the LLM stage trims history and KV cache once generation stops."""
+        reply = self._reply
+        if reply is None or reply.cancelled or reply.done.done():
+            return
+
+        reply.cancelled_at = time.perf_counter()
+        self._llm_service.cancel_generation(self.session_id)
+        dropped = self._queues["output"].clear()
+        if self._speaking is not None:
+            self._speaking.cancel()
+        reply.done.set_result(list(reply.spoken))
+
+        reaction_ms = (time.perf_counter() - onset) * 1000
+        reply.trace.add("barge_in", reaction_ms)
+        self.metrics.interruptions += 1
+        self.metrics.barge_in_latencies_ms.record(reaction_ms)
+        self.set_state(SessionState.INTERUPTED)
+
+        log = logger.warning if reaction_ms > settings.barge_in_target_ms else logger.info
+        log(
+            "barge_in",
+            session_id=self.session_id,
+            reaction_ms=reaction_ms,
+            chunks_spoken=len(reply.spoken),
+            chunks_dropped=dropped,
+        )
+
+
+    async def close(self) -> dict:
+        """
+        Release everything the session holds: its audio task, buffered
+        audio, transcript writer and the LLM's KV cache for this session.
+
+        Returns what was reclaimed, for the reaper's report.
+        """
+        released = {"kv_cache_bytes": 0, "buffer_bytes": 0, "writers_closed": 0, "tasks_cancelled": 0}
+
+        self._running = False
+        if self._main_task is not None and not self._main_task.done():
+            self._main_task.cancel()
+            released["tasks_cancelled"] += 1
+        self._main_task = None
+        self._vad_service = None
+        self._asr_service = None
+        self._llm_service = None
+        if self.ingress is not None:
+            self.ingress.close()
+        if self._segmenter is not None:
+            released["buffer_bytes"] += self._segmenter.release()
+            self._segmenter = None
+
+        if self.pipeline is not None:
+            pipeline_released = await self.pipeline.shutdown()
+            released["buffer_bytes"] += pipeline_released["buffer_bytes"]
+            released["writers_closed"] += pipeline_released["writers_closed"]
+            self.pipeline = None
+
+        # Only if this worker loaded the LLM; never import torch for cleanup.
+        llm_module = sys.modules.get("saletech.services.llm")
+        llm = llm_module.peek_llm_kvcache_service() if llm_module is not None else None
+        if llm is not None:
+            llm.cancel_generation(self.session_id)
+            released["kv_cache_bytes"] = llm.clear_session_cache(self.session_id)
 
+        self.tracer.close()
+        return released
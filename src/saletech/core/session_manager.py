@@ -1,64 +1,254 @@
 import asyncio
+import heapq
+import time
 import uuid
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
 from saletech.core.session import VoiceSession as Session
+from saletech.core.admission import AdmissionController, AdmissionDecision
+from saletech.core.session_store import SessionStore, get_session_store
+from saletech.models.schemas import ConversationMessage
 from saletech.models.schemas import SessionState
 
 from config.settings import settings
-from saletech.utils.logger import setup_logging
+from saletech.utils.errors import SessionRejectedError
+from saletech.utils.logger import get_logger
 
-logger = setup_logging()
+logger = get_logger("saletech.session_manager")
+
+
+class _Shard:
+    __slots__ = ("sessions", "lock")
 
-class SessionManager:
     def __init__(self):
-        self._sessions: Dict[str, Session] = {}
-        self._lock = asyncio.Lock()
+        self.sessions: Dict[str, Session] = {}
+        self.lock = asyncio.Lock()
+
+
+class SessionManager:
+    """
+    Registry of live sessions for one worker.
+
+    Design:
+    - sessions are spread over shards by id; create/close take only their
+      shard's lock, so they never queue behind unrelated sessions
+    - reads (get_session, update_state) take no lock: a dict lookup has no
+      await point, so it cannot observe a half-applied mutation
+    - idle expiry uses a min-heap of (last_active, session_id) with one
+      entry per session; touching a session only updates `_last_active`
+      and stale heap entries are re-pushed when they surface, so a sweep
+      costs O(expired + touched since last sweep), not O(all sessions).
+      Incoming audio touches: the session's VAD stage per frame, and
+      /ws/transcribe per message for the pipeline its session owns
+    - state and history are persisted to a SessionStore (memory or Redis);
+      a session unknown to this worker is restored from it on first access,
+      so sessions survive worker restarts and can move between workers.
+      State changes and new messages are buffered by the store, never a
+      round-trip per frame
+    - new sessions go through admission control (live load, then
+      max_sessions); a refusal carries retry-after and a preferred-worker
+      hint. Resumed sessions are not subject to it
+    """
+
+    def __init__(
+        self,
+        shards: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+        store: Optional[SessionStore] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        self._shards = [_Shard() for _ in range(max(1, shards or settings.session_shards))]
+        self.max_sessions = max_sessions if max_sessions is not None else settings.max_sessions
+        self._count = 0
+        # Monotonic last activity per session; the heap may lag behind it.
+        self._last_active: Dict[str, float] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self.store = store if store is not None else get_session_store()
+        self.admission = admission
+
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def touch(self, session_id: str) -> None:
+        """Mark a session active; O(1), the expiry heap is fixed up lazily."""
+        if session_id in self._last_active:
+            self._last_active[session_id] = time.monotonic()
+
+    async def _admit(self) -> None:
+        at_capacity = self._count >= self.max_sessions
+        if self.admission is not None:
+            decision = await self.admission.check(at_capacity=at_capacity)
+        elif at_capacity:
+            decision = AdmissionDecision(
+                False, reason="capacity", retry_after=int(settings.admission_retry_after_seconds)
+            )
+        else:
+            return
+        if not decision.admitted:
+            logger.warning("session_rejected", **decision.to_dict())
+            raise SessionRejectedError(
+                "Max session limit reached" if decision.reason == "capacity" else "Worker overloaded",
+                context=decision.to_dict(),
+            )
 
     async def create_session(self, metadata: Optional[dict] = None) -> Session:
-        async with self._lock:
-            if len(self._sessions) >= settings.max_sessions:
-                raise RuntimeError("Max session limit reached")
+        await self._admit()
+
+        session_id = str(uuid.uuid4())
+        shard = self._shard(session_id)
+        async with shard.lock:
+            if self._count >= self.max_sessions:
+                # Another create won the last slot while we were admitted.
+                raise SessionRejectedError(
+                    "Max session limit reached",
+                    context={"reason": "capacity", "retry_after": int(settings.admission_retry_after_seconds)},
+                )
 
-            session_id = str(uuid.uuid4())
             session = Session(
                 session_id=session_id,
                 metadata=metadata or {}
             )
 
-            self._sessions[session_id] = session
-            # logger.info(f"Session created: {session_id}")
-            # logger.debug(f"Active sessions: {list(self._sessions.keys())}")
-            return session
-    
+            self._register(shard, session)
+
+        await self.store.save(session_id, session.snapshot())
+        return session
+
+    def _register(self, shard: _Shard, session: Session) -> None:
+        shard.sessions[session.session_id] = session
+        self._count += 1
+        now = time.monotonic()
+        self._last_active[session.session_id] = now
+        heapq.heappush(self._expiry, (now, session.session_id))
+        # The session's own audio loop changes state and history too, and
+        # every frame it takes keeps it from expiring.
+        session.on_state = self._persist_state
+        session.on_message = self._persist_message
+        session.on_audio = self.touch
+
+    def _persist_state(self, session: Session) -> None:
+        self._last_active[session.session_id] = time.monotonic()
+        self.store.touch(
+            session.session_id,
+            {"state": session.state.value, "last_active": session.last_active.timestamp()},
+        )
+
+    def _persist_message(self, session: Session, message: ConversationMessage) -> None:
+        self._last_active[session.session_id] = time.monotonic()
+        self.store.append_history(session.session_id, [message])
+        self.store.touch(session.session_id, {"last_active": session.last_active.timestamp()})
+
     async def get_session(self, session_id: str) -> Optional[Session]:
-        async with self._lock:
-            return self._sessions.get(session_id)
+        shard = self._shard(session_id)
+        session = shard.sessions.get(session_id)
+        if session is not None:
+            return session
+
+        # Not live here: resume it from the store if another worker (or this
+        # one before a restart) persisted it.
+        record = await self.store.load(session_id)
+        if record is None:
+            return None
+        history = await self.store.load_history(session_id)
+        async with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is None:
+                session = Session.restore(session_id, record, history)
+                self._register(shard, session)
+                logger.info("session_restored", session_id=session_id, messages=len(history))
+        return session
 
     async def update_state(self, session_id: str, new_state: SessionState):
-        async with self._lock:
-            session = self._sessions.get(session_id)
-            if not session:
-                return
-            session.state = new_state
-            session.last_active = datetime.now()
+        session = self._shard(session_id).sessions.get(session_id)
+        if not session:
+            return
+        session.set_state(new_state)
+
+    async def add_message(self, session_id: str, message: ConversationMessage) -> None:
+        """Append a turn to the session's history (persisted with the next flush)."""
+        session = self._shard(session_id).sessions.get(session_id)
+        if not session:
+            return
+        session.add_message(message)
 
     async def close_session(self, session_id: str):
-        async with self._lock:
-            session = self._sessions.pop(session_id, None)
+        shard = self._shard(session_id)
+        async with shard.lock:
+            session = self._remove(shard, session_id)
+        await self.store.delete(session_id)
+        if session:
+            await self._release(session)
+            logger.info("session_closed", session_id=session_id)
+
+    def _remove(self, shard: _Shard, session_id: str) -> Optional[Session]:
+        session = shard.sessions.pop(session_id, None)
+        if session is not None:
+            self._count -= 1
+            session.on_state = session.on_message = session.on_audio = None
+            # The heap entry is dropped when it reaches the top.
+            self._last_active.pop(session_id, None)
+        return session
+
+    async def close_all_sessions(self) -> None:
+        """
+        Worker shutdown: release every live session so writers commit and
+        caches drop. Persisted state is kept, so the sessions can resume.
+        """
+        for shard in self._shards:
+            for session_id in list(shard.sessions):
+                async with shard.lock:
+                    session = self._remove(shard, session_id)
+                if session:
+                    await self._release(session)
+        await self.store.flush()
+
+    async def _release(self, session: Session) -> dict:
+        session.state = SessionState.TERMINATED
+        try:
+            return await session.close()
+        except Exception:
+            # One broken session must not stop a sweep or leak the others.
+            logger.error("session_release_failed", session_id=session.session_id, exc_info=True)
+            return {}
+
+    def _pop_expired(self, cutoff: float) -> List[str]:
+        expired = []
+        heap = self._expiry
+        while heap and heap[0][0] <= cutoff:
+            stamp, session_id = heapq.heappop(heap)
+            current = self._last_active.get(session_id)
+            if current is None:
+                continue  # closed since it was pushed
+            if current > stamp:
+                heapq.heappush(heap, (current, session_id))  # touched since
+                continue
+            expired.append(session_id)
+        return expired
+
+    async def cleanup_inactive_sessions(
+        self, timeout_seconds: float = 300, now: Optional[float] = None
+    ) -> Dict[str, dict]:
+        """
+        Close sessions idle for longer than `timeout_seconds` and release
+        their resources; returns {session_id: what was released}.
+        """
+        cutoff = (time.monotonic() if now is None else now) - timeout_seconds
+        released: Dict[str, dict] = {}
+
+        for session_id in self._pop_expired(cutoff):
+            shard = self._shard(session_id)
+            async with shard.lock:
+                current = self._last_active.get(session_id)
+                if current is not None and current > cutoff:
+                    # Touched while we waited for the shard lock.
+                    heapq.heappush(self._expiry, (current, session_id))
+                    continue
+                session = self._remove(shard, session_id)
             if session:
-                session.state = SessionState.CLOSED
-                logger.info(f"Session closed: {session_id}")
-
-    async def cleanup_inactive_sessions(self, timeout_seconds: int = 300):
-        async with self._lock:
-            now = datetime.now()
-            to_remove = [
-                sid for sid, s in self._sessions.items()
-                if (now - s.last_active) > timedelta(seconds=timeout_seconds)
-            ]
-
-            for sid in to_remove:
-                self._sessions.pop(sid)
-                logger.info(f"Session expired: {sid}")
\ No newline at end of file
+                await self.store.delete(session_id)
+                released[session_id] = await self._release(session)
+                logger.info("session_expired", session_id=session_id)
+        return released
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from typing import Optional
+
+from config.settings import settings
+from saletech.core.session_manager import SessionManager
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.logger import get_logger
+from saletech.utils.metrics import counter, gauge, histogram, register_collector
+
+
+logger = get_logger("saletech.session_reaper")
+
+
+class SessionReaper:
+    """
+    Lifespan task that expires idle sessions on a schedule.
+
+    Design:
+    - every `interval_seconds` it asks the manager for sessions idle longer
+      than `timeout_seconds`; the manager's expiry heap keeps a sweep
+      proportional to what expires, so a short interval is cheap
+    - each expired session is closed through VoiceSession.close(), which
+      cancels its task, drops buffered audio, closes its transcript writer
+      and clears its LLM KV cache
+    - every sweep that reclaims anything is logged with the bytes and
+      handles released; totals are exported on /metrics
+    """
+
+    def __init__(self, manager: SessionManager, interval_seconds: float, timeout_seconds: float):
+        self.manager = manager
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self._task: Optional[asyncio.Task] = None
+
+        self.sweeps = 0
+        self.sessions_reaped = 0
+        self.bytes_reclaimed = 0
+        self.handles_closed = 0
+        self.last_sweep: Optional[dict] = None
+        self.sweep_ms = LatencyHistogram()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="saletech-session-reaper")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.error("session_reaper_sweep_failed", exc_info=True)
+
+    async def sweep(self, now: Optional[float] = None) -> dict:
+        start = time.perf_counter()
+        released = await self.manager.cleanup_inactive_sessions(self.timeout_seconds, now=now)
+
+        report = {
+            "sessions": len(released),
+            "kv_cache_bytes": sum(r.get("kv_cache_bytes", 0) for r in released.values()),
+            "buffer_bytes": sum(r.get("buffer_bytes", 0) for r in released.values()),
+            "writers_closed": sum(r.get("writers_closed", 0) for r in released.values()),
+            "tasks_cancelled": sum(r.get("tasks_cancelled", 0) for r in released.values()),
+            "active_sessions": len(self.manager),
+        }
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.sweeps += 1
+        self.sweep_ms.record(elapsed_ms)
+        self.sessions_reaped += report["sessions"]
+        self.bytes_reclaimed += report["kv_cache_bytes"] + report["buffer_bytes"]
+        self.handles_closed += report["writers_closed"] + report["tasks_cancelled"]
+        self.last_sweep = report
+
+        if released:
+            logger.info("sessions_reaped", duration_ms=round(elapsed_ms, 2), **report)
+        return report
+
+
+_reaper: Optional[SessionReaper] = None
+
+
+def get_session_reaper(manager: SessionManager) -> SessionReaper:
+    global _reaper
+    if _reaper is None or _reaper.manager is not manager:
+        _reaper = SessionReaper(
+            manager,
+            interval_seconds=settings.session_reap_interval_seconds,
+            timeout_seconds=settings.session_timeout_seconds,
+        )
+    return _reaper
+
+
+def _collect_reaper_metrics():
+    if _reaper is None:
+        return []
+    return [
+        counter("saletech_sessions_reaped_total", "Idle sessions expired by the reaper.", _reaper.sessions_reaped),
+        counter("saletech_session_reclaimed_bytes_total", "KV cache and audio buffer bytes released by the reaper.", _reaper.bytes_reclaimed),
+        counter("saletech_session_reclaimed_handles_total", "Writers closed and tasks cancelled by the reaper.", _reaper.handles_closed),
+        histogram("saletech_session_reaper_sweep_seconds", "Duration of reaper sweeps.", _reaper.sweep_ms),
+        gauge("saletech_sessions_registered", "Sessions held by the session manager.", len(_reaper.manager)),
+    ]
+
+
+register_collector("session_reaper", _collect_reaper_metrics)
@@ -0,0 +1,416 @@
+import asyncio
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+from saletech.models.schemas import ConversationMessage, MessageRole
+from saletech.utils.errors import ConfigurationError, SessionStoreError
+from saletech.utils.logger import get_logger
+from saletech.utils.metrics import counter, gauge, register_collector
+
+
+logger = get_logger("saletech.session_store")
+
+STORE_BACKENDS = ("memory", "redis")
+
+# History is stored as compact JSON arrays: [role, content, epoch_ts(, metadata)]
+_ROLE_CODES = {MessageRole.SYSTEM: "s", MessageRole.USER: "u", MessageRole.ASSISTANT: "a"}
+_CODE_ROLES = {code: role for role, code in _ROLE_CODES.items()}
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def pack_message(message: ConversationMessage) -> str:
+    packed = [_ROLE_CODES[message.role], message.content, round(message.timestamp.timestamp(), 3)]
+    if message.metadata:
+        packed.append(message.metadata)
+    return _dumps(packed)
+
+
+def unpack_message(packed: str) -> ConversationMessage:
+    values = json.loads(packed)
+    return ConversationMessage(
+        role=_CODE_ROLES[values[0]],
+        content=values[1],
+        timestamp=datetime.fromtimestamp(values[2]),
+        metadata=values[3] if len(values) > 3 else None,
+    )
+
+
+class SessionStore:
+    """
+    Persisted state of sessions: a flat record of fields plus conversation
+    history. Every record carries a version that increases on each write.
+
+    `touch` and `append_history` only buffer; they are what the hot path
+    calls. `save`, `delete` and `flush` do the I/O.
+    """
+
+    def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        await self.flush()
+
+    async def save(self, session_id: str, fields: Dict[str, Any]) -> int:
+        raise NotImplementedError
+
+    def touch(self, session_id: str, fields: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def append_history(self, session_id: str, messages: Sequence[ConversationMessage]) -> None:
+        raise NotImplementedError
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The record with its "version", or None."""
+        raise NotImplementedError
+
+    async def load_history(self, session_id: str) -> List[ConversationMessage]:
+        raise NotImplementedError
+
+    async def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    async def flush(self) -> None:
+        pass
+
+    def report_load(self, worker_id: str, load: Dict[str, Any]) -> None:
+        """Publish this worker's load (buffered like touch)."""
+        raise NotImplementedError
+
+    async def worker_loads(self) -> Dict[str, Dict[str, Any]]:
+        """Last load reported by every worker sharing the store."""
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local store; writes apply immediately and nothing survives a restart."""
+
+    def __init__(self, history_limit: int = 200):
+        self.history_limit = history_limit
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._history: Dict[str, List[ConversationMessage]] = {}
+        self._loads: Dict[str, Dict[str, Any]] = {}
+
+    async def save(self, session_id: str, fields: Dict[str, Any]) -> int:
+        self.touch(session_id, fields)
+        return self._records[session_id]["version"]
+
+    def touch(self, session_id: str, fields: Dict[str, Any]) -> None:
+        record = self._records.setdefault(session_id, {"version": 0})
+        record.update(fields)
+        record["version"] += 1
+
+    def append_history(self, session_id: str, messages: Sequence[ConversationMessage]) -> None:
+        history = self._history.setdefault(session_id, [])
+        history.extend(messages)
+        del history[:-self.history_limit]
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(session_id)
+        return dict(record) if record is not None else None
+
+    async def load_history(self, session_id: str) -> List[ConversationMessage]:
+        return list(self._history.get(session_id, ()))
+
+    async def delete(self, session_id: str) -> None:
+        self._records.pop(session_id, None)
+        self._history.pop(session_id, None)
+
+    def report_load(self, worker_id: str, load: Dict[str, Any]) -> None:
+        self._loads[worker_id] = dict(load)
+
+    async def worker_loads(self) -> Dict[str, Dict[str, Any]]:
+        return {worker_id: dict(load) for worker_id, load in self._loads.items()}
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis-backed session store shared by every worker.
+
+    Design:
+    - a record is a hash (one JSON-encoded value per field, plus an integer
+      "v" bumped by HINCRBY on every write); history is a list of packed
+      messages capped with LTRIM
+    - touch/append_history buffer locally; a flusher task writes all dirty
+      sessions in ONE non-transactional pipeline per interval, so frame-rate
+      state changes cost no round-trips of their own
+    - reads go through a local LRU of (version, record): a cached record is
+      revalidated with HGET "v" and reloaded only if another worker wrote
+      since; this worker's own writes update the cache in place
+    - unflushed local changes are overlaid on reads, so a worker always
+      sees its own writes
+    """
+
+    def __init__(
+        self,
+        client,
+        cache_size: int = 1024,
+        flush_interval: float = 0.1,
+        history_limit: int = 200,
+        ttl_seconds: int = 86400,
+        prefix: str = "saletech:session:",
+        workers_key: str = "saletech:workers",
+    ):
+        self.client = client
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.history_limit = history_limit
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.workers_key = workers_key
+
+        self._cache: "OrderedDict[str, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._pending_history: Dict[str, List[ConversationMessage]] = {}
+        self._pending_loads: Dict[str, Dict[str, Any]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.round_trips = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.flush_errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisSessionStore":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ConfigurationError("SESSION_STORE=redis needs the redis package")
+        return cls(redis.from_url(url, decode_responses=True), **kwargs)
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    def _history_key(self, session_id: str) -> str:
+        return self.prefix + session_id + ":history"
+
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="saletech-session-store-flusher")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if close is not None:
+            await close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except SessionStoreError:
+                pass  # logged by flush; the changes stay buffered for the next one
+
+    # ------------------------------------------------------------------
+
+    async def save(self, session_id: str, fields: Dict[str, Any]) -> int:
+        self.touch(session_id, fields)
+        await self.flush()
+        return self._cache[session_id][0] if session_id in self._cache else 0
+
+    def touch(self, session_id: str, fields: Dict[str, Any]) -> None:
+        self._dirty.setdefault(session_id, {}).update(fields)
+
+    def append_history(self, session_id: str, messages: Sequence[ConversationMessage]) -> None:
+        self._pending_history.setdefault(session_id, []).extend(messages)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._dirty and not self._pending_history and not self._pending_loads:
+                return
+            dirty, self._dirty = self._dirty, {}
+            history, self._pending_history = self._pending_history, {}
+            loads, self._pending_loads = self._pending_loads, {}
+
+            pipe = self.client.pipeline(transaction=False)
+            for session_id, fields in dirty.items():
+                key = self._key(session_id)
+                pipe.hset(key, mapping={name: _dumps(value) for name, value in fields.items()})
+                pipe.hincrby(key, "v", 1)
+                pipe.expire(key, self.ttl_seconds)
+            for session_id, messages in history.items():
+                key = self._history_key(session_id)
+                pipe.rpush(key, *(pack_message(m) for m in messages))
+                pipe.ltrim(key, -self.history_limit, -1)
+                pipe.expire(key, self.ttl_seconds)
+            if loads:
+                pipe.hset(self.workers_key, mapping={w: _dumps(load) for w, load in loads.items()})
+
+            try:
+                results = await pipe.execute()
+            except Exception as e:
+                self.flush_errors += 1
+                # Put the changes back under anything written meanwhile.
+                for session_id, fields in dirty.items():
+                    self._dirty[session_id] = {**fields, **self._dirty.get(session_id, {})}
+                for session_id, messages in history.items():
+                    self._pending_history[session_id] = messages + self._pending_history.get(session_id, [])
+                for worker_id, load in loads.items():
+                    self._pending_loads.setdefault(worker_id, load)
+                logger.error("session_store_flush_failed", sessions=len(dirty), error=str(e))
+                raise SessionStoreError(
+                    message="Failed to write session state",
+                    context={"sessions": len(dirty)},
+                    original_exception=e,
+                )
+            self.round_trips += 1
+
+            for n, (session_id, fields) in enumerate(dirty.items()):
+                self._apply_write(session_id, fields, int(results[n * 3 + 1]))
+
+    def _apply_write(self, session_id: str, fields: Dict[str, Any], version: int) -> None:
+        # Our write produced `version`; the cached record is still exact only
+        # if nobody else wrote in between.
+        cached = self._cache.get(session_id)
+        if version == 1:
+            base: Optional[Dict[str, Any]] = {}
+        elif cached is not None and cached[0] == version - 1:
+            base = cached[1]
+        else:
+            base = None
+        if base is None:
+            self._cache.pop(session_id, None)
+        else:
+            self._cache_put(session_id, version, {**base, **fields})
+
+    def _cache_put(self, session_id: str, version: int, record: Dict[str, Any]) -> None:
+        self._cache[session_id] = (version, record)
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        key = self._key(session_id)
+        record = None
+        cached = self._cache.get(session_id)
+        try:
+            if cached is not None:
+                version = await self.client.hget(key, "v")
+                self.round_trips += 1
+                if version is not None and int(version) == cached[0]:
+                    self.cache_hits += 1
+                    self._cache.move_to_end(session_id)
+                    record = {**cached[1], "version": cached[0]}
+            if record is None:
+                self.cache_misses += 1
+                raw = await self.client.hgetall(key)
+                self.round_trips += 1
+                if raw:
+                    version = int(raw.pop("v", 0))
+                    fields = {name: json.loads(value) for name, value in raw.items()}
+                    self._cache_put(session_id, version, fields)
+                    record = {**fields, "version": version}
+                else:
+                    self._cache.pop(session_id, None)
+        except Exception as e:
+            raise SessionStoreError(
+                message="Failed to read session state",
+                context={"session_id": session_id},
+                original_exception=e,
+            )
+
+        pending = self._dirty.get(session_id)
+        if pending:
+            record = {**(record or {"version": 0}), **pending}
+        return record
+
+    async def load_history(self, session_id: str) -> List[ConversationMessage]:
+        try:
+            packed = await self.client.lrange(self._history_key(session_id), 0, -1)
+            self.round_trips += 1
+        except Exception as e:
+            raise SessionStoreError(
+                message="Failed to read session history",
+                context={"session_id": session_id},
+                original_exception=e,
+            )
+        history = [unpack_message(p) for p in packed]
+        history.extend(self._pending_history.get(session_id, ()))
+        return history[-self.history_limit:]
+
+    def report_load(self, worker_id: str, load: Dict[str, Any]) -> None:
+        self._pending_loads[worker_id] = dict(load)
+
+    async def worker_loads(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            raw = await self.client.hgetall(self.workers_key)
+            self.round_trips += 1
+        except Exception as e:
+            raise SessionStoreError(
+                message="Failed to read worker loads",
+                original_exception=e,
+            )
+        return {worker_id: json.loads(load) for worker_id, load in raw.items()}
+
+    async def delete(self, session_id: str) -> None:
+        # Under the flush lock: a flush already holding this session's writes
+        # must land before the DEL, or it would recreate the closed session.
+        async with self._flush_lock:
+            self._dirty.pop(session_id, None)
+            self._pending_history.pop(session_id, None)
+            self._cache.pop(session_id, None)
+            try:
+                await self.client.delete(self._key(session_id), self._history_key(session_id))
+                self.round_trips += 1
+            except Exception as e:
+                raise SessionStoreError(
+                    message="Failed to delete session state",
+                    context={"session_id": session_id},
+                    original_exception=e,
+                )
+
+
+_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """The worker's session store, built from SESSION_STORE on first use."""
+    global _store
+    if _store is None:
+        if settings.session_store not in STORE_BACKENDS:
+            raise ConfigurationError(
+                f"Unknown SESSION_STORE {settings.session_store!r}",
+                context={"options": list(STORE_BACKENDS)},
+            )
+        if settings.session_store == "redis":
+            _store = RedisSessionStore.from_url(
+                settings.redis_url,
+                cache_size=settings.session_cache_size,
+                flush_interval=settings.session_store_flush_interval_ms / 1000,
+                history_limit=settings.session_history_max_messages,
+                ttl_seconds=settings.session_store_ttl_seconds,
+            )
+        else:
+            _store = MemorySessionStore(history_limit=settings.session_history_max_messages)
+    return _store
+
+
+def _collect_store_metrics():
+    if not isinstance(_store, RedisSessionStore):
+        return []
+    return [
+        counter("saletech_session_store_round_trips_total", "Redis round-trips made by the session store.", _store.round_trips),
+        counter("saletech_session_store_cache_hits_total", "Session reads served from the local cache.", _store.cache_hits),
+        counter("saletech_session_store_cache_misses_total", "Session reads that loaded the full record.", _store.cache_misses),
+        counter("saletech_session_store_flush_errors_total", "Failed session store flushes.", _store.flush_errors),
+        gauge("saletech_session_store_dirty_sessions", "Sessions with unflushed state.", len(_store._dirty)),
+    ]
+
+
+register_collector("session_store", _collect_store_metrics)
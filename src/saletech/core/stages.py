@@ -0,0 +1,143 @@
+import asyncio
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.metrics import MetricFamily, counter, register_collector
+
+
+# End-of-stream marker: each stage forwards it downstream and exits.
+END = object()
+
+# Live queues (depth) and worker totals per stage that outlive sessions.
+_live_queues: "weakref.WeakSet[StageQueue]" = weakref.WeakSet()
+_stage_totals: Dict[str, "_StageTotals"] = {}
+
+
+class _StageTotals:
+    __slots__ = ("items", "errors", "put_blocked", "queue_wait_ms", "service_ms")
+
+    def __init__(self):
+        self.items = 0
+        self.errors = 0
+        self.put_blocked = 0
+        self.queue_wait_ms = LatencyHistogram()
+        self.service_ms = LatencyHistogram()
+
+
+def _totals(stage: str) -> _StageTotals:
+    totals = _stage_totals.get(stage)
+    if totals is None:
+        totals = _stage_totals[stage] = _StageTotals()
+    return totals
+
+
+class StageQueue:
+    """
+    Bounded queue feeding one pipeline stage.
+
+    Design:
+    - put() blocks when the queue is full: a slow stage stalls the one
+      before it instead of buffering without limit (backpressure)
+    - items carry their enqueue time, so get() records how long they
+      waited; put() counts how often the producer had to wait
+    - per-stage totals are kept worker-wide for /metrics
+    """
+
+    def __init__(self, stage: str, maxsize: int):
+        self.stage = stage
+        self.maxsize = maxsize
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._totals = _totals(stage)
+        self.max_depth = 0
+        _live_queues.add(self)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    async def put(self, item: Any) -> None:
+        if self._queue.full():
+            self._totals.put_blocked += 1
+        await self._queue.put((item, time.perf_counter()))
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    async def get(self) -> Any:
+        item, enqueued_at = await self._queue.get()
+        if item is not END:
+            self._totals.queue_wait_ms.record((time.perf_counter() - enqueued_at) * 1000)
+        return item
+
+    def record(self, service_ms: float) -> None:
+        """Time the stage spent on one item taken from this queue."""
+        self._totals.items += 1
+        self._totals.service_ms.record(service_ms)
+
+    def record_error(self) -> None:
+        self._totals.errors += 1
+
+    def clear(self) -> int:
+        """Drop queued items (keeping END); returns how many were dropped."""
+        dropped = 0
+        kept_end = False
+        while not self._queue.empty():
+            item, _ = self._queue.get_nowait()
+            if item is END:
+                kept_end = True
+            else:
+                dropped += 1
+        if kept_end:
+            self._queue.put_nowait((END, time.perf_counter()))
+        return dropped
+
+    @property
+    def metrics(self) -> Dict[str, Optional[float]]:
+        return {
+            "depth": self.qsize(),
+            "max_depth": self.max_depth,
+            "capacity": self.maxsize,
+        }
+
+
+def stage_totals() -> Dict[str, Dict[str, Any]]:
+    """Worker-wide per-stage counters and latency summaries."""
+    return {
+        stage: {
+            "items": totals.items,
+            "errors": totals.errors,
+            "put_blocked": totals.put_blocked,
+            "queue_wait_ms": totals.queue_wait_ms.summary(),
+            "service_ms": totals.service_ms.summary(),
+        }
+        for stage, totals in _stage_totals.items()
+    }
+
+
+def _collect_stage_metrics():
+    if not _stage_totals:
+        return []
+    depth = MetricFamily("saletech_stage_queue_depth", "gauge", "Items queued in front of each session stage.")
+    depths: Dict[str, int] = {}
+    for queue in list(_live_queues):
+        depths[queue.stage] = depths.get(queue.stage, 0) + queue.qsize()
+    for stage, value in depths.items():
+        depth.add(value, {"stage": stage})
+
+    wait = MetricFamily("saletech_stage_queue_wait_seconds", "histogram", "Time items wait in front of a stage.")
+    service = MetricFamily("saletech_stage_service_seconds", "histogram", "Time a stage spends per item.")
+    items = counter("saletech_stage_items_total", "Items processed per stage.")
+    errors = counter("saletech_stage_errors_total", "Items a stage failed to process.")
+    blocked = counter("saletech_stage_put_blocked_total", "Puts that waited on a full stage queue.")
+    for stage, totals in _stage_totals.items():
+        labels = {"stage": stage}
+        wait.add_histogram(totals.queue_wait_ms, labels)
+        service.add_histogram(totals.service_ms, labels)
+        items.add(totals.items, labels)
+        errors.add(totals.errors, labels)
+        blocked.add(totals.put_blocked, labels)
+    return [depth, wait, service, items, errors, blocked]
+
+
+register_collector("session_stages", _collect_stage_metrics)
@@ -3,17 +3,17 @@ from saletech.utils.lifespan import lifespan
 from saletech.utils.logger import setup_logging
 from saletech.api.health import router as health_router
 from saletech.api.sessions import router as session_router 
+from saletech.api.metrics import router as metrics_router
 from config.settings import AppSettings
 from fastapi import WebSocket
-from src.saletech.transcriber.router import router as transcriber_router
-from src.saletech.services.streaming_asr import StreamingASR
-from src.saletech.api.exception_handler import (
+from saletech.api.transcriber import router as transcriber_router
+from saletech.api.exception_handler import (
     saletech_exception_handler
 )
-from src.saletech.utils.errors import SaleTechException
+from saletech.utils.errors import SaleTechException
 
 settings = AppSettings()
-logger = setup_logging()
+setup_logging()
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -25,6 +25,7 @@ def create_app() -> FastAPI:
     #routers
     app.include_router(health_router)
     app.include_router(session_router)
+    app.include_router(metrics_router)
     app.include_router(transcriber_router)
 
     app.add_exception_handler(
@@ -35,8 +36,3 @@ def create_app() -> FastAPI:
     return app
 
 app = create_app()
-
-
-@app.on_event("startup")
-async def startup_event():
-    asr = await StreamingASR()
\ No newline at end of file
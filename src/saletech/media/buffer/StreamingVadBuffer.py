@@ -2,8 +2,8 @@ from collections import deque
 import numpy as np 
 from typing import Optional
 from config.settings import AppSettings
-from src.saletech.utils.logger import get_logger
-from src.saletech.utils.errors import AudioProcessingError
+from saletech.utils.logger import get_logger
+from saletech.utils.errors import AudioProcessingError
 
 logger = get_logger("Saletech.audio.speech_window")
 
@@ -196,6 +196,14 @@ class StreamingBuffer:
         return self._finalize_utterance(timestamp or self._last_speech_time)
 
 
+    def release(self) -> int:
+        """Drop all buffered audio (session teardown); returns the bytes freed."""
+        freed = sum(frame.nbytes for frame in self._frame_buffer)
+        freed += sum(frame.nbytes for frame in self._current_utterance)
+        self._frame_buffer.clear()
+        self._reset()
+        return freed
+
     @property
     def metrics(self):
 
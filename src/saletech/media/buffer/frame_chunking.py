@@ -1,12 +1,26 @@
 import asyncio
 import threading
 import time
-from typing import Optional, Tuple
-from src.saletech.utils.logger import get_logger
-from src.saletech.utils.errors import AudioProcessingError
+import weakref
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from saletech.utils.logger import get_logger
+from saletech.utils.errors import AudioProcessingError
+from saletech.utils.metrics import counter, gauge, register_collector
 
 logger=get_logger("saletech.audio.frame_buffer")
 
+# Live buffers (for queue depth) and worker lifetime totals, which
+# survive buffers being closed. Read only by the metrics collector.
+_live_buffers: "weakref.WeakSet[AudioIngressBuffer]" = weakref.WeakSet()
+
+
+class _IngressTotals:
+    attempted = 0
+    dropped = 0
+
 class AudioIngressBuffer:
     """
     Thread-safe raw audio ingestion buffer.
@@ -28,27 +42,28 @@ class AudioIngressBuffer:
         self._frames_received = 0
         self._frames_dropped = 0
         self._last_frame_time = 0.0
-        self._frame_attempted = 0
+        self._frames_attempted = 0
 
         self._shutdown_event = asyncio.Event()
+        _live_buffers.add(self)
 
         logger.info("audio_buffer_initialized",maxsize=max_size)
         
         #INGESTION THREAD SAFE 
-    def put_nowait(self, pcm: bytes, timestamp: Optional[float] = None) -> None:
+    def put_nowait(self, pcm: Union[bytes, np.ndarray], timestamp: Optional[float] = None) -> None:
         """
         Put audio chunk (called from callback thread).
         Args:
-            pcm: Audio data bytes
+            pcm: Audio data bytes (PCM16), or a float32 frame already decoded
             timestamp: Optional timestamp
         """
-        if not isinstance(pcm, (bytes, bytearray)):
+        if not isinstance(pcm, (bytes, bytearray, np.ndarray)):
             logger.error("invalid_audio_frame_type")
             raise AudioProcessingError(
-                "Audio frame must be bytes-like."
+                "Audio frame must be bytes-like or a numpy array."
             )
         
-        if not pcm:
+        if len(pcm) == 0:
             logger.warning("empty_audio_frame_ignored")
             return
         
@@ -60,50 +75,54 @@ class AudioIngressBuffer:
                 logger.warning("Buffer closed, rejecting frame.")
                 return
             
-            self._frame_attempted += 1
-            
+            self._frames_attempted += 1
+            _IngressTotals.attempted += 1
+
         self._loop.call_soon_threadsafe(
             self._enqueue_frame,
             pcm,
             timestamp
         )
 
-        def _enqueue_frame(self,pm:bytes, timestamp:float):
+    def _enqueue_frame(self,pcm:Union[bytes, np.ndarray], timestamp:float):
 
+        try:
+            self._queue.put_nowait((pcm, timestamp))
+            self._frames_received += 1
+            self._last_frame_time = timestamp
+
+        except asyncio.QueueFull:
+
+            # Drop oldest frame if full
             try:
+                _ = self._queue.get_nowait()
                 self._queue.put_nowait((pcm, timestamp))
-                self._frames_received += 1
+                self._frames_dropped += 1
+                _IngressTotals.dropped += 1
                 self._last_frame_time = timestamp
 
-            except asyncio.QueueFull:
-
-                # Drop oldest frame if full
-                try:
-                    _ = self._queue.get_nowait()
-                    self._queue.put_nowait((pcm, timestamp))
-                    self._frames_dropped += 1
-                    self._last_frame_time = timestamp
+                logger.warning("Queue full, dropped oldest frame.",
+                               queue_size=self._queue.qsize(),
+                               )
 
-                    logger.warning("Queue full, dropped oldest frame.",
-                                   queue_size=self._queue.qsize(),
-                                   )
-
-                except Exception :
-                    self._frames_dropped += 1
-                    logger.error("Failed to add frame after dropping.")
+            except Exception :
+                self._frames_dropped += 1
+                _IngressTotals.dropped += 1
+                logger.error("Failed to add frame after dropping.")
 
     #async consumer API
 
-    async def get(self, timeout: float = 0.05) -> Optional[Tuple[bytes, float]]:
+    async def get(self, timeout: float = 0.05) -> Optional[Tuple[Union[bytes, np.ndarray], float]]:
         """
         Async consumer side for ASR/inference.
         Returns:
         - frame tuple
         - None if timeout
-        - None if shutdown sentinel received
+        - None once closed and drained (frames accepted before close()
+          are still delivered)
 
         """
-        if self._shutdown_event.is_set():
+        if self._shutdown_event.is_set() and self._queue.empty():
             logger.info("Shutdown event set, returning None.")
             return None
         
@@ -115,7 +134,7 @@ class AudioIngressBuffer:
         except asyncio.TimeoutError:
             return None
         
-        if item == self.SENTINEL:
+        if item is self.SENTINEL:
             return None
         
         return item
@@ -140,6 +159,10 @@ class AudioIngressBuffer:
         )
         logger.info("Buffer closed and queue cleared.")
 
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
     @property
     def metrics(self) -> dict[str, float]:
 
@@ -152,6 +175,27 @@ class AudioIngressBuffer:
                 if self._frames_attempted else 0.0
             ),
             "queue_size": self._queue.qsize(),
-            "last_frame_ts": self._last_frame_ts,
+            "last_frame_ts": self._last_frame_time,
             "closed": self._closed,
-        }
\ No newline at end of file
+        }
+
+
+def _collect_ingress_metrics():
+    depths = [buffer._queue.qsize() for buffer in list(_live_buffers)]
+    attempted = _IngressTotals.attempted
+    dropped = _IngressTotals.dropped
+    return [
+        gauge("saletech_ingress_buffers", "Open audio ingress buffers.", len(depths)),
+        gauge("saletech_ingress_queue_depth", "Frames queued across ingress buffers.", sum(depths)),
+        gauge("saletech_ingress_queue_depth_max", "Deepest single ingress queue.", max(depths, default=0)),
+        counter("saletech_ingress_frames_total", "Audio frames offered to ingress buffers.", attempted),
+        counter("saletech_ingress_frames_dropped_total", "Audio frames dropped on full ingress queues.", dropped),
+        gauge(
+            "saletech_ingress_drop_ratio",
+            "Lifetime dropped / offered ingress frames.",
+            dropped / attempted if attempted else 0.0,
+        ),
+    ]
+
+
+register_collector("ingress", _collect_ingress_metrics)
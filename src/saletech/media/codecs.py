@@ -0,0 +1,241 @@
+import functools
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from config.settings import settings
+from saletech.utils.errors import ConfigurationError, FramingError
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.logger import get_logger
+from saletech.utils.metrics import MetricFamily, counter, register_collector
+
+logger = get_logger("saletech.audio.codecs")
+
+_PCM16_SCALE = np.float32(1 / 32768)
+
+# Concealed frames after a loss: the last frame repeated, halving in gain
+# each frame, for this many frames; then silence.
+PLC_FADE_FRAMES = 3
+
+
+def _g711_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """ITU-T G.711 mu-law and A-law code -> float32 sample, as 256-entry tables."""
+    codes = np.arange(256, dtype=np.int32)
+
+    ulaw = ~codes & 0xFF
+    exponent = (ulaw >> 4) & 0x07
+    magnitude = ((((ulaw & 0x0F) << 3) + 0x84) << exponent) - 0x84
+    ulaw_samples = np.where(ulaw & 0x80, -magnitude, magnitude)
+
+    alaw = codes ^ 0x55
+    exponent = (alaw >> 4) & 0x07
+    mantissa = (alaw & 0x0F) << 4
+    magnitude = np.where(exponent == 0, mantissa + 8, (mantissa + 0x108) << np.maximum(exponent - 1, 0))
+    alaw_samples = np.where(alaw & 0x80, magnitude, -magnitude)
+
+    return (
+        (ulaw_samples * _PCM16_SCALE).astype(np.float32),
+        (alaw_samples * _PCM16_SCALE).astype(np.float32),
+    )
+
+
+ULAW_TABLE, ALAW_TABLE = _g711_tables()
+_G711_TABLES = {"mulaw": ULAW_TABLE, "alaw": ALAW_TABLE}
+
+
+class _CodecStats:
+    __slots__ = ("decode_ms", "decoded", "concealed", "errors")
+
+    def __init__(self):
+        self.decode_ms = LatencyHistogram()
+        self.decoded = 0
+        self.concealed = 0
+        self.errors = 0
+
+
+_codec_stats: Dict[str, _CodecStats] = {}
+
+
+def _stats(codec: str) -> _CodecStats:
+    stats = _codec_stats.get(codec)
+    if stats is None:
+        stats = _codec_stats[codec] = _CodecStats()
+    return stats
+
+
+def pcm16_to_float32(pcm: bytes, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Little-endian int16 PCM -> float32 in [-1, 1), scaled in one pass."""
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    if out is None:
+        out = np.empty(len(samples), dtype=np.float32)
+    return np.multiply(samples, _PCM16_SCALE, out=out, dtype=np.float32)
+
+
+def to_float32(frame: Union[bytes, np.ndarray]) -> np.ndarray:
+    """An ingress frame as float32: decoded frames already are, raw PCM16 is converted."""
+    if isinstance(frame, np.ndarray):
+        return frame
+    return pcm16_to_float32(frame)
+
+
+def encode_g711(audio: np.ndarray, codec: str) -> bytes:
+    """float32 audio -> mu-law/A-law bytes (nearest code); for clients, tests and benchmarks."""
+    table = _G711_TABLES[codec]
+    order = np.argsort(table, kind="stable")
+    values = table[order]
+    index = np.clip(np.searchsorted(values, audio), 1, len(values) - 1)
+    nearer_below = (audio - values[index - 1]) < (values[index] - audio)
+    return order[index - nearer_below].astype(np.uint8).tobytes()
+
+
+@functools.lru_cache(maxsize=1)
+def opus_available() -> bool:
+    try:
+        _opuslib()
+    except ConfigurationError:
+        return False
+    return True
+
+
+def _opuslib():
+    # Optional dependency (codecs group); also needs the libopus shared library.
+    try:
+        import opuslib
+    except Exception:
+        raise ConfigurationError("Opus ingress needs opuslib and libopus (poetry install --with codecs)")
+    return opuslib
+
+
+def supported_codecs() -> Tuple[str, ...]:
+    """Codecs this worker can decode, in the server's order of preference."""
+    return ("opus", "mulaw", "alaw", "pcm16") if opus_available() else ("mulaw", "alaw", "pcm16")
+
+
+class StreamDecoder:
+    """
+    Per-connection decoder from one wire codec to float32 frames.
+
+    Design:
+    - decode() writes straight into a new float32 frame, the array the
+      session's ingress queue carries: PCM16 is one scaled multiply, G.711
+      one table lookup per byte (np.take into the frame); no int16
+      intermediate and no Python loop over samples
+    - conceal(n) stands in for frames lost in transit (counted from
+      sequence numbers), so VAD still sees the right amount of audio time:
+      the last frame faded out over PLC_FADE_FRAMES, then silence, at most
+      WS_MAX_CONCEALED_FRAMES in a row
+    - a payload that fails to decode is concealed, not fatal
+    - decode time per frame is recorded per codec (saletech_codec_* metrics)
+    """
+
+    codec = "pcm16"
+
+    def __init__(self, frame_samples: int, sample_rate: int = 16000):
+        self.frame_samples = frame_samples
+        self.sample_rate = sample_rate
+        self._last: Optional[np.ndarray] = None
+        self._stats = _stats(self.codec)
+
+    def decode(self, payload: bytes) -> np.ndarray:
+        started = time.perf_counter()
+        try:
+            frame = self._decode(payload)
+        except Exception:
+            self._stats.errors += 1
+            logger.warning("audio_decode_failed", codec=self.codec, bytes=len(payload))
+            return self.conceal(1)[0]
+        self._stats.decode_ms.record((time.perf_counter() - started) * 1000)
+        self._stats.decoded += 1
+        self._last = frame
+        return frame
+
+    def conceal(self, count: int, next_payload: Optional[bytes] = None) -> List[np.ndarray]:
+        """Frames standing in for `count` lost ones, oldest first (capped)."""
+        count = min(count, settings.ws_max_concealed_frames)
+        frames = [self._conceal(index, count, next_payload) for index in range(count)]
+        self._stats.concealed += count
+        if frames:
+            self._last = frames[-1]
+        return frames
+
+    def _decode(self, payload: bytes) -> np.ndarray:
+        return pcm16_to_float32(payload)
+
+    def _conceal(self, index: int, count: int, next_payload: Optional[bytes]) -> np.ndarray:
+        out = np.zeros(self.frame_samples, dtype=np.float32)
+        if index < PLC_FADE_FRAMES and self._last is not None and len(self._last) == self.frame_samples:
+            np.multiply(self._last, np.float32(0.5 ** (index + 1)), out=out)
+        return out
+
+
+class G711Decoder(StreamDecoder):
+    """mu-law / A-law: 8 bits per sample, decoded by table lookup."""
+
+    def __init__(self, codec: str, frame_samples: int, sample_rate: int = 16000):
+        self.codec = codec
+        self._table = _G711_TABLES[codec]
+        super().__init__(frame_samples, sample_rate)
+
+    def _decode(self, payload: bytes) -> np.ndarray:
+        codes = np.frombuffer(payload, dtype=np.uint8)
+        out = np.empty(len(codes), dtype=np.float32)
+        return np.take(self._table, codes, out=out)
+
+
+class OpusDecoder(StreamDecoder):
+    """
+    Streaming Opus (libopus keeps state across packets, so one per connection).
+
+    Lost packets use libopus' own concealment; the frame right before a
+    received packet is recovered from that packet's in-band FEC when the
+    encoder sent it.
+    """
+
+    codec = "opus"
+
+    def __init__(self, frame_samples: int, sample_rate: int = 16000):
+        super().__init__(frame_samples, sample_rate)
+        self._decoder = _opuslib().Decoder(sample_rate, 1)
+
+    def _decode(self, payload: bytes) -> np.ndarray:
+        return pcm16_to_float32(self._decoder.decode(payload, self.frame_samples))
+
+    def _conceal(self, index: int, count: int, next_payload: Optional[bytes]) -> np.ndarray:
+        try:
+            if index == count - 1 and next_payload:
+                pcm = self._decoder.decode(next_payload, self.frame_samples, decode_fec=True)
+            else:
+                pcm = self._decoder.decode(b"", self.frame_samples)  # empty packet = PLC
+            return pcm16_to_float32(pcm)
+        except Exception:
+            return super()._conceal(index, count, next_payload)
+
+
+def create_decoder(codec: str, frame_samples: int, sample_rate: int = 16000) -> StreamDecoder:
+    if codec == "pcm16":
+        return StreamDecoder(frame_samples, sample_rate)
+    if codec in _G711_TABLES:
+        return G711Decoder(codec, frame_samples, sample_rate)
+    if codec == "opus":
+        return OpusDecoder(frame_samples, sample_rate)
+    raise FramingError("Unsupported codec", {"codec": codec})
+
+
+def _collect_codec_metrics():
+    if not _codec_stats:
+        return []
+    decode = MetricFamily("saletech_codec_decode_seconds", "histogram", "Time to decode one ingress audio frame.")
+    decoded = counter("saletech_codec_frames_decoded_total", "Ingress audio frames decoded.")
+    concealed = counter("saletech_codec_frames_concealed_total", "Lost ingress frames replaced by concealment.")
+    errors = counter("saletech_codec_decode_errors_total", "Ingress payloads that failed to decode.")
+    for codec, stats in _codec_stats.items():
+        labels = {"codec": codec}
+        decode.add_histogram(stats.decode_ms, labels)
+        decoded.add(stats.decoded, labels)
+        concealed.add(stats.concealed, labels)
+        errors.add(stats.errors, labels)
+    return [decode, decoded, concealed, errors]
+
+
+register_collector("codecs", _collect_codec_metrics)
@@ -0,0 +1,207 @@
+import struct
+import time
+from typing import Iterable, List, Optional, Sequence
+
+from config.settings import settings
+from saletech.media.codecs import supported_codecs
+from saletech.utils.errors import FramingError
+from saletech.utils.metrics import counter, register_collector
+
+PROTOCOL_VERSION = 1
+MESSAGE_AUDIO = 1
+
+# Codec ids on the wire. The server only negotiates codecs it can decode
+# (media/codecs.py: supported_codecs()).
+CODECS = {"pcm16": 0, "mulaw": 1, "alaw": 2, "opus": 3}
+CODEC_NAMES = {code: name for name, code in CODECS.items()}
+# Bytes per sample for fixed-rate codecs, checked against the frame header.
+_BYTES_PER_SAMPLE = {"pcm16": 2, "mulaw": 1, "alaw": 1}
+
+# Message: version u8 | type u8 | frame count u16, then per frame:
+# seq u32 | capture ts (us) u64 | samples u16 | codec u8 | pad | payload bytes u16
+MESSAGE_HEADER = struct.Struct("<BBH")
+FRAME_HEADER = struct.Struct("<IQHBxH")
+
+_SEQ_MODULUS = 1 << 32
+
+
+class _FramingTotals:
+    messages = 0
+    frames = 0
+    lost = 0
+    late = 0
+    malformed = 0
+
+
+class AudioFrame:
+    """One captured audio frame: sequence number, capture time (s), samples and encoded payload."""
+
+    __slots__ = ("seq", "timestamp", "samples", "codec", "payload")
+
+    def __init__(self, seq: int, timestamp: float, samples: int, codec: str, payload: bytes):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.samples = samples
+        self.codec = codec
+        self.payload = payload
+
+
+def encode_message(frames: Sequence[AudioFrame]) -> bytes:
+    """Pack frames into one binary message (client side; also used by tests and tools)."""
+    parts = [MESSAGE_HEADER.pack(PROTOCOL_VERSION, MESSAGE_AUDIO, len(frames))]
+    for frame in frames:
+        parts.append(FRAME_HEADER.pack(
+            frame.seq % _SEQ_MODULUS,
+            int(frame.timestamp * 1_000_000),
+            frame.samples,
+            CODECS[frame.codec],
+            len(frame.payload),
+        ))
+        parts.append(frame.payload)
+    return b"".join(parts)
+
+
+def decode_message(data: bytes, max_frames: Optional[int] = None) -> List[AudioFrame]:
+    """
+    Parse one binary message into frames; raises FramingError if malformed.
+
+    Headers are read in place from a memoryview; each payload is copied
+    once, into the bytes the ingress buffer queues.
+    """
+    max_frames = max_frames or settings.ws_max_frames_per_message
+    view = memoryview(data)
+    try:
+        if len(view) < MESSAGE_HEADER.size:
+            raise FramingError("Message shorter than its header", {"bytes": len(view)})
+        version, message_type, count = MESSAGE_HEADER.unpack_from(view, 0)
+        if version != PROTOCOL_VERSION or message_type != MESSAGE_AUDIO:
+            raise FramingError(
+                "Unsupported message", {"version": version, "type": message_type}
+            )
+        if count > max_frames:
+            raise FramingError("Too many frames in message", {"frames": count, "max": max_frames})
+
+        frames = []
+        offset = MESSAGE_HEADER.size
+        for _ in range(count):
+            if offset + FRAME_HEADER.size > len(view):
+                raise FramingError("Truncated frame header", {"offset": offset})
+            seq, timestamp_us, samples, codec, length = FRAME_HEADER.unpack_from(view, offset)
+            offset += FRAME_HEADER.size
+            if offset + length > len(view):
+                raise FramingError("Truncated frame payload", {"seq": seq, "bytes": length})
+            name = CODEC_NAMES.get(codec)
+            if name is None:
+                raise FramingError("Unknown codec", {"codec": codec})
+            width = _BYTES_PER_SAMPLE.get(name)
+            if width is not None and length != width * samples:
+                raise FramingError("Payload does not match sample count", {"seq": seq, "codec": name})
+            payload = bytes(view[offset:offset + length])
+            frames.append(AudioFrame(seq, timestamp_us / 1_000_000, samples, name, payload))
+            offset += length
+
+        if offset != len(view):
+            raise FramingError("Trailing bytes after last frame", {"bytes": len(view) - offset})
+    except FramingError:
+        _FramingTotals.malformed += 1
+        raise
+
+    _FramingTotals.messages += 1
+    _FramingTotals.frames += count
+    return frames
+
+
+class SequenceTracker:
+    """
+    Gap and reorder detection for one stream of 32-bit wrapping sequence numbers.
+
+    Design:
+    - accept() returns how many frames went missing right before this one,
+      or -1 for a late/duplicate frame, which the caller drops: audio is
+      played forward only, a frame behind the cursor is no use to VAD
+    - comparisons are modulo 2^32 (serial-number arithmetic), so a long
+      call wraps the counter without a spurious gap
+    """
+
+    def __init__(self):
+        self.expected: Optional[int] = None
+        self.received = 0
+        self.lost = 0
+        self.late = 0
+
+    def accept(self, seq: int) -> int:
+        if self.expected is None:
+            gap = 0
+        else:
+            gap = (seq - self.expected) % _SEQ_MODULUS
+            if gap >= _SEQ_MODULUS // 2:
+                self.late += 1
+                _FramingTotals.late += 1
+                return -1
+        self.expected = (seq + 1) % _SEQ_MODULUS
+        self.received += 1
+        self.lost += gap
+        _FramingTotals.lost += gap
+        return gap
+
+    @property
+    def metrics(self) -> dict:
+        return {"received": self.received, "lost": self.lost, "late": self.late}
+
+
+def negotiate(hello: dict, under_load: bool = False, supported: Optional[Iterable[str]] = None) -> dict:
+    """
+    Answer a client's hello with the stream parameters it must use.
+
+    The hello lists, in preference order, the codecs and sample rates the
+    client can send, and optionally the most frames it will batch per
+    message. Raises FramingError if nothing matches.
+    """
+    if hello.get("type") != "hello":
+        raise FramingError("Expected hello", {"type": hello.get("type")})
+    version = hello.get("version", PROTOCOL_VERSION)
+    if version != PROTOCOL_VERSION:
+        raise FramingError("Unsupported protocol version", {"version": version, "supported": PROTOCOL_VERSION})
+
+    supported = list(supported or supported_codecs())
+    codec = next((name for name in hello.get("codecs", ["pcm16"]) if name in supported), None)
+    if codec is None:
+        raise FramingError("No common codec", {"offered": hello.get("codecs"), "supported": supported})
+
+    sample_rates = hello.get("sample_rates", [settings.sample_rate])
+    if settings.sample_rate not in sample_rates:
+        raise FramingError(
+            "Unsupported sample rate", {"offered": sample_rates, "required": settings.sample_rate}
+        )
+
+    frames_per_message = (
+        settings.ws_frames_per_message_under_load if under_load else settings.ws_frames_per_message
+    )
+    client_max = hello.get("max_frames_per_message")
+    if client_max:
+        frames_per_message = min(frames_per_message, int(client_max))
+    frames_per_message = max(1, min(frames_per_message, settings.ws_max_frames_per_message))
+
+    return {
+        "type": "ready",
+        "version": PROTOCOL_VERSION,
+        "codec": codec,
+        "sample_rate": settings.sample_rate,
+        "frame_samples": settings.chunk_size_samples,
+        "frames_per_message": frames_per_message,
+        "max_frames_per_message": settings.ws_max_frames_per_message,
+        "server_time": time.time(),
+    }
+
+
+def _collect_framing_metrics():
+    return [
+        counter("saletech_ws_messages_total", "Binary audio messages parsed.", _FramingTotals.messages),
+        counter("saletech_ws_frames_total", "Audio frames parsed from websocket messages.", _FramingTotals.frames),
+        counter("saletech_ws_frames_lost_total", "Frames missing from sequence numbering.", _FramingTotals.lost),
+        counter("saletech_ws_frames_late_total", "Late or duplicate frames dropped.", _FramingTotals.late),
+        counter("saletech_ws_messages_malformed_total", "Audio messages rejected as malformed.", _FramingTotals.malformed),
+    ]
+
+
+register_collector("ws_framing", _collect_framing_metrics)
@@ -1,16 +1,22 @@
+import asyncio
 import torch
 import numpy as np
 import webrtcvad
 import time
+import weakref
 from typing import Tuple, Optional
 
-from src.saletech.utils.errors import SaleTechException, ValidationError
-from src.saletech.utils.logger import get_logger, setup_logging
+from saletech.utils.errors import SaleTechException, ValidationError
+from saletech.utils.logger import get_logger
 from config.settings import AppSettings
+from saletech.utils.metrics import counter, gauge, register_collector
 
-setup_logging()
 logger = get_logger("saletech.vad.model")
 
+_MIN_SPEECH_SNR = 2.0
+
+_models: "weakref.WeakSet[AdvancedVadModel]" = weakref.WeakSet()
+
 
 class AdvancedVadModel:
     """
@@ -29,6 +35,12 @@ class AdvancedVadModel:
         self.webrtc_vad = webrtcvad.Vad(self.settings.vad_aggressiveness)
 
         self.initialized = False
+        self.timings: dict[str, float] = {}  # load/warmup durations, read by the model registry
+
+        # Counters read by the metrics collector
+        self.frames_processed = 0
+        self.silero_runs = 0
+        _models.add(self)
 
         logger.info("vad_init", device=self.device)
 
@@ -40,29 +52,28 @@ class AdvancedVadModel:
             start = time.time()
             logger.info("vad_loading_models")
 
-            self.silero_model, _ = torch.hub.load(
-                repo_or_dir=self.settings.vad_repo,
-                model=self.settings.vad_model_name,
-                force_reload=False,
-                onnx=False,
-                trust_repo=True
-            )
+            # torch.hub.load blocks on disk/network; keep the event loop free
+            # so other models can load concurrently
+            loop = asyncio.get_running_loop()
+            self.silero_model = await loop.run_in_executor(None, self._load_silero_blocking)
+            self.timings["load_ms"] = (time.time() - start) * 1000
 
-            self.silero_model.to(self.device).eval()
             frame_sample=max(
                 512,int((self.sample_rate*self.vad_frame_duration_ms)/1000)
             )
 
             # GPU warmup
+            warmup_start = time.time()
             dummy = torch.randn(1, frame_sample).to(self.device)
             with torch.no_grad():
                 _ = self.silero_model(dummy, self.sample_rate)
+            self.timings["warmup_ms"] = (time.time() - warmup_start) * 1000
 
             load_time = (time.time() - start) * 1000
 
             self.initialized = True
 
-            logger.info("vad_models_loaded", load_time_ms=load_time)
+            logger.info("vad_models_loaded", load_time_ms=load_time, **self.timings)
 
         except Exception as e:
             logger.error("vad_load_failed", error=str(e), exc_info=True)
@@ -73,6 +84,16 @@ class AdvancedVadModel:
                 original_exception=e
             )
 
+    def _load_silero_blocking(self) -> torch.nn.Module:
+        model, _ = torch.hub.load(
+            repo_or_dir=self.settings.vad_repo,
+            model=self.settings.vad_model_name,
+            force_reload=False,
+            onnx=False,
+            trust_repo=True
+        )
+        return model.to(self.device).eval()
+
     @torch.no_grad()
     def detect_speech(
         self,
@@ -120,8 +141,14 @@ class AdvancedVadModel:
             energy = float(np.sqrt(np.mean(audio ** 2)))
             snr = energy / (background_noise + 1e-6)
 
-            # Model inference
-            silero_prob = self._silero_detect(audio)
+            # Model inference; below the SNR floor the frame cannot be speech,
+            # so with the gate on Silero is skipped for it
+            self.frames_processed += 1
+            if self.settings.vad_silero_snr_gate and snr < _MIN_SPEECH_SNR:
+                silero_prob = 0.0
+            else:
+                silero_prob = self._silero_detect(audio)
+                self.silero_runs += 1
             webrtc_result = self._webrtc_detect(audio)
 
             adaptive_threshold = self._get_adaptive_threshold(background_noise)
@@ -129,7 +156,7 @@ class AdvancedVadModel:
             is_speech = (
                 silero_prob >= adaptive_threshold or
                 (silero_prob >= 0.3 and webrtc_result)
-            ) and snr >= 2.0
+            ) and snr >= _MIN_SPEECH_SNR
 
             latency_ms = (time.time() - start_time) * 1000
 
@@ -241,3 +268,21 @@ class AdvancedVadModel:
                 context={"class": "AdvancedVadModel"},
                 original_exception=e
             )
+
+
+def _collect_vad_metrics():
+    models = list(_models)
+    frames = sum(m.frames_processed for m in models)
+    silero_runs = sum(m.silero_runs for m in models)
+    return [
+        counter("saletech_vad_frames_total", "Frames run through VAD.", frames),
+        counter("saletech_vad_silero_runs_total", "Frames that ran Silero inference.", silero_runs),
+        gauge(
+            "saletech_vad_silero_skip_ratio",
+            "Share of VAD frames that skipped Silero (SNR gate).",
+            1 - silero_runs / frames if frames else 0.0,
+        ),
+    ]
+
+
+register_collector("vad", _collect_vad_metrics)
@@ -2,9 +2,9 @@ import time
 import numpy as np
 from collections import deque
 from typing import Tuple, Optional
-from src.saletech.utils.errors import SaleTechException, ValidationError
+from saletech.utils.errors import SaleTechException, ValidationError
 from config.settings import AppSettings
-from src.saletech.utils.logger import get_logger
+from saletech.utils.logger import get_logger
 
 logger= get_logger("Saletech.vad.state")
 
@@ -1,9 +1,11 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 import uuid
 
+from saletech.utils.histogram import LatencyHistogram
+
 
 class SessionState(str, Enum):
     """Session state machine"""
@@ -66,13 +68,17 @@ class TranscriptionResult(BaseModel):
 
 class SessionMetrics(BaseModel):
     """Per-session performance metrics"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     session_id: str
     
-    # Latency tracking
-    vad_latencies_ms: List[float] = Field(default_factory=list)
-    asr_latencies_ms: List[float] = Field(default_factory=list)
-    llm_latencies_ms: List[float] = Field(default_factory=list)
-    tts_latencies_ms: List[float] = Field(default_factory=list)
+    # Latency tracking: fixed-memory histograms, so a long call does not
+    # grow memory and p50/p95/p99 need no sort (VAD is recorded per frame)
+    vad_latencies_ms: LatencyHistogram = Field(default_factory=LatencyHistogram)
+    asr_latencies_ms: LatencyHistogram = Field(default_factory=LatencyHistogram)
+    llm_latencies_ms: LatencyHistogram = Field(default_factory=LatencyHistogram)
+    tts_latencies_ms: LatencyHistogram = Field(default_factory=LatencyHistogram)
+    barge_in_latencies_ms: LatencyHistogram = Field(default_factory=LatencyHistogram)
     
     # Counters
     total_utterances: int = 0
@@ -84,3 +90,15 @@ class SessionMetrics(BaseModel):
     started_at: datetime = Field(default_factory=datetime.now)
     last_activity: datetime = Field(default_factory=datetime.now)
 
+    @field_serializer(
+        "vad_latencies_ms", "asr_latencies_ms", "llm_latencies_ms", "tts_latencies_ms", "barge_in_latencies_ms"
+    )
+    def _serialize_histogram(self, histogram: LatencyHistogram) -> dict:
+        return histogram.summary()
+
+    def get_latency_percentile(self, stage: str, q: float) -> Optional[float]:
+        """Latency percentile for 'vad', 'asr', 'llm', 'tts' or 'barge_in' (None until recorded)."""
+        return getattr(self, f"{stage}_latencies_ms").percentile(q)
+
+    def get_latency_p95(self, stage: str) -> Optional[float]:
+        return self.get_latency_percentile(stage, 95)
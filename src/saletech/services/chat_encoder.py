@@ -0,0 +1,85 @@
+from typing import Any, List
+
+
+class IncrementalChatEncoder:
+    """
+    Template-aware incremental encoder for chat turns.
+
+    Design:
+    - render one message against a fixed one-line system probe, so the cost
+      is O(message), not O(conversation)
+    - generation prompt and assistant closing suffix are cut out of the
+      tokenizer's own chat template once at startup
+    - the template is probed once: if it is not append-only, or token
+      boundaries merge across message segments, `incremental` is False and
+      callers must use `encode_full`
+    """
+
+    _PROBE_SYSTEM = "probe system"
+    _PROBE_CONTENT = "probe content"
+
+    def __init__(self, tokenizer: Any):
+        self.tokenizer = tokenizer
+        self.generation_prompt_ids: List[int] = []
+        self.assistant_suffix_ids: List[int] = []
+        self.incremental = self._probe()
+
+    def encode_full(self, messages: List[dict]) -> List[int]:
+        """Render and tokenize a whole conversation plus generation prompt."""
+        return self._tokenize(self._render(messages, add_generation_prompt=True))
+
+    def encode_message(self, message: dict) -> List[int]:
+        """Token ids one message adds when appended to a conversation."""
+        base = [{"role": "system", "content": self._PROBE_SYSTEM}]
+        prefix = self._render(base, add_generation_prompt=False)
+        full = self._render(base + [message], add_generation_prompt=False)
+        return self._tokenize(full[len(prefix):])
+
+    def close_assistant(self, token_ids: List[int]) -> List[int]:
+        """Ids that close a generated assistant turn the way the template would."""
+        suffix = self.assistant_suffix_ids
+        if token_ids and suffix and token_ids[-1] == suffix[0]:
+            # Generation stopped on the end-of-turn token itself.
+            return suffix[1:]
+        return suffix
+
+    def _probe(self) -> bool:
+        try:
+            system = {"role": "system", "content": self._PROBE_SYSTEM}
+            user = {"role": "user", "content": self._PROBE_CONTENT}
+            assistant = {"role": "assistant", "content": self._PROBE_CONTENT}
+
+            base = self._render([system], add_generation_prompt=False)
+            with_user = self._render([system, user], add_generation_prompt=False)
+            with_prompt = self._render([system, user], add_generation_prompt=True)
+            with_reply = self._render([system, user, assistant], add_generation_prompt=False)
+
+            if not (
+                with_user.startswith(base)
+                and with_prompt.startswith(with_user)
+                and with_reply.startswith(with_prompt)
+            ):
+                return False
+
+            reply_tail = with_reply[len(with_prompt):]
+            if not reply_tail.startswith(self._PROBE_CONTENT):
+                return False
+
+            self.generation_prompt_ids = self._tokenize(with_prompt[len(with_user):])
+            self.assistant_suffix_ids = self._tokenize(reply_tail[len(self._PROBE_CONTENT):])
+
+            pieces = self._tokenize(base) + self.encode_message(user) + self.generation_prompt_ids
+            return pieces == self._tokenize(with_prompt)
+
+        except Exception:
+            return False
+
+    def _render(self, messages: List[dict], add_generation_prompt: bool) -> str:
+        return self.tokenizer.apply_chat_template(
+            messages,
+            tokenize=False,
+            add_generation_prompt=add_generation_prompt,
+        )
+
+    def _tokenize(self, text: str) -> List[int]:
+        return self.tokenizer(text, add_special_tokens=False)["input_ids"]
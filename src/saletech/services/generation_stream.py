@@ -0,0 +1,49 @@
+import asyncio
+import threading
+from typing import Any
+
+import torch
+from transformers import StoppingCriteria, TextStreamer
+
+
+class AsyncTokenStreamer(TextStreamer):
+    """
+    Streamer that hands decoded text to an asyncio.Queue.
+
+    `generate()` runs on the LLM worker thread and calls `put()`/`end()`
+    there. Text is forwarded with `call_soon_threadsafe`, so the event loop
+    never blocks waiting for the next token. `None` marks end of stream.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        skip_prompt: bool = True,
+        **decode_kwargs,
+    ):
+        super().__init__(tokenizer, skip_prompt=skip_prompt, **decode_kwargs)
+        self._loop = loop
+        self._queue = queue
+
+    def on_finalized_text(self, text: str, stream_end: bool = False) -> None:
+        if text:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, text)
+        if stream_end:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+
+class CancelGenerationCriteria(StoppingCriteria):
+    """Stop `generate()` at the next token once the event is set."""
+
+    def __init__(self, cancel_event: threading.Event):
+        self.cancel_event = cancel_event
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full(
+            (input_ids.shape[0],),
+            self.cancel_event.is_set(),
+            dtype=torch.bool,
+            device=input_ids.device,
+        )
@@ -1,12 +1,14 @@
 import asyncio
 import pickle
+import random
+import re
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
-from threading import Thread
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer, TextIteratorStreamer
+from transformers import AutoModelForCausalLM, AutoTokenizer, StoppingCriteriaList
 
 try:
     from transformers.cache_utils import Cache
@@ -19,8 +21,21 @@ from config.settings import (
     AppSettings,
 )
 from saletech.models.schemas import ConversationMessage, MessageRole
+from saletech.services.chat_encoder import IncrementalChatEncoder
+from saletech.services.response_cache import ResponseCache
+from saletech.services.sentence_chunker import SentenceChunker
+from saletech.services.llm_quantization import (
+    apply_cpu_profile,
+    load_or_quantize,
+    model_memory_bytes,
+)
+from saletech.services.generation_stream import AsyncTokenStreamer, CancelGenerationCriteria
+from saletech.services.speculative import SpeculativeDecoder
 from saletech.utils.errors import SaleTechException
 from saletech.utils.logger import get_logger
+from saletech.utils.tracing import current_trace
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.metrics import counter, gauge, histogram, register_collector
 
 
 logger = get_logger("saletech.llm")
@@ -48,9 +63,21 @@ class LLMWithKVCache:
     - streaming token output
     - per-session cleanup
 
+    Generation runs on one long-lived worker thread (the service executor).
+    Tokens are pushed into an asyncio.Queue, so the event loop is never
+    blocked between tokens, and `cancel_generation` stops the worker at the
+    next token (e.g. on barge-in).
+
     KV-cache reuse is attempted only when the new prompt is an exact token-prefix
-    extension of the previous prompt/response. If that invariant does not hold,
-    the service falls back to normal full-context generation.
+    extension of the previous prompt/response. The service keeps each session's
+    token ids and the messages they encode; when the new conversation only
+    appends messages, just those are tokenized and the prefix holds by
+    construction. Otherwise the full conversation is re-encoded and the
+    service falls back to normal full-context generation.
+
+    When speculative decoding is enabled, a small draft model proposes tokens
+    that the main model verifies in one pass. The draft model keeps its own
+    per-session cache under the same prefix rule.
     """
 
     def __init__(self):
@@ -63,12 +90,43 @@ class LLMWithKVCache:
         self.torch_dtype = self._resolve_dtype()
 
         self._session_caches: Dict[str, Cache] = {}
-        self._session_input_ids: Dict[str, torch.Tensor] = {}
+        self._session_input_ids: Dict[str, List[int]] = {}
+        self._session_messages: Dict[str, List[dict]] = {}
+        self._session_reply_starts: Dict[str, int] = {}  # where the last reply's ids begin
+        self._encoder: Optional[IncrementalChatEncoder] = None
         self._generation_errors: Dict[str, Exception] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._cancelled_turns: set[str] = set()
+
+        self.response_cache: Optional[ResponseCache] = None
+        if self.settings.llm_response_cache_enabled:
+            self.response_cache = ResponseCache(
+                max_entries=self.settings.llm_response_cache_max_entries,
+                ttl_seconds=self.settings.llm_response_cache_ttl_seconds,
+                similarity_threshold=self.settings.llm_response_cache_similarity,
+            )
+
+        # Speculative decoding (optional)
+        self.draft_model: Optional[AutoModelForCausalLM] = None
+        self._speculative: Optional[SpeculativeDecoder] = None
+        self._session_draft_caches: Dict[str, Cache] = {}
+        self._speculative_stats: Dict[str, dict] = {}
+        self._baseline_tokens_per_second: Optional[float] = None
 
         self._initialized = False
+        self.timings: Dict[str, float] = {}  # load/warmup durations, read by the model registry
+
+        # Generation metrics (exported by the metrics collector)
+        self.ttft_ms = LatencyHistogram()
+        self.tokens_generated = 0
+        self.generation_seconds = 0.0
+        self.last_tokens_per_second: Optional[float] = None
         self._executor = ThreadPoolExecutor(max_workers=1)
         self._generation_lock = asyncio.Lock()
+        # Requests generating or waiting for the generation slot (admission signal)
+        self.generations_in_flight = 0
+        # Set by admission control under load: greedy decoding, no sampling
+        self.degraded = False
 
         logger.info(
             "llm_service_initialized",
@@ -106,21 +164,42 @@ class LLMWithKVCache:
                 self._executor,
                 self._load_tokenizer_blocking,
             )
+            self._encoder = IncrementalChatEncoder(self.tokenizer)
+            logger.info("chat_encoder_ready", incremental=self._encoder.incremental)
+            self.timings["tokenizer_ms"] = (time.time() - start_time) * 1000
+            model_start = time.time()
             self.model = await loop.run_in_executor(
                 self._executor,
                 self._load_model_blocking,
             )
 
+            if self.settings.llm_speculative_enabled:
+                self.draft_model = await loop.run_in_executor(
+                    self._executor,
+                    self._load_draft_model_blocking,
+                )
+                self._speculative = SpeculativeDecoder(
+                    model=self.model,
+                    draft_model=self.draft_model,
+                    num_draft_tokens=self.settings.llm_draft_num_tokens,
+                    eos_token_ids=self._eos_token_ids(),
+                )
+
+            self.timings["load_ms"] = (time.time() - model_start) * 1000
+
             if self.settings.llm_warmup_enabled:
+                warmup_start = time.time()
                 await self._generate_blocking(
                     [{"role": "user", "content": "Hi"}],
                     max_tokens=2,
                 )
+                self.timings["warmup_ms"] = (time.time() - warmup_start) * 1000
 
             self._initialized = True
             logger.info(
                 "qwen_model_loaded",
                 load_time_ms=(time.time() - start_time) * 1000,
+                **self.timings,
             )
 
         except Exception as e:
@@ -139,7 +218,7 @@ class LLMWithKVCache:
             tokenizer.pad_token = tokenizer.eos_token
         return tokenizer
 
-    def _load_model_blocking(self):
+    def _load_model_blocking(self, model_name: Optional[str] = None):
         kwargs: dict[str, Any] = {
             "torch_dtype": self.torch_dtype,
             "trust_remote_code": True,
@@ -153,14 +232,67 @@ class LLMWithKVCache:
             if self.settings.llm_attn_implementation:
                 kwargs["attn_implementation"] = self.settings.llm_attn_implementation
 
-        model = AutoModelForCausalLM.from_pretrained(self.model_name, **kwargs)
+        model_name = model_name or self.model_name
 
         if self.device == "cpu":
-            model = model.to(self.device)
+            return self._load_cpu_model_blocking(model_name, kwargs)
 
+        model = AutoModelForCausalLM.from_pretrained(model_name, **kwargs)
         model.eval()
         return model
 
+    def _load_cpu_model_blocking(self, model_name: str, kwargs: dict[str, Any]):
+        """
+        CPU profile: thread pinning plus optional int8/int4 quantization.
+
+        Runs on the generation executor thread so the affinity applies to the
+        thread (and OpenMP pool) that will run inference.
+        """
+        cpu_profile = apply_cpu_profile(
+            num_threads=self.settings.llm_cpu_threads,
+            affinity=self.settings.llm_cpu_affinity,
+        )
+
+        def load_float_model():
+            model = AutoModelForCausalLM.from_pretrained(model_name, **kwargs)
+            return model.to(self.device).eval()
+
+        model = load_or_quantize(
+            loader=load_float_model,
+            model_name=model_name,
+            mode=self.settings.llm_cpu_quantization,
+            cache_dir=self.settings.llm_quantized_cache_dir,
+            group_size=self.settings.llm_cpu_quantization_group_size,
+        )
+        model.eval()
+
+        logger.info(
+            "llm_cpu_profile_applied",
+            model=model_name,
+            quantization=self.settings.llm_cpu_quantization,
+            weight_bytes=model_memory_bytes(model),
+            **cpu_profile,
+        )
+        return model
+
+    def _load_draft_model_blocking(self):
+        logger.info("loading_draft_model", model=self.settings.llm_draft_model_path)
+        return self._load_model_blocking(self.settings.llm_draft_model_path)
+
+    def _eos_token_ids(self) -> List[int]:
+        eos = self.model.generation_config.eos_token_id
+        if eos is None:
+            eos = self.tokenizer.eos_token_id
+        return list(eos) if isinstance(eos, (list, tuple)) else [eos]
+
+    def _use_speculative_for_turn(self) -> bool:
+        if self._speculative is None:
+            return False
+        # Keep sampling plain turns until a baseline exists, then only a fraction.
+        if self._baseline_tokens_per_second is None:
+            return False
+        return random.random() >= self.settings.llm_draft_baseline_ratio
+
     async def generate_response(
         self,
         session_id: str,
@@ -179,6 +311,47 @@ class LLMWithKVCache:
             chunks.append(token)
         return "".join(chunks).strip()
 
+    async def generate_sentences(
+        self,
+        session_id: str,
+        conversation_history: List[ConversationMessage],
+        customer_name: Optional[str] = None,
+        product_context: Optional[str] = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream the response as speakable sentence/clause chunks.
+
+        Each chunk is yielded as soon as its boundary is seen in the token
+        stream, so synthesis can start after the first clause.
+        """
+        start_time = time.time()
+        chunker = SentenceChunker(
+            min_clause_chars=self.settings.llm_chunk_min_clause_chars,
+            max_chars=self.settings.llm_chunk_max_chars,
+        )
+        chunk_count = 0
+
+        async for token in self.generate_with_cache(
+            session_id=session_id,
+            conversation_history=conversation_history,
+            customer_name=customer_name,
+            product_context=product_context,
+        ):
+            for chunk in chunker.push(token):
+                if chunk_count == 0:
+                    logger.info(
+                        "llm_first_chunk_ready",
+                        session_id=session_id,
+                        latency_ms=(time.time() - start_time) * 1000,
+                        chars=len(chunk),
+                    )
+                chunk_count += 1
+                yield chunk
+
+        tail = chunker.flush()
+        if tail:
+            yield tail
+
     async def generate_with_cache(
         self,
         session_id: str,
@@ -193,15 +366,33 @@ class LLMWithKVCache:
         `past_kv_cache` is optional serialized state from external storage.
         In-memory cache is preferred when available because model cache objects
         can be large and may not serialize reliably across process versions.
+
+        With the response cache enabled, a near-identical FAQ turn in the same
+        product/dialogue context is answered without running the model.
         """
         if not self._initialized or self.model is None or self.tokenizer is None:
             raise LLMServiceError("LLM service not initialized")
 
         start_time = time.time()
+        request_start = time.perf_counter()
+        trace = current_trace()
         token_count = 0
         cache_reused = False
 
         try:
+            cache_key = self._response_cache_key(conversation_history, product_context, customer_name)
+            if cache_key is not None:
+                cached = self.response_cache.lookup(*cache_key)
+                if cached is not None:
+                    self._record_ttft(request_start, trace)
+                    logger.info(
+                        "llm_response_cache_hit",
+                        session_id=session_id,
+                        **self.response_cache.metrics,
+                    )
+                    yield cached
+                    return
+
             if past_kv_cache and session_id not in self._session_caches:
                 self._load_serialized_cache(session_id, past_kv_cache)
 
@@ -211,13 +402,40 @@ class LLMWithKVCache:
                 product_context=product_context,
             )
 
-            async with self._generation_lock:
-                async for token, cache_reused in self._generate_streaming_with_cache(
-                    messages=messages,
-                    session_id=session_id,
-                ):
-                    token_count += 1
-                    yield token
+            response_tokens: List[str] = []
+            self.generations_in_flight += 1
+            try:
+                async with self._generation_lock:
+                    generation_start = time.perf_counter()
+                    async for token, cache_reused in self._generate_streaming_with_cache(
+                        messages=messages,
+                        session_id=session_id,
+                    ):
+                        token_count += 1
+                        if token_count == 1:
+                            self._record_ttft(request_start, trace)
+                        if cache_key is not None:
+                            response_tokens.append(token)
+                        yield token
+                    generation_seconds = time.perf_counter() - generation_start
+            finally:
+                self.generations_in_flight -= 1
+
+            self.tokens_generated += token_count
+            self.generation_seconds += generation_seconds
+            if generation_seconds > 0:
+                self.last_tokens_per_second = token_count / generation_seconds
+
+            cancelled = session_id in self._cancelled_turns
+            self._cancelled_turns.discard(session_id)
+
+            if cache_key is not None and not cancelled:
+                self._store_cached_response(
+                    cache_key,
+                    "".join(response_tokens).strip(),
+                    customer_name,
+                    generation_seconds,
+                )
 
             latency_ms = (time.time() - start_time) * 1000
             logger.info(
@@ -243,55 +461,48 @@ class LLMWithKVCache:
         messages: List[dict],
         session_id: str,
     ) -> AsyncGenerator[tuple[str, bool], None]:
-        prompt = self.tokenizer.apply_chat_template(
-            messages,
-            tokenize=False,
-            add_generation_prompt=True,
-        )
-        encoded = self.tokenizer([prompt], return_tensors="pt")
-        full_input_ids = encoded.input_ids.to(self.model.device)
-        full_attention_mask = encoded.attention_mask.to(self.model.device)
+        prompt_ids, cached_length = self._encode_prompt(session_id, messages)
+        full_input_ids = torch.tensor([prompt_ids], dtype=torch.long, device=self.model.device)
+        attention_mask = torch.ones_like(full_input_ids)
 
-        input_ids = full_input_ids
-        attention_mask = full_attention_mask
         past_key_values = None
         cache_reused = False
 
-        cached_ids = self._session_input_ids.get(session_id)
-        cached_cache = self._session_caches.get(session_id)
-
-        if cached_ids is not None and cached_cache is not None:
-            cached_length = cached_ids.shape[1]
-            can_reuse = (
-                full_input_ids.shape[1] > cached_length
-                and torch.equal(full_input_ids[:, :cached_length].cpu(), cached_ids.cpu())
+        if cached_length and len(prompt_ids) > cached_length:
+            past_key_values = self._session_caches[session_id]
+            cache_reused = True
+            logger.info(
+                "kv_cache_reuse",
+                session_id=session_id,
+                cached_tokens=cached_length,
+                new_tokens=len(prompt_ids) - cached_length,
             )
-            if can_reuse:
-                input_ids = full_input_ids[:, cached_length:]
-                attention_mask = full_attention_mask
-                past_key_values = cached_cache
-                cache_reused = True
-                logger.info(
-                    "kv_cache_reuse",
-                    session_id=session_id,
-                    cached_tokens=cached_length,
-                    new_tokens=input_ids.shape[1],
-                )
+        else:
+            # Draft cache follows the same prefix as the main cache.
+            self._session_draft_caches.pop(session_id, None)
 
-        streamer = TextIteratorStreamer(
+        loop = asyncio.get_running_loop()
+        token_queue: asyncio.Queue = asyncio.Queue()
+        streamer = AsyncTokenStreamer(
             self.tokenizer,
+            loop,
+            token_queue,
             skip_prompt=True,
             skip_special_tokens=True,
         )
 
+        cancel_event = threading.Event()
+        self._cancel_events[session_id] = cancel_event
+
         generation_kwargs = {
-            "input_ids": input_ids,
+            "input_ids": full_input_ids,
             "attention_mask": attention_mask,
             "max_new_tokens": self.settings.llm_max_tokens,
-            "temperature": self.settings.llm_temperature,
+            "temperature": self._temperature(),
             "top_p": self.settings.llm_top_p,
-            "do_sample": self.settings.llm_temperature > 0,
+            "do_sample": self._temperature() > 0,
             "streamer": streamer,
+            "stopping_criteria": StoppingCriteriaList([CancelGenerationCriteria(cancel_event)]),
             "pad_token_id": self.tokenizer.eos_token_id,
             "use_cache": True,
             "return_dict_in_generate": True,
@@ -300,18 +511,51 @@ class LLMWithKVCache:
         if past_key_values is not None:
             generation_kwargs["past_key_values"] = past_key_values
 
-        thread = Thread(
-            target=self._generate_and_update_cache,
-            args=(generation_kwargs, session_id, full_input_ids, streamer),
-            daemon=True,
-        )
-        thread.start()
-
-        for token in streamer:
-            yield token, cache_reused
-            await asyncio.sleep(0)
+        if self._use_speculative_for_turn():
+            job = loop.run_in_executor(
+                self._executor,
+                self._speculative_generate_and_update_cache,
+                full_input_ids,
+                prompt_ids,
+                past_key_values,
+                session_id,
+                messages,
+                streamer,
+                cancel_event,
+            )
+        else:
+            job = loop.run_in_executor(
+                self._executor,
+                self._generate_and_update_cache,
+                generation_kwargs,
+                prompt_ids,
+                session_id,
+                messages,
+                streamer,
+            )
 
-        thread.join()
+        completed = False
+        try:
+            while True:
+                token = await token_queue.get()
+                if token is None:
+                    break
+                yield token, cache_reused
+            completed = True
+        finally:
+            # Consumer went away (task cancelled / generator closed): stop the
+            # worker too, and wait for it so the session cache stays consistent.
+            if not completed:
+                cancel_event.set()
+            await asyncio.shield(job)
+            if self._cancel_events.get(session_id) is cancel_event:
+                self._cancel_events.pop(session_id, None)
+
+        if cancel_event.is_set():
+            self._generation_errors.pop(session_id, None)
+            self._cancelled_turns.add(session_id)
+            logger.info("llm_generation_cancelled", session_id=session_id)
+            return
 
         if session_id in self._generation_errors:
             error = self._generation_errors.pop(session_id)
@@ -332,30 +576,198 @@ class LLMWithKVCache:
 
             raise error
 
+    def _temperature(self) -> float:
+        # Degraded mode decodes greedily: cheaper per token and deterministic.
+        return 0.0 if self.degraded else self.settings.llm_temperature
+
+    def _record_ttft(self, request_start: float, trace) -> None:
+        ttft_ms = (time.perf_counter() - request_start) * 1000
+        self.ttft_ms.record(ttft_ms)
+        if trace is not None:
+            trace.add("llm_ttft", ttft_ms)
+
+    def kv_cache_bytes(self) -> int:
+        """Bytes held by per-session KV caches (target and draft)."""
+        caches = list(self._session_caches.values()) + list(self._session_draft_caches.values())
+        return sum(_cache_nbytes(cache) for cache in caches)
+
+    def _encode_prompt(self, session_id: str, messages: List[dict]) -> tuple[List[int], int]:
+        """
+        Return prompt token ids and how many leading ids the session cache covers.
+
+        The second value is 0 when the cache cannot be reused.
+        """
+        cached_ids = self._session_input_ids.get(session_id)
+        if cached_ids is None or session_id not in self._session_caches:
+            return self._encoder.encode_full(messages), 0
+
+        encoded_messages = self._session_messages.get(session_id)
+        if (
+            self._encoder.incremental
+            and encoded_messages is not None
+            and len(messages) > len(encoded_messages)
+            and self._messages_match(messages[: len(encoded_messages)], encoded_messages)
+        ):
+            prompt_ids = list(cached_ids)
+            if encoded_messages[-1]["role"] == "assistant":
+                prompt_ids += self._encoder.close_assistant(prompt_ids)
+            for message in messages[len(encoded_messages):]:
+                prompt_ids += self._encoder.encode_message(message)
+            prompt_ids += self._encoder.generation_prompt_ids
+            return prompt_ids, len(cached_ids)
+
+        # History was edited or the cache came from storage without a message
+        # record: re-encode and fall back to a token-list prefix check.
+        prompt_ids = self._encoder.encode_full(messages)
+        cached_length = len(cached_ids)
+        if len(prompt_ids) > cached_length and prompt_ids[:cached_length] == cached_ids:
+            return prompt_ids, cached_length
+        return prompt_ids, 0
+
+    @staticmethod
+    def _messages_match(messages: List[dict], encoded: List[dict]) -> bool:
+        # Sessions keep a reply as its spoken sentence chunks joined by single
+        # spaces, while the encoded record has the decoded text with its
+        # newlines; only whitespace may differ.
+        return all(
+            a["role"] == b["role"] and a["content"].split() == b["content"].split()
+            for a, b in zip(messages, encoded)
+        )
+
+    def _store_turn_state(
+        self,
+        session_id: str,
+        messages: List[dict],
+        prompt_ids: List[int],
+        new_ids: List[int],
+    ) -> None:
+        reply = self.tokenizer.decode(new_ids, skip_special_tokens=True)
+        self._session_input_ids[session_id] = prompt_ids + new_ids
+        self._session_messages[session_id] = messages + [{"role": "assistant", "content": reply}]
+        self._session_reply_starts[session_id] = len(prompt_ids)
+
     def _generate_and_update_cache(
         self,
         generation_kwargs: dict,
+        prompt_ids: List[int],
         session_id: str,
-        prompt_input_ids: torch.Tensor,
-        streamer: TextIteratorStreamer,
+        messages: List[dict],
+        streamer: AsyncTokenStreamer,
     ) -> None:
         try:
+            start = time.perf_counter()
             with torch.no_grad():
                 outputs = self.model.generate(**generation_kwargs)
 
-            sequences = outputs.sequences.detach().cpu()
+            # Only the new tokens cross back to the host.
+            new_ids = outputs.sequences[0, len(prompt_ids):].tolist()
+            self._record_baseline_rate(len(new_ids), time.perf_counter() - start)
             past_key_values = getattr(outputs, "past_key_values", None)
 
             if past_key_values is not None:
                 self._session_caches[session_id] = past_key_values
-                self._session_input_ids[session_id] = sequences
+                self._store_turn_state(session_id, messages, prompt_ids, new_ids)
             else:
-                self._session_input_ids[session_id] = prompt_input_ids.detach().cpu()
+                self._session_caches.pop(session_id, None)
+                self._session_input_ids.pop(session_id, None)
+                self._session_messages.pop(session_id, None)
+                self._session_reply_starts.pop(session_id, None)
 
         except Exception as e:
             self._generation_errors[session_id] = e
             streamer.on_finalized_text("", stream_end=True)
 
+    def _speculative_generate_and_update_cache(
+        self,
+        full_input_ids: torch.Tensor,
+        prompt_ids: List[int],
+        past_key_values: Optional[Cache],
+        session_id: str,
+        messages: List[dict],
+        streamer: AsyncTokenStreamer,
+        cancel_event: threading.Event,
+    ) -> None:
+        try:
+            draft_cache = self._session_draft_caches.get(session_id)
+
+            result = self._speculative.generate(
+                input_ids=full_input_ids,
+                max_new_tokens=self.settings.llm_max_tokens,
+                temperature=self._temperature(),
+                top_p=self.settings.llm_top_p,
+                past_key_values=past_key_values,
+                draft_past_key_values=draft_cache,
+                streamer=streamer,
+                stop_event=cancel_event,
+            )
+
+            self._session_caches[session_id] = result.past_key_values
+            self._session_draft_caches[session_id] = result.draft_past_key_values
+            self._store_turn_state(
+                session_id,
+                messages,
+                prompt_ids,
+                result.sequences[0, len(prompt_ids):].tolist(),
+            )
+
+            self._record_speculative_stats(session_id, result)
+
+        except Exception as e:
+            self._session_draft_caches.pop(session_id, None)
+            self._generation_errors[session_id] = e
+            streamer.on_finalized_text("", stream_end=True)
+
+    def _record_baseline_rate(self, new_tokens: int, elapsed_s: float) -> None:
+        if new_tokens <= 0 or elapsed_s <= 0:
+            return
+        rate = new_tokens / elapsed_s
+        if self._baseline_tokens_per_second is None:
+            self._baseline_tokens_per_second = rate
+        else:
+            self._baseline_tokens_per_second = 0.8 * self._baseline_tokens_per_second + 0.2 * rate
+
+    def _record_speculative_stats(self, session_id: str, result) -> None:
+        stats = self._speculative_stats.setdefault(
+            session_id,
+            {"turns": 0, "drafted": 0, "accepted": 0, "tokens": 0, "seconds": 0.0},
+        )
+        stats["turns"] += 1
+        stats["drafted"] += result.drafted_tokens
+        stats["accepted"] += result.accepted_tokens
+        stats["tokens"] += result.new_tokens
+        stats["seconds"] += result.elapsed_s
+
+        tokens_per_second = result.new_tokens / max(result.elapsed_s, 0.001)
+        baseline = self._baseline_tokens_per_second
+
+        logger.info(
+            "llm_speculative_turn",
+            session_id=session_id,
+            drafted_tokens=result.drafted_tokens,
+            accepted_tokens=result.accepted_tokens,
+            acceptance_rate=result.acceptance_rate,
+            tokens_per_target_forward=result.new_tokens / max(result.target_forwards, 1),
+            tokens_per_second=tokens_per_second,
+            baseline_tokens_per_second=baseline,
+            uplift=tokens_per_second / baseline if baseline else None,
+        )
+
+    def speculative_stats(self, session_id: str) -> Optional[dict]:
+        """Per-session acceptance rate and tokens/s uplift, if speculation ran."""
+        stats = self._speculative_stats.get(session_id)
+        if stats is None:
+            return None
+
+        tokens_per_second = stats["tokens"] / max(stats["seconds"], 0.001)
+        baseline = self._baseline_tokens_per_second
+        return {
+            **stats,
+            "acceptance_rate": stats["accepted"] / stats["drafted"] if stats["drafted"] else 0.0,
+            "tokens_per_second": tokens_per_second,
+            "baseline_tokens_per_second": baseline,
+            "uplift": tokens_per_second / baseline if baseline else None,
+        }
+
     def _build_messages(
         self,
         conversation_history: List[ConversationMessage],
@@ -379,11 +791,65 @@ class LLMWithKVCache:
 
         return messages
 
+    def _response_cache_key(
+        self,
+        conversation_history: List[ConversationMessage],
+        product_context: Optional[str],
+        customer_name: Optional[str] = None,
+    ) -> Optional[tuple[str, str]]:
+        """
+        (utterance, context key) for the response cache, or None if not cacheable.
+
+        Whether the prompt names a customer is part of the context: a reply
+        generated for a named customer is never served to an anonymous one,
+        nor the other way round. The name itself is left out so named
+        customers still share answers that do not use it (see
+        _store_cached_response).
+        """
+        if self.response_cache is None:
+            return None
+
+        turns = [m for m in conversation_history if m.role != MessageRole.SYSTEM]
+        if not turns or turns[-1].role != MessageRole.USER:
+            return None
+
+        context_turns = self.settings.llm_response_cache_context_turns
+        dialogue_state = [
+            f"{m.role.value}:{m.content}"
+            for m in (turns[-1 - context_turns:-1] if context_turns else [])
+        ]
+        if customer_name:
+            dialogue_state.append("customer:named")
+        context_key = ResponseCache.context_key(
+            product_context or DEFAULT_PRODUCT_CONTEXT,
+            dialogue_state,
+        )
+        return turns[-1].content, context_key
+
+    def _store_cached_response(
+        self,
+        cache_key: tuple[str, str],
+        response: str,
+        customer_name: Optional[str],
+        generation_seconds: float,
+    ) -> None:
+        # A reply that uses the customer's name, or any part of it ("Thanks,
+        # Priya" for "Priya Shah"), is personalized; never share it.
+        if customer_name:
+            words = set(re.findall(r"\w+", response.lower()))
+            if any(part in words for part in re.findall(r"\w+", customer_name.lower())):
+                return
+        utterance, context_key = cache_key
+        self.response_cache.store(utterance, context_key, response, generation_seconds)
+
     def _load_serialized_cache(self, session_id: str, payload: bytes) -> None:
         try:
             state = pickle.loads(payload)
             cache = state.get("cache")
             input_ids = state.get("input_ids")
+            if isinstance(input_ids, torch.Tensor):
+                # Payloads written before token ids were kept as lists.
+                input_ids = input_ids.view(-1).tolist()
             if cache is not None and input_ids is not None:
                 self._session_caches[session_id] = cache
                 self._session_input_ids[session_id] = input_ids
@@ -411,11 +877,111 @@ class LLMWithKVCache:
             )
             return None
 
-    def clear_session_cache(self, session_id: str) -> None:
-        self._session_caches.pop(session_id, None)
+    def cancel_generation(self, session_id: str) -> bool:
+        """
+        Stop in-flight generation for a session at the next token.
+
+        Returns True if a generation was running.
+        """
+        cancel_event = self._cancel_events.get(session_id)
+        if cancel_event is None:
+            return False
+        cancel_event.set()
+        logger.info("llm_generation_cancel_requested", session_id=session_id)
+        return True
+
+    def truncate_session_cache(self, session_id: str, spoken_text: str) -> int:
+        """
+        Cut the session's last reply back to what the caller actually heard
+        (barge-in), so the next turn reuses the KV cache up to that point
+        instead of attending to words that were never spoken.
+
+        Call once the cancelled generation has finished. Returns the number
+        of reply tokens dropped.
+        """
+        input_ids = self._session_input_ids.get(session_id)
+        reply_start = self._session_reply_starts.get(session_id)
+        cache = self._session_caches.get(session_id)
+        if input_ids is None or reply_start is None or cache is None:
+            return 0
+
+        reply_ids = input_ids[reply_start:]
+        # Whitespace is normalised on both sides: the chunker strips each
+        # sentence and the caller joins them with single spaces, while the
+        # reply may separate them with newlines or double spaces.
+        spoken = " ".join(spoken_text.split())
+        # Longest reply prefix whose text was spoken. Decoded text only grows
+        # with the prefix, so binary search needs O(log n) decodes.
+        low, high = 0, len(reply_ids)
+        while low < high:
+            mid = (low + high + 1) // 2
+            text = " ".join(self.tokenizer.decode(reply_ids[:mid], skip_special_tokens=True).split())
+            if spoken.startswith(text):
+                low = mid
+            else:
+                high = mid - 1
+        dropped = len(reply_ids) - low
+        if dropped == 0:
+            return 0
+
+        messages = list(self._session_messages.get(session_id) or [])
+        keep_ids = reply_start + low
+        encoder = self._encoder
+        generation_prompt = encoder.generation_prompt_ids if encoder is not None else []
+        if (
+            low == 0
+            and encoder is not None
+            and encoder.incremental
+            and input_ids[reply_start - len(generation_prompt):reply_start] == generation_prompt
+        ):
+            # Nothing was heard: drop the assistant turn and its generation prompt.
+            keep_ids = reply_start - len(generation_prompt)
+            messages = messages[:-1]
+        elif messages and messages[-1]["role"] == "assistant":
+            messages[-1] = {
+                "role": "assistant",
+                "content": self.tokenizer.decode(reply_ids[:low], skip_special_tokens=True),
+            }
+
+        for past in (cache, self._session_draft_caches.get(session_id)):
+            if past is None:
+                continue
+            if not hasattr(past, "crop"):
+                # Legacy tuple caches cannot be cut; rebuild from scratch next turn.
+                self.clear_session_cache(session_id)
+                return len(reply_ids)
+            past.crop(keep_ids)
+
+        self._session_input_ids[session_id] = input_ids[:keep_ids]
+        self._session_messages[session_id] = messages
+        self._session_reply_starts.pop(session_id, None)
+        logger.info(
+            "kv_cache_truncated",
+            session_id=session_id,
+            tokens_dropped=dropped,
+            tokens_kept=keep_ids,
+        )
+        return dropped
+
+    def clear_session_cache(self, session_id: str) -> int:
+        """Drop a session's KV caches and turn state; returns the bytes released."""
+        caches = (
+            self._session_caches.pop(session_id, None),
+            self._session_draft_caches.pop(session_id, None),
+        )
+        released = sum(_cache_nbytes(cache) for cache in caches if cache is not None)
         self._session_input_ids.pop(session_id, None)
+        self._session_messages.pop(session_id, None)
+        self._session_reply_starts.pop(session_id, None)
         self._generation_errors.pop(session_id, None)
-        logger.info("kv_cache_cleared", session_id=session_id)
+
+        stats = self.speculative_stats(session_id)
+        if stats is not None:
+            logger.info("llm_speculative_session_summary", session_id=session_id, **stats)
+            self._speculative_stats.pop(session_id, None)
+
+        logger.info("kv_cache_cleared", session_id=session_id, bytes_released=released)
+        return released
 
     async def _generate_blocking(
         self,
@@ -451,10 +1017,14 @@ class LLMWithKVCache:
 
         if self.model is not None:
             del self.model
+        if self.draft_model is not None:
+            del self.draft_model
         if self.tokenizer is not None:
             del self.tokenizer
 
         self.model = None
+        self.draft_model = None
+        self._speculative = None
         self.tokenizer = None
         self._initialized = False
 
@@ -465,10 +1035,27 @@ class LLMWithKVCache:
 
         logger.info("llm_service_cleaned_up")
 
+    def prepare_for_fork(self) -> None:
+        """Stop the generation thread so no lock is held across fork()."""
+        self._executor.shutdown(wait=True)
+
+    def after_fork(self) -> None:
+        """Give a forked worker its own thread and loop-bound lock; weights stay shared."""
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._generation_lock = asyncio.Lock()
+        self.clear_all_session_caches()
+
     def clear_all_session_caches(self) -> None:
         self._session_caches.clear()
         self._session_input_ids.clear()
+        self._session_messages.clear()
+        self._session_reply_starts.clear()
         self._generation_errors.clear()
+        for cancel_event in self._cancel_events.values():
+            cancel_event.set()
+        self._cancel_events.clear()
+        self._session_draft_caches.clear()
+        self._speculative_stats.clear()
 
 
 _llm_service: Optional[LLMWithKVCache] = None
@@ -486,3 +1073,46 @@ async def get_llm_kvcache_service() -> LLMWithKVCache:
             _llm_service = instance
 
     return _llm_service
+
+
+def peek_llm_kvcache_service() -> Optional[LLMWithKVCache]:
+    """The LLM singleton if this worker already loaded it; never loads it."""
+    return _llm_service
+
+
+def _cache_nbytes(cache: Any) -> int:
+    layers = getattr(cache, "layers", None)
+    if layers is not None:
+        tensors = [t for layer in layers for t in (getattr(layer, "keys", None), getattr(layer, "values", None))]
+    elif hasattr(cache, "key_cache"):
+        tensors = list(cache.key_cache) + list(cache.value_cache)
+    else:
+        # legacy tuple-of-(key, value) format
+        tensors = [t for layer in cache for t in layer]
+    return sum(t.numel() * t.element_size() for t in tensors if isinstance(t, torch.Tensor))
+
+
+def _collect_llm_metrics():
+    llm = _llm_service
+    if llm is None:
+        return []
+
+    families = [
+        histogram("saletech_llm_ttft_seconds", "LLM request to first token.", llm.ttft_ms),
+        counter("saletech_llm_tokens_generated_total", "Tokens streamed by the LLM.", llm.tokens_generated),
+        counter("saletech_llm_generation_seconds_total", "Wall time spent generating.", llm.generation_seconds),
+        gauge("saletech_llm_kv_cache_bytes", "Bytes held by per-session KV caches.", llm.kv_cache_bytes()),
+        gauge("saletech_llm_kv_cache_sessions", "Sessions with a live KV cache.", len(llm._session_caches)),
+    ]
+    if llm.last_tokens_per_second is not None:
+        families.append(
+            gauge("saletech_llm_tokens_per_second", "Decode rate of the last turn.", llm.last_tokens_per_second)
+        )
+    if llm.response_cache is not None:
+        cache_metrics = llm.response_cache.metrics
+        families.append(counter("saletech_llm_response_cache_hits_total", "Response cache hits.", cache_metrics["hits"]))
+        families.append(counter("saletech_llm_response_cache_misses_total", "Response cache misses.", cache_metrics["misses"]))
+    return families
+
+
+register_collector("llm", _collect_llm_metrics)
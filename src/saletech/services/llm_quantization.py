@@ -0,0 +1,248 @@
+import hashlib
+import os
+from typing import Any, Callable, Optional, Set
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+from saletech.utils.logger import get_logger
+
+
+logger = get_logger("saletech.llm.quantization")
+
+QUANTIZATION_MODES = ("none", "int8_dynamic", "int4_weight_only")
+
+
+# Modules kept in float: the output projection is the largest matrix and the
+# most sensitive to 4-bit error, and is often tied to the input embedding.
+INT4_SKIP_MODULES = ("lm_head",)
+
+
+def _int4_kernel_available() -> bool:
+    return hasattr(torch.ops.aten, "_weight_int4pack_mm_for_cpu") and hasattr(
+        torch.ops.aten, "_convert_weight_to_int4pack_for_cpu"
+    )
+
+
+class Int4WeightOnlyLinear(nn.Module):
+    """
+    Linear layer with group-wise 4-bit weights and one float scale per
+    `group_size` input columns.
+
+    Where torch ships the packed CPU kernel (and out_features is a multiple
+    of 16), the weights are stored in its layout and the matmul runs on them
+    directly with bfloat16 activations, so decode never materializes a float
+    weight. Otherwise two signed 4-bit values are packed per byte and the
+    weight is dequantized per forward. Either way resident weight memory is
+    ~4x smaller than float.
+    """
+
+    def __init__(self, linear: nn.Linear, group_size: int = 64):
+        super().__init__()
+        out_features, in_features = linear.weight.shape
+        if in_features % group_size:
+            raise ValueError(f"in_features={in_features} not divisible by group_size={group_size}")
+        if group_size % 2:
+            raise ValueError("group_size must be even to pack 4-bit pairs")
+
+        self.in_features = in_features
+        self.out_features = out_features
+        self.group_size = group_size
+        self.uses_kernel = _int4_kernel_available() and out_features % 16 == 0
+
+        weight = linear.weight.detach().float().reshape(out_features, -1, group_size)
+        scales = weight.abs().amax(dim=-1, keepdim=True).clamp(min=1e-8) / 7.0
+        q = torch.clamp(torch.round(weight / scales), -8, 7).to(torch.int8) + 8
+        scales = scales.squeeze(-1)
+
+        if self.uses_kernel:
+            # The kernel computes (q - 8) * scale + zero per group; zeros are 0.
+            q = q.to(torch.int32).reshape(out_features, in_features)
+            self.register_buffer("packed_weight", torch.ops.aten._convert_weight_to_int4pack_for_cpu(q, 1))
+            scales_and_zeros = torch.stack((scales, torch.zeros_like(scales)), dim=-1).transpose(0, 1)
+            self.register_buffer("scales", scales_and_zeros.contiguous().to(torch.bfloat16))
+        else:
+            q = q.to(torch.uint8).reshape(out_features, in_features)
+            self.register_buffer("packed_weight", (q[:, 0::2] | (q[:, 1::2] << 4)).contiguous())
+            self.register_buffer("scales", scales.to(torch.float32))
+        if linear.bias is not None:
+            self.register_buffer("bias", linear.bias.detach().float().clone())
+        else:
+            self.bias = None
+
+    def dequantize(self) -> torch.Tensor:
+        if self.uses_kernel:
+            # The kernel's layout is opaque; multiplying by the identity reads it back.
+            eye = torch.eye(self.in_features, dtype=torch.bfloat16)
+            return self._kernel_mm(eye).t().float()
+        low = (self.packed_weight & 0x0F).to(torch.int8) - 8
+        high = (self.packed_weight >> 4).to(torch.int8) - 8
+        q = torch.stack((low, high), dim=-1).reshape(self.out_features, -1, self.group_size)
+        return (q.float() * self.scales.unsqueeze(-1)).reshape(self.out_features, self.in_features)
+
+    def _kernel_mm(self, x: torch.Tensor) -> torch.Tensor:
+        return torch.ops.aten._weight_int4pack_mm_for_cpu(x, self.packed_weight, self.group_size, self.scales)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        bias = self.bias.to(x.dtype) if self.bias is not None else None
+        if not self.uses_kernel:
+            return F.linear(x, self.dequantize().to(x.dtype), bias)
+        out = self._kernel_mm(x.reshape(-1, self.in_features).to(torch.bfloat16))
+        out = out.to(x.dtype).reshape(*x.shape[:-1], self.out_features)
+        return out + bias if bias is not None else out
+
+
+def quantize_model(model: nn.Module, mode: str, group_size: int = 64) -> nn.Module:
+    """Apply a CPU quantization mode in place where possible and return the model."""
+    if mode == "none":
+        return model
+
+    if mode == "int8_dynamic":
+        return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+    if mode == "int4_weight_only":
+        _replace_linears(model, group_size, _tied_parameters(model))
+        return model
+
+    raise ValueError(f"Unknown quantization mode '{mode}', expected one of {QUANTIZATION_MODES}")
+
+
+def _tied_parameters(model: nn.Module) -> Set[int]:
+    """ids of parameters registered under more than one name (tied weights)."""
+    seen: Set[int] = set()
+    tied: Set[int] = set()
+    for _, param in model.named_parameters(remove_duplicate=False):
+        (tied if id(param) in seen else seen).add(id(param))
+    return tied
+
+
+def _replace_linears(module: nn.Module, group_size: int, tied: Set[int]) -> None:
+    for name, child in module.named_children():
+        if isinstance(child, nn.Linear):
+            if name not in INT4_SKIP_MODULES and id(child.weight) not in tied and child.in_features % group_size == 0:
+                setattr(module, name, Int4WeightOnlyLinear(child, group_size))
+        else:
+            _replace_linears(child, group_size, tied)
+
+
+def quantized_cache_path(cache_dir: str, model_name: str, mode: str, group_size: int) -> str:
+    """
+    Cache file for one (model, mode) pair.
+
+    The key includes torch/transformers versions because the file pickles
+    the whole quantized module, which is only safe to reload with the same
+    library versions, and the CPU capability the int4 weights were packed for.
+    """
+    try:
+        import transformers
+        transformers_version = transformers.__version__
+    except Exception:
+        transformers_version = "unknown"
+
+    # The int4 kernel's weight layout depends on the CPU's instruction set.
+    cpu = torch.backends.cpu.get_cpu_capability()
+    key = f"{model_name}|{mode}|{group_size}|{torch.__version__}|{transformers_version}|{cpu}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    safe_name = model_name.replace("/", "--")
+    return os.path.join(cache_dir, f"{safe_name}.{mode}.{digest}.pt")
+
+
+def load_or_quantize(
+    loader: Callable[[], nn.Module],
+    model_name: str,
+    mode: str,
+    cache_dir: Optional[str],
+    group_size: int = 64,
+) -> nn.Module:
+    """
+    Return a quantized model, reusing the on-disk cache when present.
+
+    A cache hit is memory-mapped, so the float checkpoint is never loaded
+    and nothing is re-quantized.
+    """
+    if mode == "none":
+        return loader()
+
+    path = quantized_cache_path(cache_dir, model_name, mode, group_size) if cache_dir else None
+
+    if path and os.path.exists(path):
+        try:
+            model = torch.load(path, mmap=True, weights_only=False)
+            logger.info("quantized_model_cache_hit", path=path, mode=mode)
+            return model
+        except Exception as e:
+            logger.warning("quantized_model_cache_load_failed", path=path, error=str(e))
+
+    model = quantize_model(loader(), mode, group_size)
+
+    if path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            torch.save(model, tmp_path)
+            os.replace(tmp_path, path)
+            logger.info("quantized_model_cached", path=path, mode=mode)
+        except Exception as e:
+            logger.warning("quantized_model_cache_write_failed", path=path, error=str(e))
+
+    return model
+
+
+def parse_cpu_list(spec: str) -> Set[int]:
+    """Parse a Linux-style CPU list such as "0-3,8,10-11"."""
+    cpus: Set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def apply_cpu_profile(num_threads: int = 0, affinity: Optional[str] = None) -> dict[str, Any]:
+    """
+    Pin the calling thread and set torch intra-op threads.
+
+    Must run on the thread that will execute inference: on Linux affinity is
+    per thread, and the OpenMP pool inherits it from the thread that first
+    starts a parallel region.
+    """
+    applied: dict[str, Any] = {}
+
+    if affinity and hasattr(os, "sched_setaffinity"):
+        cpus = parse_cpu_list(affinity)
+        os.sched_setaffinity(0, cpus)
+        applied["affinity"] = sorted(cpus)
+        if not num_threads:
+            num_threads = len(cpus)
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    applied["num_threads"] = torch.get_num_threads()
+
+    return applied
+
+
+def model_memory_bytes(model: nn.Module) -> int:
+    """Bytes held by parameters, buffers and packed quantized weights."""
+    total = 0
+    seen = set()
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        if id(tensor) in seen:
+            continue
+        seen.add(id(tensor))
+        total += tensor.numel() * tensor.element_size()
+
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if packed is not None and hasattr(packed, "_weight_bias"):
+            weight, bias = packed._weight_bias()
+            total += weight.numel() * weight.element_size()
+            if bias is not None:
+                total += bias.numel() * bias.element_size()
+    return total
@@ -0,0 +1,153 @@
+import asyncio
+import inspect
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from saletech.utils.logger import get_logger
+
+
+logger = get_logger("saletech.models.registry")
+
+
+class ModelStatus(str, Enum):
+    PENDING = "pending"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+
+class _ModelEntry:
+    def __init__(self, name: str, loader: Callable[[], Awaitable[Any]], required: bool):
+        self.name = name
+        self.loader = loader
+        self.required = required
+        self.status = ModelStatus.PENDING
+        self.instance: Any = None
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+
+
+class ModelRegistry:
+    """
+    Loads every model a worker needs, concurrently, once.
+
+    Design:
+    - each model registers an async loader (the existing service singletons)
+    - load_all() runs them with asyncio.gather; the services already load on
+      their own executors, so VAD, ASR and LLM loads overlap
+    - readiness (all required models loaded) is tracked separately from
+      liveness, so a booting worker answers /health but not /ready
+    - per-model wall time plus the service's own load/warm-up split is kept
+      for the readiness report
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._started_at: Optional[float] = None
+        self._ready_at: Optional[float] = None
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Awaitable[Any]],
+        required: bool = True,
+    ) -> None:
+        self._entries[name] = _ModelEntry(name, loader, required)
+
+    async def load_all(self) -> None:
+        self._started_at = time.time()
+        logger.info("model_registry_loading", models=list(self._entries))
+
+        await asyncio.gather(
+            *(self._load(entry) for entry in self._entries.values())
+        )
+
+        if self.ready:
+            self._ready_at = time.time()
+            logger.info(
+                "model_registry_ready",
+                total_ms=(self._ready_at - self._started_at) * 1000,
+                models={name: e.timings for name, e in self._entries.items()},
+            )
+        else:
+            logger.error(
+                "model_registry_not_ready",
+                failed=[e.name for e in self._entries.values() if e.status == ModelStatus.FAILED],
+            )
+
+    async def _load(self, entry: _ModelEntry) -> None:
+        entry.status = ModelStatus.LOADING
+        start = time.time()
+
+        try:
+            entry.instance = await entry.loader()
+            entry.timings = {
+                "total_ms": (time.time() - start) * 1000,
+                **getattr(entry.instance, "timings", {}),
+            }
+            entry.status = ModelStatus.READY
+            logger.info("model_ready", model=entry.name, **entry.timings)
+
+        except Exception as e:
+            entry.status = ModelStatus.FAILED
+            entry.error = str(e)
+            logger.error("model_load_failed", model=entry.name, error=str(e), exc_info=True)
+
+    def get(self, name: str) -> Any:
+        entry = self._entries.get(name)
+        if entry is None or entry.status != ModelStatus.READY:
+            return None
+        return entry.instance
+
+    @property
+    def ready(self) -> bool:
+        return all(
+            e.status == ModelStatus.READY
+            for e in self._entries.values()
+            if e.required
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "startup_ms": (
+                (self._ready_at - self._started_at) * 1000
+                if self._ready_at and self._started_at else None
+            ),
+            "models": {
+                name: {
+                    "status": e.status.value,
+                    "required": e.required,
+                    "timings": e.timings,
+                    "error": e.error,
+                }
+                for name, e in self._entries.items()
+            },
+        }
+
+    def prepare_for_fork(self) -> None:
+        """Quiesce loaded models before the pre-fork parent forks workers."""
+        self._call_hook("prepare_for_fork")
+
+    def after_fork(self) -> None:
+        """Recreate per-process state (threads, locks) in a forked worker."""
+        self._call_hook("after_fork")
+
+    def _call_hook(self, hook_name: str) -> None:
+        for entry in self._entries.values():
+            hook = getattr(entry.instance, hook_name, None)
+            if hook is not None:
+                hook()
+
+    async def cleanup(self) -> None:
+        for entry in self._entries.values():
+            cleanup = getattr(entry.instance, "cleanup", None)
+            if cleanup is None:
+                continue
+            try:
+                result = cleanup()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning("model_cleanup_failed", model=entry.name, error=str(e))
@@ -0,0 +1,237 @@
+import hashlib
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_FILLERS = {"um", "umm", "uh", "hmm", "please"}
+# Words a paraphrase may add, drop or reorder without changing the question.
+# Negations are deliberately absent: "can I cancel" and "can I not cancel"
+# must never share an answer.
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "am", "do", "does", "did",
+    "can", "could", "will", "would", "should", "may", "might", "i", "me", "my",
+    "we", "our", "you", "your", "it", "its", "this", "that", "there", "what",
+    "whats", "how", "which", "s", "of", "to", "for", "on", "in", "at", "with",
+    "about", "and", "or", "so", "just", "tell", "know", "like", "get", "have", "has",
+    "any", "some", "again",
+}
+# Left over from stripping the apostrophe of "can't", "don't", ...
+_NEGATION_SUFFIX = "t"
+
+
+class _CacheEntry:
+    __slots__ = ("response", "vector", "terms", "expires_at", "generation_seconds")
+
+    def __init__(
+        self,
+        response: str,
+        vector: np.ndarray,
+        terms: frozenset,
+        expires_at: float,
+        generation_seconds: float,
+    ):
+        self.response = response
+        self.vector = vector
+        self.terms = terms
+        self.expires_at = expires_at
+        self.generation_seconds = generation_seconds
+
+
+class ResponseCache:
+    """
+    Semantic response cache for frequent FAQ turns.
+
+    Design:
+    - key = (context hash, normalized utterance); the context hash covers
+      product context and recent dialogue state
+    - exact match first, then cosine similarity over hashed character
+      n-gram vectors of entries with the same context hash (no model load).
+      A similar entry only counts if it has the same key terms (content
+      words, numbers, negations): "price of the basic plan" never answers
+      "price of the premium plan", whatever the cosine says
+    - TTL on every entry, LRU eviction once `max_entries` is reached
+    - tracks hit rate and GPU-seconds saved (generation time of the
+      original response, counted once per hit)
+
+    Personalization is the caller's responsibility: responses that depend
+    on per-customer data must not be stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.9,
+        dim: int = 512,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.dim = dim
+
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._by_context: Dict[str, Set[str]] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._saved_gpu_seconds = 0.0
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        text = _PUNCTUATION.sub(" ", text.lower())
+        return " ".join(w for w in text.split() if w not in _FILLERS)
+
+    @staticmethod
+    def context_key(product_context: str, dialogue_state: List[str]) -> str:
+        digest = hashlib.sha1(product_context.encode("utf-8"))
+        for turn in dialogue_state:
+            digest.update(b"\x00")
+            digest.update(ResponseCache.normalize(turn).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def key_terms(normalized: str) -> frozenset:
+        """Content words (naively singularised), numbers and negations of a normalized utterance."""
+        terms = set()
+        for word in normalized.split():
+            if word == _NEGATION_SUFFIX or word in ("cannot", "cant", "dont", "doesnt", "wont"):
+                word = "not"
+            elif word in _STOPWORDS:
+                continue
+            elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+                word = word[:-1]
+            terms.add(word)
+        return frozenset(terms)
+
+    # ------------------------------------------------------------------
+
+    def lookup(self, utterance: str, context_key: str, now: Optional[float] = None) -> Optional[str]:
+        now = time.monotonic() if now is None else now
+        normalized = self.normalize(utterance)
+        if not normalized:
+            return None
+
+        key = (context_key, normalized)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            key, entry = self._nearest(context_key, normalized, now)
+
+        if entry is None or entry.expires_at <= now:
+            if entry is not None:
+                self._remove(key)
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        self._saved_gpu_seconds += entry.generation_seconds
+        return entry.response
+
+    def store(
+        self,
+        utterance: str,
+        context_key: str,
+        response: str,
+        generation_seconds: float,
+        now: Optional[float] = None,
+    ) -> None:
+        now = time.monotonic() if now is None else now
+        normalized = self.normalize(utterance)
+        if not normalized or not response:
+            return
+
+        key = (context_key, normalized)
+        self._entries[key] = _CacheEntry(
+            response=response,
+            vector=self._embed(normalized),
+            terms=self.key_terms(normalized),
+            expires_at=now + self.ttl_seconds,
+            generation_seconds=generation_seconds,
+        )
+        self._entries.move_to_end(key)
+        self._by_context.setdefault(context_key, set()).add(normalized)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_context.clear()
+
+    @property
+    def metrics(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "saved_gpu_seconds": self._saved_gpu_seconds,
+        }
+
+    # ------------------------------------------------------------------
+
+    def _nearest(
+        self,
+        context_key: str,
+        normalized: str,
+        now: float,
+    ) -> Tuple[Optional[Tuple[str, str]], Optional[_CacheEntry]]:
+        candidates = self._by_context.get(context_key)
+        if not candidates:
+            return None, None
+
+        terms = self.key_terms(normalized)
+        keys = []
+        vectors = []
+        for text in list(candidates):
+            key = (context_key, text)
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                self._remove(key)
+                continue
+            if entry.terms != terms:
+                continue
+            keys.append(key)
+            vectors.append(entry.vector)
+
+        if not keys:
+            return None, None
+
+        scores = np.stack(vectors) @ self._embed(normalized)
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None, None
+
+        return keys[best], self._entries[keys[best]]
+
+    def _embed(self, normalized: str) -> np.ndarray:
+        """Hashed character trigram + word vector, L2-normalized."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {normalized} "
+
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % self.dim] += 1.0
+        for word in normalized.split():
+            vector[zlib.crc32(word.encode("utf-8")) % self.dim] += 2.0
+
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        self._entries.pop(key, None)
+        texts = self._by_context.get(key[0])
+        if texts is not None:
+            texts.discard(key[1])
+            if not texts:
+                del self._by_context[key[0]]
@@ -0,0 +1,126 @@
+from typing import List, Optional
+
+
+# Sentence terminals, including Devanagari danda used in Hinglish replies.
+SENTENCE_TERMINALS = {".", "!", "?", "…", "।", "॥", "。", "！", "？"}
+
+# Clause boundaries are only used once a chunk is long enough to speak.
+CLAUSE_TERMINALS = {",", ";", ":", "—", "–", "，", "；"}
+
+# Characters that may trail a terminal and belong to the same chunk.
+CLOSING_CHARS = {'"', "'", ")", "]", "}", "”", "’", "»"}
+
+# Lower-cased words that end with "." without ending the sentence.
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt",
+    "rs", "inr", "usd", "vs", "approx", "dept",
+    "ltd", "pvt", "inc", "co", "corp", "e.g", "i.e", "a.m", "p.m",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept",
+    "oct", "nov", "dec", "fig", "ref",
+}
+
+
+class SentenceChunker:
+    """
+    Incremental sentence/clause segmenter for streamed LLM text.
+
+    Design:
+    - push() sub-word tokens as they arrive, get back speakable chunks
+    - a terminal only counts once the next character is whitespace, so
+      "3.5", "1,00,000" and "e.g." are never split mid-token
+    - clause punctuation splits only after `min_clause_chars`
+    - chunks never exceed `max_chars`; long runs are cut at a space
+    - flush() returns whatever is left at end of stream
+    """
+
+    def __init__(self, min_clause_chars: int = 24, max_chars: int = 160):
+        self.min_clause_chars = min_clause_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def push(self, text: str) -> List[str]:
+        """Add streamed text and return every chunk that is now complete."""
+        if not text:
+            return []
+
+        self._buffer += text
+        chunks = []
+
+        while True:
+            cut = self._find_boundary()
+            if cut is None:
+                break
+
+            chunk = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:].lstrip()
+            if chunk:
+                chunks.append(chunk)
+
+        return chunks
+
+    def flush(self) -> Optional[str]:
+        """Return the remaining text, if any, and reset the buffer."""
+        chunk = self._buffer.strip()
+        self._buffer = ""
+        return chunk or None
+
+    def _find_boundary(self) -> Optional[int]:
+        buf = self._buffer
+        n = len(buf)
+
+        for i, ch in enumerate(buf):
+            if ch == "\n":
+                if buf[:i].strip():
+                    return i + 1
+                continue
+
+            if ch in SENTENCE_TERMINALS:
+                end = self._skip_trailing(i + 1)
+                if end >= n:
+                    # Need one more character to decide ("3." vs "3.5").
+                    return None
+                if not buf[end].isspace():
+                    continue
+                if ch == "." and self._is_abbreviation(buf[:i]):
+                    continue
+                return end
+
+            if ch in CLAUSE_TERMINALS and i + 1 >= self.min_clause_chars:
+                if i + 1 >= n:
+                    return None
+                if buf[i + 1].isspace():
+                    return i + 1
+
+            if i + 1 >= self.max_chars:
+                return self._fallback_cut()
+
+        return None
+
+    def _skip_trailing(self, pos: int) -> int:
+        """Skip repeated terminals ("?!", "...") and closing quotes/brackets."""
+        buf = self._buffer
+        while pos < len(buf) and (buf[pos] in SENTENCE_TERMINALS or buf[pos] in CLOSING_CHARS):
+            pos += 1
+        return pos
+
+    def _is_abbreviation(self, before: str) -> bool:
+        words = before.split()
+        if not words:
+            return False
+
+        word = words[-1].lstrip("\"'([{“‘").rstrip(".")
+        lowered = word.lower()
+
+        if lowered in ABBREVIATIONS:
+            return True
+        # Initials such as "A. Sharma".
+        if len(word) == 1 and word.isalpha():
+            return True
+        # List markers such as "1. Pricing" at the start of a chunk.
+        if word.isdigit() and len(words) == 1:
+            return True
+        return False
+
+    def _fallback_cut(self) -> int:
+        cut = self._buffer.rfind(" ", 0, self.max_chars)
+        return cut if cut > 0 else self.max_chars
@@ -0,0 +1,245 @@
+import time
+from typing import Any, List, Sequence, Tuple
+
+import torch
+
+try:
+    from transformers.cache_utils import DynamicCache
+except Exception:  # pragma: no cover - compatibility with older transformers
+    DynamicCache = None
+
+
+class SpeculativeResult:
+    """Outcome of one speculative generation call."""
+
+    def __init__(
+        self,
+        sequences: torch.Tensor,
+        past_key_values: Any,
+        draft_past_key_values: Any,
+        drafted_tokens: int,
+        accepted_tokens: int,
+        new_tokens: int,
+        target_forwards: int,
+        elapsed_s: float,
+    ):
+        self.sequences = sequences
+        self.past_key_values = past_key_values
+        self.draft_past_key_values = draft_past_key_values
+        self.drafted_tokens = drafted_tokens
+        self.accepted_tokens = accepted_tokens
+        self.new_tokens = new_tokens
+        self.target_forwards = target_forwards
+        self.elapsed_s = elapsed_s
+
+    @property
+    def acceptance_rate(self) -> float:
+        if not self.drafted_tokens:
+            return 0.0
+        return self.accepted_tokens / self.drafted_tokens
+
+
+class SpeculativeDecoder:
+    """
+    Draft-and-verify decoding with a small draft model.
+
+    Design:
+    - draft model proposes `num_draft_tokens` tokens autoregressively
+    - target model scores all of them in one forward pass
+    - greedy turns accept while argmax agrees, sampled turns use
+      rejection sampling so the output distribution matches the target
+    - both caches are cropped back to the accepted prefix, so they can
+      be kept per session and reused on the next turn
+
+    Cache invariant: each cache covers a prefix of `sequences[:-1]`.
+    Tokens it has not seen yet are fed on the next forward pass.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        draft_model: Any,
+        num_draft_tokens: int,
+        eos_token_ids: Sequence[int],
+    ):
+        if DynamicCache is None:
+            raise RuntimeError("Speculative decoding requires transformers DynamicCache")
+
+        self.model = model
+        self.draft_model = draft_model
+        self.num_draft_tokens = max(1, num_draft_tokens)
+        self.eos_token_ids = set(eos_token_ids)
+
+        # Qwen checkpoints of different sizes share a tokenizer but pad the
+        # embedding matrix differently; only the shared ids are comparable.
+        self.vocab_size = min(model.config.vocab_size, draft_model.config.vocab_size)
+
+    @torch.no_grad()
+    def generate(
+        self,
+        input_ids: torch.Tensor,
+        max_new_tokens: int,
+        temperature: float,
+        top_p: float,
+        past_key_values: Any = None,
+        draft_past_key_values: Any = None,
+        streamer: Any = None,
+        stop_event: Any = None,
+    ) -> SpeculativeResult:
+        start = time.perf_counter()
+
+        ids = input_ids.to(self.model.device)
+        prompt_length = ids.shape[1]
+        cache = past_key_values if past_key_values is not None else DynamicCache()
+        draft_cache = (
+            draft_past_key_values if draft_past_key_values is not None else DynamicCache()
+        )
+
+        if streamer is not None:
+            streamer.put(ids.cpu())
+
+        drafted = 0
+        accepted = 0
+        forwards = 0
+        finished = False
+
+        while not finished:
+            if stop_event is not None and stop_event.is_set():
+                break
+
+            budget = max_new_tokens - (ids.shape[1] - prompt_length)
+            if budget <= 0:
+                break
+
+            # Each round emits accepted drafts plus one target token.
+            k = min(self.num_draft_tokens, budget - 1)
+            draft_tokens, draft_probs = self._draft(ids, draft_cache, k, temperature, top_p)
+
+            target_logits = self._forward(
+                self.model,
+                cache,
+                torch.cat([ids, draft_tokens.to(ids.device)], dim=1),
+                k + 1,
+            )
+            forwards += 1
+
+            new_tokens: List[int] = []
+            for i in range(k):
+                token = int(draft_tokens[0, i])
+                p = self._probs(target_logits[0, i], temperature, top_p)
+
+                if not self._accept(token, p, draft_probs[i], temperature):
+                    new_tokens.append(self._residual(p, draft_probs[i], temperature))
+                    break
+
+                new_tokens.append(token)
+                accepted += 1
+                if token in self.eos_token_ids:
+                    break
+            else:
+                p = self._probs(target_logits[0, k], temperature, top_p)
+                new_tokens.append(self._pick(p, temperature))
+
+            drafted += k
+            finished = new_tokens[-1] in self.eos_token_ids
+
+            appended = torch.tensor([new_tokens], dtype=ids.dtype, device=ids.device)
+            ids = torch.cat([ids, appended], dim=1)
+
+            self._crop(cache, ids.shape[1] - 1)
+            self._crop(draft_cache, ids.shape[1] - 1)
+
+            if streamer is not None:
+                streamer.put(appended.cpu())
+
+        if streamer is not None:
+            streamer.end()
+
+        return SpeculativeResult(
+            sequences=ids.detach().cpu(),
+            past_key_values=cache,
+            draft_past_key_values=draft_cache,
+            drafted_tokens=drafted,
+            accepted_tokens=accepted,
+            new_tokens=ids.shape[1] - prompt_length,
+            target_forwards=forwards,
+            elapsed_s=time.perf_counter() - start,
+        )
+
+    def _draft(
+        self,
+        ids: torch.Tensor,
+        draft_cache: Any,
+        k: int,
+        temperature: float,
+        top_p: float,
+    ) -> Tuple[torch.Tensor, List[torch.Tensor]]:
+        tokens: List[int] = []
+        probs: List[torch.Tensor] = []
+        current = ids.to(self.draft_model.device)
+
+        for _ in range(k):
+            logits = self._forward(self.draft_model, draft_cache, current, 1)
+            q = self._probs(logits[0, -1], temperature, top_p)
+            token = self._pick(q, temperature)
+
+            tokens.append(token)
+            probs.append(q)
+            current = torch.cat(
+                [current, torch.tensor([[token]], dtype=current.dtype, device=current.device)],
+                dim=1,
+            )
+
+        return torch.tensor([tokens], dtype=ids.dtype).view(1, -1), probs
+
+    @staticmethod
+    def _crop(cache: Any, keep: int) -> None:
+        """Drop cached positions beyond `keep` (rejected draft tokens)."""
+        excess = cache.get_seq_length() - keep
+        if excess > 0:
+            cache.crop(-excess)
+
+    def _forward(self, model: Any, cache: Any, ids: torch.Tensor, n_last: int) -> torch.Tensor:
+        """Feed only the tokens the cache has not seen, return the last logits."""
+        seen = cache.get_seq_length()
+        outputs = model(
+            input_ids=ids[:, seen:],
+            past_key_values=cache,
+            use_cache=True,
+        )
+        return outputs.logits[:, -n_last:, : self.vocab_size].float()
+
+    def _probs(self, logits: torch.Tensor, temperature: float, top_p: float) -> torch.Tensor:
+        if temperature <= 0:
+            return torch.softmax(logits, dim=-1)
+
+        probs = torch.softmax(logits / temperature, dim=-1)
+        if top_p < 1.0:
+            sorted_probs, sorted_idx = torch.sort(probs, descending=True)
+            cumulative = torch.cumsum(sorted_probs, dim=-1)
+            sorted_probs[cumulative - sorted_probs > top_p] = 0.0
+            probs = torch.zeros_like(probs).scatter_(-1, sorted_idx, sorted_probs)
+            probs = probs / probs.sum()
+        return probs
+
+    def _pick(self, probs: torch.Tensor, temperature: float) -> int:
+        if temperature <= 0:
+            return int(torch.argmax(probs))
+        return int(torch.multinomial(probs, 1))
+
+    def _accept(self, token: int, p: torch.Tensor, q: torch.Tensor, temperature: float) -> bool:
+        if temperature <= 0:
+            return int(torch.argmax(p)) == token
+        # Accept with probability min(1, p(x) / q(x)).
+        q_token = float(q[token].to(p.device))
+        return float(torch.rand(())) * q_token <= float(p[token])
+
+    def _residual(self, p: torch.Tensor, q: torch.Tensor, temperature: float) -> int:
+        if temperature <= 0:
+            return int(torch.argmax(p))
+        residual = torch.clamp(p - q.to(p.device), min=0.0)
+        total = residual.sum()
+        if total <= 0:
+            return self._pick(p, temperature)
+        return int(torch.multinomial(residual / total, 1))
+
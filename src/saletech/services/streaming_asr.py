@@ -1,13 +1,19 @@
 import numpy as np
 import asyncio
 import time
-from typing import Optional 
+from typing import Optional, TYPE_CHECKING
 from concurrent.futures import ThreadPoolExecutor
 from ..utils.errors import AudioProcessingError
-from faster_whisper import WhisperModel
 from ..utils.logger import get_logger
 from config.settings import AppSettings
 from ..models.schemas import TranscriptionResult
+from saletech.utils.tracing import current_trace
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.metrics import counter, histogram, register_collector
+
+if TYPE_CHECKING:
+    # faster_whisper (ctranslate2) loads only when the model is created
+    from faster_whisper import WhisperModel
 
 
 logger= get_logger("saletech.asr")
@@ -27,18 +33,26 @@ class StreamingASR:
     - No internal unbounded accumulation
     """
     def __init__(self):
-        self.model: Optional[WhisperModel] = None
+        self.model: Optional["WhisperModel"] = None
         self.settings=AppSettings()
         self.device = self.settings.whisper_device
         self.compute_type = self.settings.whisper_compute_type
         self.model_path = self.settings.whisper_model_path
 
         self._initialized= False #Flag indicating model is loaded and ready 1 if initialize() complete
+        self.timings: dict[str, float] = {} # load/warmup durations, read by the model registry
 
         # Thread pool for blocking operations
         self._executor = ThreadPoolExecutor(max_workers=self.settings.asr_workers)
         self._semaphore = asyncio.Semaphore(self.settings.asr_max_concurrent_jobs)
 
+        # Always-on latency histograms (exported by the metrics collector)
+        self.queue_wait_ms = LatencyHistogram()
+        self.decode_ms = LatencyHistogram()
+
+        # Set by admission control under load: greedy decoding (beam 1)
+        self.degraded = False
+
         logger.info(
             "streaming asr initialized",
             device= self.device,
@@ -64,20 +78,26 @@ class StreamingASR:
                 self._executor,
                 self._load_model_blocking
             )
+            self.timings["load_ms"] = (time.time()-start_time)*1000
 
             #warmup
+            warmup_start = time.time()
             dummy= np.zeros(self.settings.sample_rate,dtype=np.float32)
 
+            # transcribe() returns a lazy generator; consume it so the
+            # warmup actually runs the decoder
             await loop.run_in_executor(
                 self._executor,
-                lambda: self.model.transcribe(dummy)
+                lambda: list(self.model.transcribe(dummy)[0])
             )
+            self.timings["warmup_ms"] = (time.time()-warmup_start)*1000
 
             self._initialized= True
 
             logger.info(
                 "asr_model_loaded",
-                load_time_ms= (time.time()-start_time)*1000
+                load_time_ms= (time.time()-start_time)*1000,
+                **self.timings
             )     
 
         except Exception as e :
@@ -89,7 +109,9 @@ class StreamingASR:
         
 
     
-    def _load_model_blocking(self) -> WhisperModel:
+    def _load_model_blocking(self) -> "WhisperModel":
+        from faster_whisper import WhisperModel
+
         return WhisperModel(
             self.model_path,
             device=self.device,
@@ -111,8 +133,16 @@ class StreamingASR:
         if audio is None or len(audio)==0:
             return TranscriptionResult(text="",confidence=0.0,language=language)
         
+        trace = current_trace()
+        queued_at = time.perf_counter()
+
         async with self._semaphore:
             start= time.time()
+            decode_start = time.perf_counter()
+            queue_ms = (decode_start - queued_at) * 1000
+            self.queue_wait_ms.record(queue_ms)
+            if trace is not None:
+                trace.add("asr_queue", queue_ms)
 
             try:
                 #ensure float 32
@@ -132,8 +162,8 @@ class StreamingASR:
                 segments, info = self.model.transcribe(
                     audio,
                     language=language,
-                    beam_size=self.settings.asr_beam_size,
-                    best_of = self.settings.asr_best_of,
+                    beam_size=1 if self.degraded else self.settings.asr_beam_size,
+                    best_of=1 if self.degraded else self.settings.asr_best_of,
                     temperature=0.0,
                     vad_filter=False,
                     task= "transcribe",
@@ -149,6 +179,10 @@ class StreamingASR:
                 confidence = self._compute_confidence(segments)
 
                 latency_ms= (time.time()- start) * 1000
+                decode_ms = (time.perf_counter() - decode_start) * 1000
+                self.decode_ms.record(decode_ms)
+                if trace is not None:
+                    trace.add("asr_decode", decode_ms)
 
                 logger.info(
                     "asr_transcription_complete",
@@ -189,6 +223,14 @@ class StreamingASR:
         return float(max(0.0, min(1.0, confidence)))
 
 
+    def prepare_for_fork(self) -> None:
+        """Stop executor threads so no lock is held across fork()."""
+        self._executor.shutdown(wait=True)
+
+    def after_fork(self) -> None:
+        """Give a forked worker its own threads; the model stays shared."""
+        self._executor = ThreadPoolExecutor(max_workers=self.settings.asr_workers)
+
     async def cleanup(self):
 
         logger.info("asr_cleanup_started")
@@ -220,3 +262,22 @@ async def get_asr_service() -> StreamingASR:
             _asr_instance = instance
 
     return _asr_instance
+
+
+def peek_asr_service() -> Optional[StreamingASR]:
+    """The ASR singleton if this worker already loaded it; never loads it."""
+    return _asr_instance
+
+
+def _collect_asr_metrics():
+    asr = _asr_instance
+    if asr is None:
+        return []
+    return [
+        histogram("saletech_asr_queue_wait_seconds", "Time waiting for an ASR slot.", asr.queue_wait_ms),
+        histogram("saletech_asr_decode_seconds", "Whisper decode time per utterance.", asr.decode_ms),
+        counter("saletech_asr_transcriptions_total", "Utterances decoded.", asr.decode_ms.count),
+    ]
+
+
+register_collector("asr", _collect_asr_metrics)
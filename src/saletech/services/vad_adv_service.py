@@ -1,14 +1,20 @@
-from typing import Optional
+import asyncio
+from typing import Optional, TYPE_CHECKING
 import time
 import numpy as np
 from saletech.media.vad.vad_state import VADSessionState
-from saletech.media.vad.vad_model import AdvancedVadModel
-from src.saletech.utils.errors import SaleTechException, ValidationError
-from src.saletech.utils.logger import get_logger
+from saletech.utils.errors import SaleTechException, ValidationError
+from saletech.utils.logger import get_logger
 
 
+if TYPE_CHECKING:
+    # torch/webrtcvad load only when the model is created
+    from saletech.media.vad.vad_model import AdvancedVadModel
+
 logger = get_logger("saletech.vad.service")
 
+_vad_init_lock = asyncio.Lock()
+
 class VADService:
     """
     Production VAD interface.
@@ -18,20 +24,14 @@ class VADService:
     - Provides stable API to audio buffers
     """
 
-    _vad_model: Optional[AdvancedVadModel] = None
+    _vad_model: Optional["AdvancedVadModel"] = None
 
     def __init__(self):
         self.state =VADSessionState()
 
     async def initialize(self):
         try:
-            if VADService._vad_model is None:
-                logger.info("initializing_global_vad_model")
-
-                model = AdvancedVadModel()
-                await model.initialize()
-
-                VADService._vad_model= model
+            await get_vad_model()
 
         except Exception as e:
             logger.error("Vad_service_init_failed", error= str(e))
@@ -87,5 +87,19 @@ class VADService:
                 error_code="VAD_SERVICE_DETECT_FAILED",
                 original_exception=e
             )
-            
 
+
+async def get_vad_model() -> "AdvancedVadModel":
+    """Get or create the global VAD model shared by all VADService instances."""
+    async with _vad_init_lock:
+        if VADService._vad_model is None:
+            logger.info("initializing_global_vad_model")
+
+            from saletech.media.vad.vad_model import AdvancedVadModel
+
+            model = AdvancedVadModel()
+            await model.initialize()
+
+            VADService._vad_model = model
+
+    return VADService._vad_model
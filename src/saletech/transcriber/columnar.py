@@ -0,0 +1,308 @@
+import json
+import os
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+from config.settings import settings
+from saletech.utils.errors import ConfigurationError
+from saletech.utils.logger import get_logger
+
+
+logger = get_logger("saletech.transcriber.columnar")
+
+# Typed columns for the payload TranscriptionPipeline writes per utterance.
+# Epoch-second floats stay float64; `timestamp` becomes a real timestamp.
+COLUMNS = (
+    ("session_id", "string"),
+    ("utterance_id", "string"),
+    ("vad_start_ts", "float64"),
+    ("vad_end_ts", "float64"),
+    ("speech_duration_ms", "float64"),
+    ("asr_latency_ms", "float64"),
+    ("text", "string"),
+    ("confidence", "float64"),
+    ("timestamp", "timestamp"),
+)
+MANIFEST = "_exported.json"
+
+
+def _pyarrow():
+    # Optional dependency (analytics group): only export/query needs it.
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ConfigurationError(
+            "Columnar transcript export needs pyarrow (poetry install --with analytics)"
+        )
+    return pyarrow
+
+
+def schema():
+    pa = _pyarrow()
+    types = {
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+
+
+def records_to_table(records: Sequence[Dict[str, Any]]):
+    """Typed table in record order; unknown keys are dropped."""
+    pa = _pyarrow()
+    pc = pa.compute
+    fields = schema()
+    arrays = []
+    for name, kind in COLUMNS:
+        values = [record.get(name) for record in records]
+        if kind == "timestamp":
+            # Epoch seconds -> microseconds, converted in Arrow, not per row.
+            micros = pc.multiply(pa.array(values, pa.float64()), 1e6)
+            arrays.append(pc.cast(pc.cast(micros, pa.int64(), safe=False), fields.field(name).type))
+        else:
+            arrays.append(pa.array(values, fields.field(name).type))
+    return pa.Table.from_arrays(arrays, schema=fields)
+
+
+class ColumnarWriter:
+    """
+    Writes utterance records as Parquet, partitioned by UTC date.
+
+    Design:
+    - hive layout (date=YYYY-MM-DD/part-*.parquet), so date filters prune
+      whole directories
+    - rows sorted by session_id, so row-group min/max statistics let a
+      session filter skip most of each file
+    - one file per date per write; callers batch (exporter run, live sink
+      flush) to keep files large
+    """
+
+    def __init__(self, root: str, row_group_size: int = 64 * 1024, compression: str = "zstd"):
+        self.root = root
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.rows_written = 0
+        self.files_written = 0
+
+    def write(self, records: Sequence[Dict[str, Any]]) -> List[str]:
+        pa = _pyarrow()
+        pc, pq = pa.compute, pa.parquet
+
+        table = records_to_table(records)
+        days = pc.fill_null(pc.strftime(table["timestamp"], format="%Y-%m-%d"), "1970-01-01")
+
+        paths = []
+        for day in sorted(pc.unique(days).to_pylist()):
+            day_table = table.filter(pc.equal(days, day)).sort_by(
+                [("session_id", "ascending"), ("timestamp", "ascending")]
+            )
+            directory = os.path.join(self.root, f"date={day}")
+            os.makedirs(directory, exist_ok=True)
+            filename = f"part-{time.time_ns():020d}-{os.getpid()}.parquet"
+            path = os.path.join(directory, filename)
+            # Dot-prefixed while being written: dataset readers skip it.
+            tmp_path = os.path.join(directory, "." + filename)
+
+            pq.write_table(
+                day_table,
+                tmp_path,
+                row_group_size=self.row_group_size,
+                compression=self.compression,
+            )
+            os.replace(tmp_path, path)
+
+            paths.append(path)
+            self.rows_written += day_table.num_rows
+            self.files_written += 1
+        return paths
+
+
+def export_transcripts(source_dir: str, out_dir: str, batch_rows: int = 500_000) -> dict:
+    """
+    Batch-export transcript JSONL (sealed segments and per-session files)
+    from `source_dir` into partitioned Parquet under `out_dir`.
+
+    A manifest in `out_dir` records exported sources, so reruns only pick up
+    new ones. Of a compacted segment only the byte ranges whose original
+    segment was not exported yet are read (its index records the origin of
+    every range), so compaction between two runs never exports a row twice.
+    """
+    writer = ColumnarWriter(out_dir)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    exported = set()
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            exported = set(json.load(f))
+
+    # (filename, byte ranges to read or None for the whole file, what it covers)
+    sources = []
+    for filename in sorted(os.listdir(source_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext != ".jsonl" or filename in exported:
+            continue
+        if filename.startswith("seg-"):
+            index_path = os.path.join(source_dir, name + ".idx")
+            if not os.path.exists(index_path):
+                continue  # still being written
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            origins = index.get("origins")
+            if origins:
+                covered = {origin + ".jsonl" for origin, _, _ in origins} | {filename}
+                ranges = [(start, end) for origin, start, end in origins if origin + ".jsonl" not in exported]
+                if ranges:
+                    sources.append((filename, ranges, covered))
+                else:
+                    exported.update(covered)
+                continue
+            replaces = index.get("replaces", [])
+            if replaces and all(old + ".jsonl" in exported for old in replaces):
+                # Compacted before origins were recorded.
+                exported.add(filename)
+                continue
+        elif not filename.startswith("session_"):
+            continue
+        sources.append((filename, None, {filename}))
+
+    # Rows from many sources are batched, so each date gets few large files.
+    rows = 0
+    pending: List[Dict[str, Any]] = []
+    for filename, ranges, covered in sources:
+        with open(os.path.join(source_dir, filename), "rb") as f:
+            if ranges is None:
+                pending.extend(json.loads(line) for line in f if line.strip())
+            else:
+                for start, end in ranges:
+                    f.seek(start)
+                    pending.extend(json.loads(line) for line in f.read(end - start).splitlines() if line.strip())
+        if len(pending) >= batch_rows:
+            writer.write(pending)
+            rows += len(pending)
+            pending = []
+        exported.update(covered)
+    if pending:
+        writer.write(pending)
+        rows += len(pending)
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(sorted(exported), f)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    summary = {"sources": len(sources), "rows": rows, "files": writer.files_written}
+    logger.info("transcripts_exported", out_dir=out_dir, **summary)
+    return summary
+
+
+def read_utterances(
+    root: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    session_ids: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+):
+    """
+    Load utterances as a pyarrow Table; date and session filters are pushed
+    down to partition pruning and row-group statistics.
+    """
+    pa = _pyarrow()
+    ds, pc = pa.dataset, pa.compute
+
+    partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+    dataset = ds.dataset(root, format="parquet", partitioning=partitioning)
+    condition = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if start_date is not None:
+        condition = both(condition, pc.field("date") >= start_date.isoformat())
+    if end_date is not None:
+        condition = both(condition, pc.field("date") <= end_date.isoformat())
+    if session_ids:
+        condition = both(condition, pc.field("session_id").isin(list(session_ids)))
+
+    return dataset.to_table(columns=list(columns) if columns else None, filter=condition)
+
+
+def daily_percentile(root: str, column: str = "asr_latency_ms", q: float = 95, **filters) -> Dict[str, float]:
+    """e.g. p95 asr_latency_ms per day: {"2026-10-19": 231.4, ...}"""
+    pc = _pyarrow().compute
+    table = read_utterances(root, columns=["date", column], **filters)
+    result = table.group_by("date").aggregate([(column, "tdigest", pc.TDigestOptions(q=q / 100))])
+    return {
+        str(day): values[0]
+        for day, values in sorted(zip(result["date"].to_pylist(), result[f"{column}_tdigest"].to_pylist()))
+        if values
+    }
+
+
+class ColumnarSink:
+    """
+    Live sink: buffers records on the TranscriptIO thread and writes them as
+    Parquet every `flush_rows` rows or `flush_interval` seconds.
+    """
+
+    def __init__(self, root: str, flush_rows: int = 10000, flush_interval: float = 300.0):
+        _pyarrow()  # fail at start-up, not on the first flush
+        self.writer = ColumnarWriter(root)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._rows: List[Dict[str, Any]] = []
+        self._first_at: Optional[float] = None
+        self._lock = threading.Lock()
+        # Held through the write, so a flush never returns while another
+        # thread is still writing rows it took.
+        self._flush_lock = threading.Lock()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            if not self._rows:
+                self._first_at = time.monotonic()
+            self._rows.append(record)
+
+    def deadline(self) -> Optional[float]:
+        """Monotonic time of the next interval flush, if rows are buffered."""
+        return self._first_at + self.flush_interval if self._rows else None
+
+    def maybe_flush(self) -> None:
+        if len(self._rows) >= self.flush_rows or (
+            self._rows and time.monotonic() - self._first_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return
+            try:
+                self.writer.write(rows)
+            except Exception as e:
+                logger.error("columnar_sink_flush_failed", rows=len(rows), error=str(e))
+
+
+_sink: Optional[ColumnarSink] = None
+
+
+def get_columnar_sink() -> Optional[ColumnarSink]:
+    """The worker's live sink, or None unless TRANSCRIPT_COLUMNAR_SINK is on."""
+    global _sink
+    if _sink is None and settings.transcript_columnar_sink:
+        _sink = ColumnarSink(
+            settings.transcript_columnar_dir,
+            flush_rows=settings.transcript_columnar_flush_rows,
+            flush_interval=settings.transcript_columnar_flush_interval_seconds,
+        )
+    return _sink
+
+
+def close_columnar_sink() -> None:
+    if _sink is not None:
+        _sink.flush()
@@ -2,12 +2,13 @@ import time
 import numpy as np
 from typing import Optional
 
-from src.saletech.services.vad_adv_service import VADService
-from src.saletech.services.streaming_asr import get_asr_service
+from saletech.services.vad_adv_service import VADService
+from saletech.services.streaming_asr import get_asr_service
 from saletech.media.buffer.StreamingVadBuffer import StreamingBuffer
 from saletech.transcriber.writer import TranscriptWriter
 from saletech.utils.logger import get_logger
 from saletech.utils.errors import AudioProcessingError
+from saletech.utils.tracing import SessionTracer, UtteranceTrace
 
 logger=get_logger("saletech.transcriber.pipeline")
 
@@ -43,6 +44,10 @@ class TranscriptionPipeline:
         #track VAD speech window timing
         self._current_vad_start: Optional[float] = None
 
+        #per-utterance stage tracing (first speech frame -> transcript written)
+        self.tracer = SessionTracer(session_id)
+        self._trace: Optional[UtteranceTrace] = None
+
         self._initialized = False
 
         #------------------------------------------------------------------
@@ -98,13 +103,22 @@ class TranscriptionPipeline:
             now = time.time()
 
             # step 1: VAD detection
+            vad_started = time.perf_counter()
             is_speech,confidence,is_eot,meta = self.vad_service.detect_speech(pcm)
+            vad_ms = (time.perf_counter() - vad_started) * 1000
+            self.tracer.record_vad_frame(vad_ms)
 
             #track start of speech
             if is_speech and self._current_vad_start is None:
                 self._current_vad_start = now
+                self._trace = self.tracer.start_utterance()
+                self._trace.mark("speech_start", vad_started)
+
+            if self._trace is not None:
+                self._trace.add("vad", vad_ms)
 
             #step 2: push into speech window buffer
+            buffer_started = time.perf_counter()
             result = self.speech_buffer.add_frame(
                 audio=pcm,
                 is_speech=is_speech,
@@ -112,10 +126,21 @@ class TranscriptionPipeline:
                 timestamp=now
             )
 
+            #EOT on a too-short utterance: the buffer dropped it, drop its trace
+            if result is None and is_eot:
+                self._current_vad_start = None
+                self._trace = None
+
             #step 3: if utterance finalized -> run ASR
             if result is not None:
                 audio, buffer_meta = result
 
+                trace = self._trace or self.tracer.start_utterance()
+                trace.mark("eot", buffer_started)
+                trace.add("finalize", (time.perf_counter() - buffer_started) * 1000)
+                trace.between("speech", "speech_start", "eot")
+                self._trace = None
+
                 vad_start = self._current_vad_start
                 vad_end = buffer_meta["end_ts"]
                 duration_ms = buffer_meta["duration_ms"]
@@ -127,7 +152,8 @@ class TranscriptionPipeline:
                     audio=audio,
                     vad_start=vad_start,
                     vad_end=vad_end,
-                    duration_ms=duration_ms
+                    duration_ms=duration_ms,
+                    trace=trace
                 )
 
         except Exception as e:
@@ -147,16 +173,24 @@ class TranscriptionPipeline:
         Finalize any buffered speech that did not receive an EOT frame.
         """
         try:
+            flush_started = time.perf_counter()
             result = self.speech_buffer.flush(time.time())
+            trace, self._trace = self._trace, None
             if result is None:
                 return
 
             audio, buffer_meta = result
+            trace = trace or self.tracer.start_utterance()
+            trace.mark("eot", flush_started)
+            trace.add("finalize", (time.perf_counter() - flush_started) * 1000)
+            trace.between("speech", "speech_start", "eot")
+
             await self._handle_finalized_utterance(
                 audio=audio,
                 vad_start=self._current_vad_start or buffer_meta["start_ts"],
                 vad_end=buffer_meta["end_ts"],
                 duration_ms=buffer_meta["duration_ms"],
+                trace=trace,
             )
             self._current_vad_start = None
         except Exception as e:
@@ -178,41 +212,52 @@ class TranscriptionPipeline:
         audio: np.ndarray,
         vad_start:float,
         vad_end: float,
-        duration_ms: float
+        duration_ms: float,
+        trace: UtteranceTrace
     ):
         """
         called when speech buffer finalizes an utterance.
 
-        Runs ASR and writes metadata
+        Runs ASR and writes metadata. The trace is active for the whole
+        call, so the ASR service records its own queue/decode stages.
         """
         try:
-            asr_start= time.time()
+            with trace.activate():
+                asr_start= time.time()
 
-            result = await self.asr_service.transcribe(
-                audio=audio,
-                session_id = self.session_id
-            )
-
-            asr_latency_ms = (time.time()-asr_start)*1000
+                result = await self.asr_service.transcribe(
+                    audio=audio,
+                    session_id = self.session_id
+                )
 
-            payload= {
-                "session_id": self.session_id,
-                "vad_start_ts": vad_start,
-                "vad_end_ts": vad_end,
-                "speech_duration_ms": duration_ms,
-                "asr_latency_ms": asr_latency_ms,
-                "text": result.text,
-                "confidence": result.confidence,
-                "timestamp": time.time()
-            } 
-            self.writer.write(payload)
+                asr_latency_ms = (time.time()-asr_start)*1000
+
+                payload= {
+                    "session_id": self.session_id,
+                    "utterance_id": trace.utterance_id,
+                    "vad_start_ts": vad_start,
+                    "vad_end_ts": vad_end,
+                    "speech_duration_ms": duration_ms,
+                    "asr_latency_ms": asr_latency_ms,
+                    "text": result.text,
+                    "confidence": result.confidence,
+                    "timestamp": time.time()
+                }
+                with trace.span("writer_enqueue"):
+                    await self.writer.write(payload)
+
+                trace.mark("transcript")
+                trace.between("eot_to_transcript", "eot", "transcript")
+
+                logger.info(
+                    "utterance_transcribed",
+                    session_id = self.session_id,
+                    duration_ms = duration_ms,
+                    asr_latency_ms = asr_latency_ms,
+                    stages_ms = trace.stages
+                )
 
-            logger.info(
-                "utterance_transcribed",
-                session_id = self.session_id,
-                duration_ms = duration_ms,
-                asr_latency_ms = asr_latency_ms
-            )
+            self.tracer.finish(trace)
         except Exception as e:
             logger.error(
                 "utterance_processing_failed",
@@ -225,13 +270,21 @@ class TranscriptionPipeline:
             )
     #-------------------------------------------------------------------------
 
-    async def shutdown(self):
+    async def shutdown(self) -> dict:
         """
         clean shutdown of pipeline
+
+        Returns what was released: buffered audio bytes and closed writers.
         """
+        released = {"buffer_bytes": 0, "writers_closed": 0}
 
         try:
-            self.writer.close()
+            self.tracer.close()
+            released["buffer_bytes"] = self.speech_buffer.release()
+            self.vad_service = None
+            if not self.writer._closed:
+                await self.writer.close()
+                released["writers_closed"] = 1
 
             logger.info("transciption pipeline is shut down",
                         session_id=self.session_id
@@ -242,6 +295,7 @@ class TranscriptionPipeline:
                 session_id=self.session_id,
                 exc_info= True
             )
+        return released
 
 
 
@@ -0,0 +1,586 @@
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: orphan detection falls back to the pid check
+    fcntl = None
+
+from config.settings import settings
+from saletech.utils.logger import get_logger
+from saletech.utils.metrics import counter, gauge, register_collector
+
+
+logger = get_logger("saletech.transcriber.store")
+
+# seg-<created_ns>-<owner>.jsonl; owner is the writing pid, or c<pid> for
+# segments produced by compaction. Names sort chronologically. The pid only
+# names the file: whether its writer is alive is decided by the writer's
+# flock on the segment, since pids repeat across container restarts.
+_SEGMENT_RE = re.compile(r"^seg-(\d{20})-(c?\d+)\.jsonl$")
+INDEX_FORMAT = 1
+
+Span = Tuple[int, int]
+
+
+def _new_entry(ts: float) -> dict:
+    return {"first_ts": ts, "last_ts": ts, "offsets": [], "lengths": [], "ts": []}
+
+
+def _write_index(
+    path: str,
+    segment: str,
+    sessions: Dict[str, dict],
+    replaces: Iterable[str] = (),
+    origins: Iterable[list] = (),
+) -> None:
+    """Atomically write a segment's index (tmp file + rename)."""
+    tmp_path = path + ".tmp"
+    index = {"format": INDEX_FORMAT, "segment": segment, "replaces": list(replaces), "sessions": sessions}
+    if origins:
+        index["origins"] = list(origins)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _coalesce(spans: List[Span]) -> List[Span]:
+    """Merge byte-adjacent spans so a session's run is read with one seek."""
+    merged: List[Span] = []
+    for offset, length in spans:
+        if merged and merged[-1][0] + merged[-1][1] == offset:
+            merged[-1] = (merged[-1][0], merged[-1][1] + length)
+        else:
+            merged.append((offset, length))
+    return merged
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _writer_alive(path: str, owner: str) -> bool:
+    """Whether a live process still holds the writer lock of an unsealed segment."""
+    if fcntl is None:
+        return _pid_alive(int(owner))
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return True  # sealed or removed meanwhile; the next refresh sees it
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)  # also releases the lock if we took it
+    return False
+
+
+class _Summary:
+    """What the in-memory index keeps per session and sealed segment."""
+
+    __slots__ = ("first_ts", "last_ts")
+
+    def __init__(self, entry: dict):
+        self.first_ts = entry["first_ts"]
+        self.last_ts = entry["last_ts"]
+
+
+class _SessionSink:
+    """File-like view of the store for one session; what TranscriptIO writes to."""
+
+    def __init__(self, store: "SegmentStore", session_id: str):
+        self._store = store
+        self.session_id = session_id
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._store.append(self.session_id, data)
+        return len(data)
+
+    def flush(self) -> None:
+        self._store.flush()
+
+    def fileno(self) -> int:
+        return self._store.fileno()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class SegmentStore:
+    """
+    Append-only transcript store shared by every session of a worker.
+
+    Design:
+    - records from all sessions are multiplexed into rolling segment files
+      (seg-<created_ns>-<pid>.jsonl); a segment is sealed once it reaches
+      `max_bytes` or `max_age_seconds`, or when the store closes
+    - each process appends only to its own active segment, so pre-forked
+      workers never interleave bytes in one file
+    - sealing writes a sidecar index (.idx): per session, the first/last
+      append time and every record's byte offset, length and time
+    - memory holds only a summary per session and sealed segment (its time
+      range); a read loads the byte offsets from the .idx of
+      the segments that overlap, then seeks. No directory scan per read
+    - segments sealed by other workers are picked up by refresh(), run at
+      most every `refresh_interval_seconds` when a session is unknown, so
+      lookups of missing ids cannot turn into a scan each
+    - the writer holds an flock on its active segment; a segment without
+      an index whose lock can be taken lost its writer and is recovered by
+      scanning it once. Segments replaced by compaction are ignored and
+      removed
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age_seconds: float = 3600.0,
+        refresh_interval_seconds: float = 5.0,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.refresh_interval_seconds = refresh_interval_seconds
+
+        self._lock = threading.RLock()
+        # session id -> sealed segment name -> summary
+        self._index: Dict[str, Dict[str, _Summary]] = {}
+        self._sealed: set = set()
+        self._refreshed_at = 0.0
+
+        self._active = None
+        self._active_name: Optional[str] = None
+        self._active_size = 0
+        self._active_opened = 0.0
+        self._active_sessions: Dict[str, dict] = {}
+
+        self.segments_sealed = 0
+        self.records_appended = 0
+
+        os.makedirs(self.root, exist_ok=True)
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # Writing (TranscriptIO thread)
+
+    def open_session(self, session_id: str) -> _SessionSink:
+        return _SessionSink(self, session_id)
+
+    def append(self, session_id: str, data: bytes, ts: Optional[float] = None) -> None:
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            if self._active is None or self._should_roll():
+                self._roll()
+
+            offset = self._active_size
+            self._active.write(data)
+            self._active_size += len(data)
+            self.records_appended += 1
+
+            entry = self._active_sessions.get(session_id)
+            if entry is None:
+                entry = self._active_sessions[session_id] = _new_entry(ts)
+            entry["offsets"].append(offset)
+            entry["lengths"].append(len(data))
+            entry["ts"].append(ts)
+            entry["last_ts"] = ts
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                self._active.flush()
+
+    def fileno(self) -> int:
+        with self._lock:
+            if self._active is None:
+                self._roll()
+            return self._active.fileno()
+
+    def close(self) -> None:
+        """Seal the active segment."""
+        with self._lock:
+            if self._active is not None:
+                self._seal()
+
+    def _should_roll(self) -> bool:
+        return (
+            self._active_size >= self.max_bytes
+            or time.monotonic() - self._active_opened >= self.max_age_seconds
+        )
+
+    def _roll(self) -> None:
+        if self._active is not None:
+            self._seal()
+        self._active_name = f"seg-{time.time_ns():020d}-{os.getpid()}"
+        self._active = open(self._path(self._active_name, ".jsonl"), "ab", buffering=64 * 1024)
+        if fcntl is not None:
+            # Held until the segment is sealed or this process dies.
+            fcntl.flock(self._active.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._active_size = 0
+        self._active_opened = time.monotonic()
+        self._active_sessions = {}
+
+    def _seal(self) -> None:
+        self._active.flush()
+        os.fsync(self._active.fileno())
+        self._active.close()
+
+        if self._active_sessions:
+            _write_index(self._path(self._active_name, ".idx"), self._active_name, self._active_sessions)
+            self._add_summaries(self._active_name, self._active_sessions)
+            self._sealed.add(self._active_name)
+            self.segments_sealed += 1
+            logger.info(
+                "transcript_segment_sealed",
+                segment=self._active_name,
+                bytes=self._active_size,
+                sessions=len(self._active_sessions),
+            )
+        else:
+            os.remove(self._path(self._active_name, ".jsonl"))
+
+        self._active = None
+        self._active_name = None
+        self._active_sessions = {}
+
+    # ------------------------------------------------------------------
+    # Reading
+
+    def _add_summaries(self, name: str, sessions: Dict[str, dict]) -> None:
+        for session_id, entry in sessions.items():
+            self._index.setdefault(session_id, {})[name] = _Summary(entry)
+
+    def refresh(self) -> None:
+        """
+        Sync the in-memory index with the directory: load segments sealed
+        by other workers or compaction, drop removed ones, recover orphans.
+        """
+        self._refreshed_at = time.monotonic()
+        names = {}
+        for filename in os.listdir(self.root):
+            match = _SEGMENT_RE.match(filename)
+            if match:
+                names[filename[: -len(".jsonl")]] = match.group(2)
+
+        indexes = {}
+        for name, owner in names.items():
+            if name == self._active_name:
+                continue
+            index_path = self._path(name, ".idx")
+            if os.path.exists(index_path):
+                if name not in self._sealed:
+                    with open(index_path, encoding="utf-8") as f:
+                        indexes[name] = json.load(f)
+            elif owner.isdigit() and not _writer_alive(self._path(name, ".jsonl"), owner):
+                indexes[name] = self._recover(name)
+            # else: another live worker's active segment, readable once sealed
+
+        replaced = {old for index in indexes.values() for old in index.get("replaces", ())}
+        with self._lock:
+            for name, index in indexes.items():
+                if name in replaced:
+                    continue
+                self._add_summaries(name, index["sessions"])
+                self._sealed.add(name)
+
+            gone = {name for name in self._sealed if name not in names} | (replaced & self._sealed)
+            for name in gone:
+                self._sealed.discard(name)
+            if gone:
+                for session_id in list(self._index):
+                    segments = self._index[session_id]
+                    for name in gone & segments.keys():
+                        del segments[name]
+                    if not segments:
+                        del self._index[session_id]
+
+        for name in replaced & names.keys():
+            self._remove_segment(name)
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            return list(self._index.keys() | self._active_sessions.keys())
+
+    def read_session(
+        self,
+        session_id: str,
+        start_ts: Optional[float] = None,
+        end_ts: Optional[float] = None,
+    ) -> List[dict]:
+        """A session's records in append order, optionally within [start_ts, end_ts]."""
+        if (
+            session_id not in self._index
+            and time.monotonic() - self._refreshed_at >= self.refresh_interval_seconds
+        ):
+            # Possibly written by another worker: pick up newly sealed segments.
+            self.refresh()
+        try:
+            return self._read_session(session_id, start_ts, end_ts)
+        except FileNotFoundError:
+            # Compacted away since our index was loaded.
+            self.refresh()
+            return self._read_session(session_id, start_ts, end_ts)
+
+    def _read_session(self, session_id, start_ts, end_ts) -> List[dict]:
+        def overlaps(first_ts, last_ts):
+            return (start_ts is None or last_ts >= start_ts) and (end_ts is None or first_ts <= end_ts)
+
+        with self._lock:
+            if self._active is not None:
+                self._active.flush()
+            segments = [
+                name
+                for name, summary in sorted(self._index.get(session_id, {}).items())
+                if overlaps(summary.first_ts, summary.last_ts)
+            ]
+            active = self._active_sessions.get(session_id)
+            if active is not None and overlaps(active["first_ts"], active["last_ts"]):
+                # Copied under the lock: the writer thread keeps appending.
+                active = {key: list(active[key]) for key in ("offsets", "lengths", "ts")}
+                active_name = self._active_name
+            else:
+                active = None
+
+        plan = [(name, self._load_entry(name, session_id)) for name in segments]
+        if active is not None:
+            plan.append((active_name, active))
+
+        records: List[dict] = []
+        for name, entry in plan:
+            if entry is None:
+                continue
+            spans = [
+                (offset, length)
+                for offset, length, ts in zip(entry["offsets"], entry["lengths"], entry["ts"])
+                if (start_ts is None or ts >= start_ts) and (end_ts is None or ts <= end_ts)
+            ]
+            with open(self._path(name, ".jsonl"), "rb") as f:
+                for offset, length in _coalesce(spans):
+                    f.seek(offset)
+                    records.extend(json.loads(line) for line in f.read(length).splitlines())
+        return records
+
+    # ------------------------------------------------------------------
+
+    def _load_entry(self, name: str, session_id: str) -> Optional[dict]:
+        """A session's per-record offsets in one sealed segment, from its .idx."""
+        with open(self._path(name, ".idx"), encoding="utf-8") as f:
+            return json.load(f)["sessions"].get(session_id)
+
+    def _recover(self, name: str) -> dict:
+        """Rebuild the index of a segment whose writer died before sealing."""
+        sessions: Dict[str, dict] = {}
+        offset = 0
+        valid_bytes = 0
+        path = self._path(name, ".jsonl")
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn final write
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                ts = record.get("timestamp") or 0.0
+                entry = sessions.get(record.get("session_id"))
+                if entry is None:
+                    entry = sessions[record.get("session_id")] = _new_entry(ts)
+                entry["offsets"].append(offset)
+                entry["lengths"].append(len(line))
+                entry["ts"].append(ts)
+                entry["last_ts"] = ts
+                offset += len(line)
+                valid_bytes = offset
+
+        if valid_bytes != os.path.getsize(path):
+            os.truncate(path, valid_bytes)
+        _write_index(self._path(name, ".idx"), name, sessions)
+        logger.warning("transcript_segment_recovered", segment=name, sessions=len(sessions), bytes=valid_bytes)
+        return {"sessions": sessions}
+
+    def _remove_segment(self, name: str) -> None:
+        for ext in (".idx", ".jsonl"):
+            try:
+                os.remove(self._path(name, ext))
+            except FileNotFoundError:
+                pass
+
+    def _path(self, name: str, ext: str) -> str:
+        return os.path.join(self.root, name + ext)
+
+
+def compact_segments(
+    root: str,
+    min_age_seconds: float = 24 * 3600,
+    target_bytes: int = 512 * 1024 * 1024,
+) -> dict:
+    """
+    Merge sealed segments older than `min_age_seconds` into segments of up
+    to `target_bytes`, rewriting each session's records contiguously.
+
+    The merged index lists the segments it replaces, so a crash between
+    writing it and deleting the inputs never yields duplicate records, and
+    the originally sealed segment of every byte range ("origins": [name,
+    start, end]), so an exporter can skip rows it already took from there.
+    """
+    cutoff_ns = time.time_ns() - int(min_age_seconds * 1e9)
+    candidates = []
+    for filename in sorted(os.listdir(root)):
+        match = _SEGMENT_RE.match(filename)
+        name = filename[: -len(".jsonl")] if match else None
+        if match and int(match.group(1)) <= cutoff_ns and os.path.exists(os.path.join(root, name + ".idx")):
+            candidates.append((name, os.path.getsize(os.path.join(root, filename))))
+
+    groups: List[List[str]] = []
+    group_bytes = 0
+    for name, size in candidates:
+        if not groups or group_bytes + size > target_bytes:
+            groups.append([])
+            group_bytes = 0
+        groups[-1].append(name)
+        group_bytes += size
+
+    summary = {"segments_in": 0, "segments_out": 0, "bytes": 0}
+    for group in groups:
+        if len(group) < 2:
+            continue
+        summary["bytes"] += _merge_group(root, group)
+        summary["segments_in"] += len(group)
+        summary["segments_out"] += 1
+
+    logger.info("transcript_segments_compacted", root=root, **summary)
+    return summary
+
+
+def _origin_of(origins: List[list], offset: int) -> Optional[str]:
+    position = bisect.bisect_right(origins, offset, key=lambda origin: origin[1]) - 1
+    return origins[position][0] if position >= 0 and offset < origins[position][2] else None
+
+
+def _merge_group(root: str, group: List[str]) -> int:
+    indexes = {}
+    input_origins: Dict[str, List[list]] = {}
+    for name in group:
+        with open(os.path.join(root, name + ".idx"), encoding="utf-8") as f:
+            index = json.load(f)
+        indexes[name] = index["sessions"]
+        input_origins[name] = sorted(index.get("origins", ()), key=lambda origin: origin[1])
+
+    # Sessions ordered by first appearance; each becomes one contiguous run.
+    order: Dict[str, float] = {}
+    for sessions in indexes.values():
+        for session_id, entry in sessions.items():
+            order[session_id] = min(order.get(session_id, entry["first_ts"]), entry["first_ts"])
+
+    # Named after its oldest input so names keep sorting chronologically; the
+    # oldest input may itself be one this process compacted, and that name
+    # must not be reused or deleting the inputs would delete the output.
+    created_ns = int(_SEGMENT_RE.match(group[0] + ".jsonl").group(1))
+    name = f"seg-{created_ns:020d}-c{os.getpid()}"
+    while name in group or os.path.exists(os.path.join(root, name + ".jsonl")):
+        created_ns += 1
+        name = f"seg-{created_ns:020d}-c{os.getpid()}"
+    path = os.path.join(root, name + ".jsonl")
+
+    merged: Dict[str, dict] = {}
+    origins: List[list] = []
+    inputs = {segment: open(os.path.join(root, segment + ".jsonl"), "rb") for segment in group}
+    offset = 0
+    try:
+        with open(path + ".tmp", "wb") as out:
+            for session_id in sorted(order, key=order.get):
+                for segment in group:
+                    entry = indexes[segment].get(session_id)
+                    if entry is None:
+                        continue
+                    target = merged.get(session_id)
+                    if target is None:
+                        target = merged[session_id] = _new_entry(entry["first_ts"])
+                    source = inputs[segment]
+                    for old_offset, length, ts in zip(entry["offsets"], entry["lengths"], entry["ts"]):
+                        source.seek(old_offset)
+                        out.write(source.read(length))
+                        # A compacted input passes on where its bytes came from.
+                        origin = _origin_of(input_origins[segment], old_offset) or segment
+                        if origins and origins[-1][0] == origin and origins[-1][2] == offset:
+                            origins[-1][2] = offset + length
+                        else:
+                            origins.append([origin, offset, offset + length])
+                        target["offsets"].append(offset)
+                        target["lengths"].append(length)
+                        target["ts"].append(ts)
+                        offset += length
+                    target["last_ts"] = max(target["last_ts"], entry["last_ts"])
+            out.flush()
+            os.fsync(out.fileno())
+    finally:
+        for source in inputs.values():
+            source.close()
+
+    os.replace(path + ".tmp", path)
+    _write_index(os.path.join(root, name + ".idx"), name, merged, replaces=group, origins=origins)
+    for segment in group:
+        for ext in (".idx", ".jsonl"):
+            os.remove(os.path.join(root, segment + ext))
+    return offset
+
+
+_stores: Dict[str, SegmentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_segment_store(root: str = "transcripts") -> SegmentStore:
+    """The worker's store for `root` (one active segment per directory)."""
+    key = os.path.abspath(root)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SegmentStore(
+                root,
+                max_bytes=settings.transcript_segment_max_bytes,
+                max_age_seconds=settings.transcript_segment_max_age_seconds,
+                refresh_interval_seconds=settings.transcript_index_refresh_seconds,
+            )
+        return store
+
+
+def close_segment_stores() -> None:
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+
+
+def _collect_store_metrics():
+    if not _stores:
+        return []
+    stores = list(_stores.values())
+    return [
+        counter(
+            "saletech_transcript_segments_sealed_total",
+            "Transcript segments sealed by this worker.",
+            sum(s.segments_sealed for s in stores),
+        ),
+        gauge(
+            "saletech_transcript_active_segment_bytes",
+            "Bytes in the worker's active transcript segments.",
+            sum(s._active_size for s in stores),
+        ),
+    ]
+
+
+register_collector("transcript_store", _collect_store_metrics)
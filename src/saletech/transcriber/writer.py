@@ -1,58 +1,315 @@
+import asyncio
 import json
 import os
+import queue
 import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 
+from config.settings import settings
+from saletech.utils.histogram import LatencyHistogram
 from saletech.utils.logger import get_logger
 from saletech.utils.errors import AudioProcessingError
+from saletech.utils.metrics import counter, histogram, register_collector
+from saletech.transcriber.store import SegmentStore, get_segment_store
+from saletech.transcriber.columnar import ColumnarSink, get_columnar_sink
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is the fallback encoder
+    orjson = None
 
 
 logger = get_logger("saletech.transcriber.writer")
 
+FSYNC_POLICIES = ("none", "commit", "close")
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """One JSONL line; orjson when installed (several times faster)."""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY)
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class TranscriptIO:
+    """
+    Background I/O thread shared by every TranscriptWriter in a worker.
+
+    Design:
+    - writers enqueue records; encoding, writes, flushes and fsyncs all
+      happen here, never on the event loop
+    - group commit: a writer's file is flushed once `flush_records`
+      records are buffered or the oldest unflushed record is
+      `flush_interval` seconds old, whichever comes first
+    - fsync policy: "none" leaves durability to the OS page cache,
+      "commit" fsyncs every group commit, "close" fsyncs once on close
+    - flush/close requests are queued behind the writer's records, so
+      they complete only after everything written before them
+    - an optional ColumnarSink receives every written record, so Parquet
+      is produced here too, off the event loop
+    """
+
+    def __init__(
+        self,
+        flush_records: int = 32,
+        flush_interval: float = 0.2,
+        fsync: str = "none",
+        sink: Optional[ColumnarSink] = None,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.sink = sink
+
+        self.records_written = 0
+        self.commits = 0
+        self.fsyncs = 0
+        self.write_errors = 0
+        self.commit_ms = LatencyHistogram()
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+
+    def submit(self, writer: "TranscriptWriter", record: Dict[str, Any]) -> None:
+        self._ensure_started()
+        self._queue.put(("write", writer, record))
+
+    def barrier(self, writer: "TranscriptWriter", close: bool = False) -> Future:
+        """Future resolved once the writer's earlier records are committed."""
+        self._ensure_started()
+        done: Future = Future()
+        self._queue.put(("close" if close else "flush", writer, done))
+        return done
+
+    def _ensure_started(self) -> None:
+        # Lazy, and re-checked so a pre-forked worker starts its own thread.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="saletech-transcript-io", daemon=True
+                )
+                self._thread.start()
+
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        dirty: Dict["TranscriptWriter", float] = {}  # writer -> first unflushed record time
+
+        while True:
+            deadlines = [since + self.flush_interval for since in dirty.values()]
+            if self.sink is not None and self.sink.deadline() is not None:
+                deadlines.append(self.sink.deadline())
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            try:
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < 1024:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # One thread serves every session: nothing that goes wrong with
+            # one item may stop it, and queued records are always released
+            # so no writer waits on backpressure forever.
+            written: Dict["TranscriptWriter", int] = {}
+            try:
+                for kind, writer, item in batch:
+                    try:
+                        if kind == "write":
+                            written[writer] = written.get(writer, 0) + 1
+                            self._write(writer, item)
+                            dirty.setdefault(writer, time.monotonic())
+                        else:
+                            dirty.pop(writer, None)
+                            self._finish(writer, item, close=(kind == "close"))
+                    except Exception as e:
+                        logger.error("transcript_io_item_failed", session_id=writer.session_id, kind=kind, exc_info=True)
+                        if kind != "write":
+                            self._resolve(item, e)
+
+                now = time.monotonic()
+                for writer, since in list(dirty.items()):
+                    if writer._unflushed >= self.flush_records or now - since >= self.flush_interval:
+                        del dirty[writer]
+                        self._commit(writer)
+
+                if self.sink is not None:
+                    self.sink.maybe_flush()
+            except Exception:
+                logger.error("transcript_io_batch_failed", exc_info=True)
+            finally:
+                for writer, count in written.items():
+                    writer._release(count)
+
+    def _write(self, writer: "TranscriptWriter", record: Dict[str, Any]) -> None:
+        if writer._error is not None:
+            return
+        try:
+            writer._file.write(encode_record(record))
+            writer._unflushed += 1
+            self.records_written += 1
+            if self.sink is not None:
+                self.sink.add(record)
+        except Exception as e:
+            self._fail(writer, e)
+
+    def _commit(self, writer: "TranscriptWriter", fsync: Optional[bool] = None) -> None:
+        if writer._error is not None or writer._file.closed:
+            return
+        if fsync is None:
+            fsync = self.fsync == "commit"
+        start = time.perf_counter()
+        try:
+            writer._file.flush()
+            if fsync:
+                os.fsync(writer._file.fileno())
+                self.fsyncs += 1
+        except Exception as e:
+            self._fail(writer, e)
+            return
+        writer._unflushed = 0
+        self.commits += 1
+        self.commit_ms.record((time.perf_counter() - start) * 1000)
+
+    def _finish(self, writer: "TranscriptWriter", done: Future, close: bool) -> None:
+        self._commit(writer, fsync=(self.fsync != "none") if close else None)
+        if close:
+            try:
+                writer._file.close()
+            except Exception as e:
+                self._fail(writer, e)
+        self._resolve(done, writer._error)
+
+    @staticmethod
+    def _resolve(done: Future, error: Optional[Exception]) -> None:
+        # A waiter cancelled (client gone, shutdown, timeout) cancels the
+        # future through asyncio.wrap_future; the work is done regardless.
+        if done.done() or not done.set_running_or_notify_cancel():
+            return
+        if error is not None:
+            done.set_exception(error)
+        else:
+            done.set_result(None)
+
+    def _fail(self, writer: "TranscriptWriter", error: Exception) -> None:
+        self.write_errors += 1
+        if writer._error is None:
+            writer._error = error
+            logger.error(
+                "transcript_write_failed",
+                session_id=writer.session_id,
+                file_path=writer.file_path,
+                error=str(error),
+            )
+
+
+_transcript_io: Optional[TranscriptIO] = None
+
+
+def get_transcript_io() -> TranscriptIO:
+    global _transcript_io
+    if _transcript_io is None:
+        _transcript_io = TranscriptIO(
+            flush_records=settings.transcript_flush_records,
+            flush_interval=settings.transcript_flush_interval_ms / 1000,
+            fsync=settings.transcript_fsync,
+            sink=get_columnar_sink(),
+        )
+    return _transcript_io
+
 
 class TranscriptWriter:
     """
-    Writes transcription results to a per-session JSONL file.
+    Writes transcription results for one session as JSONL records.
 
     Design goals:
-    - One file per WebSocket session
-    - Thread-safe append operations
+    - Layout "segments" (default): records go to the worker's SegmentStore,
+      multiplexed with every other session; layout "files": one file per
+      WebSocket session
+    - write() only enqueues; the shared TranscriptIO thread encodes,
+      writes and group-commits (see TranscriptIO for flush/fsync policy)
+    - Backpressure: once `max_pending` records are queued for this
+      session, write() waits for the disk to catch up
     - One JSON object per line (JSONL format)
-    - Graceful shutdown
+    - Graceful shutdown: close() drains every queued record
     """
 
-    def __init__(self, session_id: str, output_dir: str = "transcripts"):
+    def __init__(
+        self,
+        session_id: str,
+        output_dir: str = "transcripts",
+        io: Optional[TranscriptIO] = None,
+        max_pending: Optional[int] = None,
+        layout: Optional[str] = None,
+        store: Optional[SegmentStore] = None,
+    ):
         """
         Initialize a writer for one transcription session.
 
         Args:
             session_id: Unique session identifier
             output_dir: Directory where transcript files will be stored
+            io: I/O thread to use (default: the worker-wide one)
+            max_pending: Queued records before write() applies backpressure
+            layout: "segments" or "files" (default: settings.transcript_layout)
+            store: Segment store to use (default: the worker's store for output_dir)
         """
 
         self.session_id = session_id
         self.output_dir = output_dir
+        self.max_pending = max_pending or settings.transcript_max_pending
+        self._io = io or get_transcript_io()
+
+        self.layout = "segments" if store is not None else (layout or settings.transcript_layout)
 
         # Ensure transcript directory exists
         os.makedirs(self.output_dir, exist_ok=True)
 
-        # Construct output filename (changed to .jsonl extension)
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        self.file_path = os.path.join(
-            self.output_dir,
-            f"session_{session_id}_{timestamp}.jsonl"
-        )
+        self.store: Optional[SegmentStore] = None
+        if self.layout == "segments":
+            self.store = store or get_segment_store(self.output_dir)
+            self.file_path = self.store.root
+        else:
+            # Construct output filename (changed to .jsonl extension)
+            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            self.file_path = os.path.join(
+                self.output_dir,
+                f"session_{session_id}_{timestamp}.jsonl"
+            )
 
         # Internal state
         self._file = None
-        self._lock = threading.Lock()
         self._closed = False
+        self._error: Optional[Exception] = None
+
+        # Backpressure: _pending is raised here and lowered by the I/O thread
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._unflushed = 0
+        self._blocked = False
+        self._space: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
         try:
-            # Open file in append mode for JSONL
-            self._file = open(self.file_path, "a", encoding="utf-8")
-            
+            if self.layout == "segments":
+                self._file = self.store.open_session(session_id)
+            else:
+                # Binary append; group commit decides when the buffer is flushed
+                self._file = open(self.file_path, "ab", buffering=64 * 1024)
+
             logger.info(
                 "transcript_writer_initialized",
                 session_id=session_id,
@@ -72,9 +329,12 @@ class TranscriptWriter:
 
     # -------------------------------------------------------------
 
-    def write(self, record: Dict[str, Any]) -> None:
+    async def write(self, record: Dict[str, Any]) -> None:
         """
-        Append a transcription record as a JSON line to the file.
+        Queue a transcription record to be appended as a JSON line.
+
+        Returns as soon as the record is queued, unless this session
+        already has `max_pending` records waiting for the disk.
 
         Args:
             record: Dictionary containing utterance metadata
@@ -84,43 +344,63 @@ class TranscriptWriter:
             raise AudioProcessingError(
                 message="Attempted to write after writer closed"
             )
-
-        try:
-            with self._lock:
-                # Write JSON object followed by newline (JSONL format)
-                json.dump(record, self._file, ensure_ascii=False)
-                self._file.write("\n")
-                
-                # Ensure disk write
-                self._file.flush()
-
-        except Exception as e:
-            logger.error(
-                "transcript_write_failed",
-                session_id=self.session_id,
-                exc_info=True
-            )
+        if self._error is not None:
             raise AudioProcessingError(
                 message="Failed to write transcript record",
-                original_exception=e
+                context={"session_id": self.session_id},
+                original_exception=self._error,
             )
 
+        if self._pending >= self.max_pending:
+            await self._wait_for_space()
+
+        with self._lock:
+            self._pending += 1
+        self._io.submit(self, record)
+
+    async def flush(self) -> None:
+        """Wait until every record written so far is committed."""
+        if not self._closed:
+            await asyncio.wrap_future(self._io.barrier(self))
+
+    async def _wait_for_space(self) -> None:
+        if self._space is None:
+            self._loop = asyncio.get_running_loop()
+            self._space = asyncio.Event()
+
+        _WriterTotals.backpressure_waits += 1
+        start = time.perf_counter()
+        while self._pending >= self.max_pending:
+            # Publish _blocked before re-checking so a release on the I/O
+            # thread in between is never missed.
+            self._space.clear()
+            self._blocked = True
+            if self._pending < self.max_pending:
+                break
+            await self._space.wait()
+        self._blocked = False
+        _WriterTotals.backpressure_ms.record((time.perf_counter() - start) * 1000)
+
+    def _release(self, count: int) -> None:
+        # Called on the I/O thread once `count` records reached the file buffer.
+        with self._lock:
+            self._pending -= count
+        if self._blocked and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._space.set)
+
     # -------------------------------------------------------------
 
-    def close(self) -> None:
+    async def close(self) -> None:
         """
-        Close the file handle.
+        Drain queued records, commit them and close the file handle.
         """
 
         if self._closed:
             return
+        self._closed = True
 
         try:
-            with self._lock:
-                if self._file:
-                    self._file.close()
-
-            self._closed = True
+            await asyncio.wrap_future(self._io.barrier(self, close=True))
 
             logger.info(
                 "transcript_writer_closed",
@@ -138,3 +418,34 @@ class TranscriptWriter:
                 message="Failed to close transcript writer",
                 original_exception=e
             )
+
+
+class _WriterTotals:
+    backpressure_waits = 0
+    backpressure_ms = LatencyHistogram()
+
+
+def _collect_writer_metrics():
+    if _transcript_io is None:
+        return []
+    io = _transcript_io
+    return [
+        counter("saletech_transcript_records_total", "Transcript records written.", io.records_written),
+        counter("saletech_transcript_commits_total", "Transcript group commits (flushes).", io.commits),
+        counter("saletech_transcript_fsyncs_total", "Transcript fsync calls.", io.fsyncs),
+        counter("saletech_transcript_write_errors_total", "Failed transcript writes.", io.write_errors),
+        histogram("saletech_transcript_commit_seconds", "Group commit duration.", io.commit_ms),
+        counter(
+            "saletech_transcript_backpressure_waits_total",
+            "Writes that waited for the disk to catch up.",
+            _WriterTotals.backpressure_waits,
+        ),
+        histogram(
+            "saletech_transcript_backpressure_seconds",
+            "Time writes waited on backpressure.",
+            _WriterTotals.backpressure_ms,
+        ),
+    ]
+
+
+register_collector("transcripts", _collect_writer_metrics)
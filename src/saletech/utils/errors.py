@@ -1,4 +1,4 @@
-from src.saletech.utils.logger import get_logger
+from saletech.utils.logger import get_logger
 from typing import Optional, Any
 
 class SaleTechException(Exception):
@@ -83,6 +83,15 @@ class AuthorizationError(SaleTechException):
             context=context
         )
 
+class ConfigurationError(SaleTechException):
+    def __init__(self, message: str, context: Optional[dict] = None):
+        super().__init__(
+            message=message,
+            error_code="CONFIGURATION_ERROR",
+            status_code=500,
+            context=context
+        )
+
 class AudioProcessingError(SaleTechException):
     def __init__(
         self,
@@ -97,3 +106,51 @@ class AudioProcessingError(SaleTechException):
             context=context,
             original_exception=original_exception,
         )
+
+
+class SessionStoreError(SaleTechException):
+    def __init__(
+        self,
+        message: str,
+        context: dict | None = None,
+        original_exception: Exception | None = None,
+    ):
+        super().__init__(
+            message=message,
+            error_code="SESSION_STORE_ERROR",
+            status_code=503,
+            context=context,
+            original_exception=original_exception,
+        )
+
+
+class SessionRejectedError(SaleTechException):
+    """New session refused by admission control; context carries the retry hints."""
+
+    def __init__(self, message: str, context: Optional[dict] = None):
+        super().__init__(
+            message=message,
+            error_code="SESSION_REJECTED",
+            status_code=503,
+            context=context,
+        )
+
+    @property
+    def retry_after(self) -> Optional[int]:
+        return self.context.get("retry_after")
+
+    @property
+    def preferred_worker(self) -> Optional[str]:
+        return self.context.get("preferred_worker")
+
+
+class FramingError(SaleTechException):
+    """Malformed or unsupported audio frame message / handshake on a websocket."""
+
+    def __init__(self, message: str, context: Optional[dict] = None):
+        super().__init__(
+            message=message,
+            error_code="FRAMING_ERROR",
+            status_code=400,
+            context=context,
+        )
@@ -0,0 +1,212 @@
+import math
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory log-linear latency histogram (HDR-style), in milliseconds.
+
+    Design:
+    - every power of two between 62.5us and 65.5s is split into 32 linear
+      sub-buckets, so a reported percentile is within ~1.6% of the true
+      value; out-of-range values clamp to the first/last bucket
+    - record() is one frexp plus an array increment: no allocation, safe to
+      call on every VAD frame
+    - count / sum / min / max are exact; percentiles come from cumulative
+      bucket counts
+    - memory is fixed (640 counters, allocated on first record) no matter
+      how long the session runs
+    - histograms share one layout, so they merge by adding counts: session
+      histograms roll up into worker ones, and to_dict()/from_dict() carry
+      snapshots between processes
+    """
+
+    SUB_BUCKETS = 32
+    MIN_EXPONENT = -3   # [2^-4, 2^-3) ms is the first octave
+    MAX_EXPONENT = 16   # [2^15, 2^16) ms is the last octave
+    NUM_BUCKETS = (MAX_EXPONENT - MIN_EXPONENT + 1) * SUB_BUCKETS
+
+    __slots__ = ("_counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self._counts: Optional[array] = None
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    # ------------------------------------------------------------------
+
+    def record(self, value_ms: float) -> None:
+        counts = self._counts
+        if counts is None:
+            counts = self._counts = array("Q", bytes(8 * self.NUM_BUCKETS))
+
+        counts[self._index(value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms < self.min:
+            self.min = value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other._counts is None:
+            return self
+        if self._counts is None:
+            self._counts = array("Q", other._counts)
+        else:
+            counts = self._counts
+            for index, value in enumerate(other._counts):
+                if value:
+                    counts[index] += value
+
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def snapshot(self) -> "LatencyHistogram":
+        return LatencyHistogram().merge(self)
+
+    def since(self, earlier: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        Values recorded after `earlier` (a snapshot of this histogram), for
+        windowed percentiles; min/max are bucket-accurate, not exact.
+        """
+        window = LatencyHistogram()
+        if self._counts is None:
+            return window
+        counts = array("Q", self._counts)
+        if earlier._counts is not None:
+            for index, value in enumerate(earlier._counts):
+                if value:
+                    counts[index] -= value
+
+        window._counts = counts
+        window.count = self.count - earlier.count
+        window.total = self.total - earlier.total
+        used = [index for index, value in enumerate(counts) if value]
+        if used:
+            window.min = self._bucket_value(used[0])
+            window.max = self._bucket_value(used[-1])
+        return window
+
+    def reset(self) -> None:
+        self.__init__()
+
+    # ------------------------------------------------------------------
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, q: float) -> Optional[float]:
+        return self.percentiles((q,))[0]
+
+    def percentiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """Values at the given percentiles (0-100), in one pass over the buckets."""
+        qs = list(qs)
+        if not self.count:
+            return [None] * len(qs)
+
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        results: List[Optional[float]] = [None] * len(qs)
+
+        seen = 0
+        position = 0
+        for index, value in enumerate(self._counts):
+            if not value:
+                continue
+            seen += value
+            while position < len(order) and seen >= math.ceil(qs[order[position]] / 100 * self.count):
+                results[order[position]] = self._bucket_value(index)
+                position += 1
+            if position == len(order):
+                break
+
+        for i in order[position:]:
+            results[i] = self.max
+
+        return results
+
+    def cumulative_counts(self, bounds_ms: Iterable[float]) -> List[int]:
+        """
+        Values recorded below each bound, for Prometheus-style buckets.
+
+        Exact when a bound falls on a bucket edge (1, 2.5, 5, 10, 20, 50 ms
+        do); otherwise the bucket containing the bound is counted above it.
+        """
+        if self._counts is None:
+            return [0 for _ in bounds_ms]
+        prefix = [0, *accumulate(self._counts)]
+        return [prefix[self._index(bound)] for bound in bounds_ms]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        p50, p95, p99 = self.percentiles((50, 95, 99))
+        return {
+            "count": self.count,
+            "mean_ms": self.mean,
+            "min_ms": self.min if self.count else None,
+            "max_ms": self.max if self.count else None,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        }
+
+    def to_dict(self) -> dict:
+        """Sparse, JSON-safe snapshot; from_dict() restores a mergeable histogram."""
+        buckets = {}
+        if self._counts is not None:
+            buckets = {str(i): c for i, c in enumerate(self._counts) if c}
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "buckets": buckets,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls()
+        if not data.get("count"):
+            return histogram
+
+        histogram._counts = array("Q", bytes(8 * cls.NUM_BUCKETS))
+        for index, value in data["buckets"].items():
+            histogram._counts[int(index)] = value
+        histogram.count = data["count"]
+        histogram.total = data["sum"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _index(cls, value: float) -> int:
+        if value <= 0.0:
+            return 0
+        mantissa, exponent = math.frexp(value)  # value = mantissa * 2**exponent, mantissa in [0.5, 1)
+        if exponent < cls.MIN_EXPONENT:
+            return 0
+        if exponent > cls.MAX_EXPONENT:
+            return cls.NUM_BUCKETS - 1
+        return (exponent - cls.MIN_EXPONENT) * cls.SUB_BUCKETS + int((mantissa - 0.5) * 2 * cls.SUB_BUCKETS)
+
+    def _bucket_value(self, index: int) -> float:
+        """Midpoint of a bucket, clamped to the exact observed range."""
+        # Under/overflow buckets also hold out-of-range values: use the exact extremes.
+        if index == 0:
+            return self.min
+        if index == self.NUM_BUCKETS - 1:
+            return self.max
+        exponent, sub = divmod(index, self.SUB_BUCKETS)
+        exponent += self.MIN_EXPONENT
+        width = math.ldexp(1.0, exponent) / (2 * self.SUB_BUCKETS)
+        lower = math.ldexp(0.5, exponent) + sub * width
+        return min(max(lower + width / 2, self.min), self.max)
@@ -1,26 +1,85 @@
+import asyncio
 from contextlib import asynccontextmanager
-from saletech.utils.logger import setup_logging
+from saletech.utils.logger import get_logger
 from saletech.core.session_manager import SessionManager
+from saletech.core.session_reaper import get_session_reaper
+from saletech.core.session_store import get_session_store
+from saletech.core.admission import get_admission_controller
+from saletech.services.model_registry import ModelRegistry
+from saletech.utils.loop_monitor import get_loop_monitor
+from saletech.transcriber.store import close_segment_stores
+from saletech.transcriber.columnar import close_columnar_sink
+from config.settings import settings
 
 
-logger = setup_logging()
+logger = get_logger("saletech.lifespan")
+
+
+def build_model_registry() -> ModelRegistry:
+    """
+    Register the models this worker serves.
+
+    Imports stay inside the loaders so a worker only pays for the
+    services it actually preloads.
+    """
+    registry = ModelRegistry()
+
+    if settings.preload_vad_model:
+        async def load_vad():
+            from saletech.services.vad_adv_service import get_vad_model
+            return await get_vad_model()
+        registry.register("vad", load_vad)
+
+    if settings.preload_asr_model:
+        async def load_asr():
+            from saletech.services.streaming_asr import get_asr_service
+            return await get_asr_service()
+        registry.register("asr", load_asr)
+
+    if settings.preload_llm_model:
+        async def load_llm():
+            from saletech.services.llm import get_llm_kvcache_service
+            return await get_llm_kvcache_service()
+        registry.register("llm", load_llm)
+
+    return registry
 
 
 @asynccontextmanager
 async def lifespan(app):
-    app.state.session_manager = SessionManager()
-    # logger.info("SaleTech started:")
-    
-    # TO D0 later:
-    # - connect Redis
-    # - load ASR
-    # - load LLM
-    # - warm GPU
+    store = get_session_store()
+    store.start()
+    admission = get_admission_controller(store)
+    if admission is not None:
+        admission.start()
+    app.state.session_manager = SessionManager(store=store, admission=admission)
+    reaper = get_session_reaper(app.state.session_manager)
+    reaper.start()
 
-    yield
+    # Models load in the background: /health answers immediately,
+    # /ready flips once every required model is loaded and warm.
+    registry = build_model_registry()
+    app.state.model_registry = registry
+    load_task = asyncio.create_task(registry.load_all())
 
-    # logger.info(" SaleTech shutting down")
+    loop_monitor = get_loop_monitor()
+    loop_monitor.start()
+
+    yield
 
-    # TODO:
-    # - close Redis
-    # - release GPU
\ No newline at end of file
+    if not load_task.done():
+        load_task.cancel()
+    try:
+        # Let the loaders unwind before cleanup() looks at what they loaded.
+        await load_task
+    except asyncio.CancelledError:
+        pass
+    await reaper.stop()
+    if admission is not None:
+        await admission.stop()
+    await app.state.session_manager.close_all_sessions()
+    await store.close()
+    await registry.cleanup()
+    close_segment_stores()
+    close_columnar_sink()
+    await loop_monitor.stop()
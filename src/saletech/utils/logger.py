@@ -1,16 +1,249 @@
+import atexit
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
 import structlog
 import logging
 import sys
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import settings
+
+
+class EventSampler:
+    """
+    Keep one in `rate` of the configured high-rate events.
+
+    Runs first in the processor chain, so a dropped event costs a dict
+    lookup; kept events carry sample_rate so readers can scale counts.
+    """
+
+    def __init__(self, rates: Dict[str, int]):
+        self.rates = {event: int(rate) for event, rate in rates.items() if int(rate) > 1}
+        self._seen = dict.fromkeys(self.rates, 0)
+
+    def __call__(self, logger, method_name, event_dict):
+        event = event_dict.get("event")
+        rate = self.rates.get(event)
+        if rate is None:
+            return event_dict
+
+        seen = self._seen[event]
+        self._seen[event] = seen + 1
+        if seen % rate:
+            raise structlog.DropEvent
+        event_dict["sample_rate"] = rate
+        return event_dict
+
+
+class ColdLoggerCallsite:
+    """
+    CallsiteParameterAdder for every logger except the hot ones.
+
+    Callsite lookup walks the stack on every call; the per-frame and
+    per-utterance loggers skip it and keep the logger name for context.
+    """
+
+    def __init__(self, hot_loggers: Iterable[str]):
+        self._hot = tuple(name.lower() for name in hot_loggers)
+        self._is_hot: Dict[str, bool] = {}
+        self._adder = structlog.processors.CallsiteParameterAdder(additional_ignores=[__name__])
+
+    def __call__(self, logger, method_name, event_dict):
+        name = getattr(logger, "name", "")
+        hot = self._is_hot.get(name)
+        if hot is None:
+            lowered = name.lower()
+            hot = self._is_hot[name] = any(
+                lowered == prefix or lowered.startswith(prefix + ".") for prefix in self._hot
+            )
+        return event_dict if hot else self._adder(logger, method_name, event_dict)
+
+
+def _resolve_exc_info(logger, method_name, event_dict):
+    # Rendering happens on the listener thread, where sys.exc_info() is
+    # empty: capture the exception while still on the caller's thread.
+    exc_info = event_dict.get("exc_info")
+    if exc_info and not isinstance(exc_info, (tuple, BaseException)):
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+class _EnqueueHandler(QueueHandler):
+    """QueueHandler that hands records over as-is and never blocks."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # structlog records carry the event dict and are rendered by the
+        # listener; stdlib records only get their %-args merged here.
+        if not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_STOP = object()
+
+
+class BatchingQueueListener:
+    """
+    Background writer for queued log records.
+
+    Design:
+    - drains up to `batch_size` records per wake-up, renders them and
+      writes each handler's batch with a single write() and flush()
+    - after a partial batch it waits `flush_interval` seconds before the
+      next one, so bursts are grouped instead of waking (and taking the
+      GIL from the event loop) once per record
+    - rotation is checked once per batch, so a file may overrun maxBytes
+      by at most one batch
+    - records dropped on a full queue are reported as log_records_dropped
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        handlers: List[logging.Handler],
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+    ):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_handler: Optional[_EnqueueHandler] = None
+        self._reported_drops = 0
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="saletech-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write everything queued so far, then stop."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = any(record is _STOP for record in batch)
+            records = [record for record in batch if record is not _STOP]
+            if records:
+                for handler in self.handlers:
+                    _write_batch(handler, records)
+            if stopping:
+                return
+            self._report_drops()
+
+            if len(batch) < self.batch_size:
+                self._stopping.wait(self.flush_interval)
+
+    def _report_drops(self) -> None:
+        handler = self.enqueue_handler
+        if handler is None or handler.dropped == self._reported_drops:
+            return
+        dropped = handler.dropped - self._reported_drops
+        self._reported_drops = handler.dropped
+        structlog.get_logger("saletech.logging").warning("log_records_dropped", dropped=dropped)
+
+
+def _write_batch(handler: logging.Handler, records: List[logging.LogRecord]) -> None:
+    handler.acquire()
+    try:
+        lines = [handler.format(record) for record in records if record.levelno >= handler.level]
+        if not lines:
+            return
+        text = handler.terminator.join(lines) + handler.terminator
+
+        if isinstance(handler, RotatingFileHandler):
+            if handler.stream is None:
+                handler.stream = handler._open()
+            if handler.maxBytes and 0 < handler.stream.tell() and handler.stream.tell() + len(text) >= handler.maxBytes:
+                handler.doRollover()
+
+        handler.stream.write(text)
+        handler.flush()
+    except Exception:
+        handler.handleError(records[-1])
+    finally:
+        handler.release()
+
+
+_listener: Optional[BatchingQueueListener] = None
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the background log writer (queue mode)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    # Threads do not survive fork(): give a pre-forked worker its own queue
+    # and writer thread. Handler locks are reinitialised by logging itself.
+    global _listener
+    if _listener is None:
+        return
+    old = _listener
+    log_queue = queue.Queue(maxsize=old.queue.maxsize)
+    old.enqueue_handler.queue = log_queue
+    old.enqueue_handler.dropped = 0
+    _listener = BatchingQueueListener(log_queue, old.handlers, old.batch_size, old.flush_interval)
+    _listener.enqueue_handler = old.enqueue_handler
+    _listener.start()
+
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
 
 
 #setup logging 
 
-def setup_logging(log_level: str = "INFO", log_dir: Optional[str]= None):
-    """Configure structured logging for entire application"""
+def setup_logging(
+    log_level: str = "INFO",
+    log_dir: Optional[str] = None,
+    mode: Optional[str] = None,
+    hot_loggers: Optional[Iterable[str]] = None,
+    sample_rates: Optional[Dict[str, int]] = None,
+):
+    """
+    Configure structured logging for entire application
+
+    mode="queue" (default, settings.log_mode) keeps only event-dict building
+    on the caller: JSON rendering and file/stdout writes happen in batches
+    on a background thread. mode="sync" renders and writes inline.
+    """
+    global _listener
+
+    mode = mode or settings.log_mode
+    hot_loggers = settings.log_hot_loggers if hot_loggers is None else hot_loggers
+    sample_rates = settings.log_sample_rates if sample_rates is None else sample_rates
+    shutdown_logging()
     
     # Step 1: Determine log directory (robust, cross-platform)
     if log_dir is None:
@@ -43,6 +276,38 @@ def setup_logging(log_level: str = "INFO", log_dir: Optional[str]= None):
     # - Keeps console clean (no duplicate timestamps)
     stream_handler.setFormatter(logging.Formatter('%(message)s'))
 
+    if mode == "queue":
+        # Rendering moves to the listener thread: handlers format the event
+        # dict that structlog hands over (wrap_for_formatter below).
+        formatter = structlog.stdlib.ProcessorFormatter(
+            processors=[
+                structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                structlog.processors.format_exc_info,
+                structlog.processors.JSONRenderer(),
+            ],
+            foreign_pre_chain=[
+                structlog.processors.add_log_level,
+                structlog.processors.TimeStamper(fmt="iso"),
+            ],
+        )
+        file_handler.setFormatter(formatter)
+        stream_handler.setFormatter(formatter)
+
+        log_queue = queue.Queue(maxsize=settings.log_queue_size)
+        _listener = BatchingQueueListener(
+            log_queue,
+            [file_handler, stream_handler],
+            settings.log_batch_size,
+            settings.log_flush_interval_ms / 1000,
+        )
+        _listener.enqueue_handler = _EnqueueHandler(log_queue)
+        _listener.start()
+        root_handlers = [_listener.enqueue_handler]
+        render = [_resolve_exc_info, structlog.stdlib.ProcessorFormatter.wrap_for_formatter]
+    else:
+        root_handlers = [file_handler, stream_handler]
+        render = [structlog.processors.format_exc_info, structlog.processors.JSONRenderer()]
+
     #Step 4: Configure Root logger setup: clear all handlers, then add ours
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level.upper(),logging.INFO))
@@ -53,8 +318,13 @@ def setup_logging(log_level: str = "INFO", log_dir: Optional[str]= None):
             root_logger.removeHandler(handler)
 
         
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(stream_handler)
+    for handler in root_handlers:
+        root_logger.addHandler(handler)
+
+    # Formatters never render the stdlib record's own callsite (structlog's
+    # ColdLoggerCallsite adds it where wanted): skip the per-record stack
+    # walk, as the logging HOWTO's optimisation section suggests.
+    logging._srcfile = None
 
     # Ensure all loggers inherit handlers from root and propagate
     logging.lastResort = None  # Disable fallback handler
@@ -65,14 +335,17 @@ def setup_logging(log_level: str = "INFO", log_dir: Optional[str]= None):
     
     # Configure structlog to use stdlib logger so logs go through standard logging handlers
     structlog.configure(
+        # Cheap checks first: disabled levels and sampled-out events stop
+        # before any context merging, stack walking or rendering.
         processors=[
+            structlog.stdlib.filter_by_level,
+            *([EventSampler(sample_rates)] if sample_rates else []),
             structlog.contextvars.merge_contextvars,
             structlog.processors.add_log_level,
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.CallsiteParameterAdder(),
-            structlog.processors.JSONRenderer()
+            ColdLoggerCallsite(hot_loggers),
+            *render,
         ],
         wrapper_class=structlog.stdlib.BoundLogger,
         context_class=dict,
@@ -82,7 +355,8 @@ def setup_logging(log_level: str = "INFO", log_dir: Optional[str]= None):
 
     structlog.getLogger("saletech.bootstrap").info(
         "logger_initialized",
-        log_file=log_file
+        log_file=log_file,
+        mode=mode,
         )
 
 def get_logger(name: str) -> structlog.BoundLogger:
@@ -0,0 +1,185 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from config.settings import settings
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.logger import get_logger
+from saletech.utils.metrics import counter, gauge, histogram, register_collector
+
+
+logger = get_logger("saletech.loop_monitor")
+
+Stack = Tuple[str, ...]
+
+
+class LoopLagMonitor:
+    """
+    Event-loop lag monitor with a stall profiler.
+
+    Design:
+    - a watchdog thread pings the loop with call_soon_threadsafe() every
+      `interval_ms`; the time until the ping runs is the scheduling lag
+      every ready callback (frame processing, VAD, writer flushes) saw
+    - a ping not answered within `stall_threshold_ms` is a stall: while it
+      lasts the thread samples the loop thread's stack every
+      `sample_interval_ms` (sys._current_frames), so the report names the
+      synchronous call that blocked the loop, not whoever ran next
+    - the stall is logged once the loop recovers (event_loop_stall), with
+      the running task, the hottest frame and the most common stacks
+    - lag and stalls feed histograms exposed on /metrics; the loop itself
+      only runs one tiny callback per ping
+    """
+
+    def __init__(
+        self,
+        interval_ms: float = 100.0,
+        stall_threshold_ms: float = 20.0,
+        sample_interval_ms: float = 2.0,
+        stack_limit: int = 20,
+    ):
+        self.interval_ms = interval_ms
+        self.stall_threshold_ms = stall_threshold_ms
+        self.sample_interval_ms = sample_interval_ms
+        self.stack_limit = stack_limit
+
+        self.lag_ms = LatencyHistogram()
+        self.last_lag_ms = 0.0
+        self.stall_ms = LatencyHistogram()
+        self.stalls = 0
+        self.last_stall: Optional[dict] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="saletech-loop-monitor", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        # The watchdog may be waiting on a ping; keep the loop free to answer it.
+        await asyncio.to_thread(self._thread.join, 5.0)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+
+    def _watch(self) -> None:
+        interval = self.interval_ms / 1000
+        threshold = self.stall_threshold_ms / 1000
+
+        while not self._stop.is_set():
+            answered = threading.Event()
+            sent = time.perf_counter()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                # Loop closed under us.
+                return
+
+            samples: Counter = Counter()
+            task = None
+            if not answered.wait(threshold):
+                task = self._describe_task()
+                while not answered.wait(self.sample_interval_ms / 1000):
+                    self._sample(samples)
+                    if self._stop.is_set():
+                        return
+
+            lag_ms = (time.perf_counter() - sent) * 1000
+            self.last_lag_ms = lag_ms
+            self.lag_ms.record(lag_ms)
+
+            if lag_ms >= self.stall_threshold_ms:
+                self._report_stall(lag_ms, task, samples)
+
+            self._stop.wait(interval)
+
+    def _sample(self, samples: Counter) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = tuple(
+            f"{entry.filename}:{entry.lineno} {entry.name}"
+            for entry in traceback.extract_stack(frame, limit=self.stack_limit)
+        )
+        samples[stack] += 1
+
+    def _describe_task(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return None
+        if task is None:
+            return None
+        coro = task.get_coro()
+        return f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+
+    def _report_stall(self, lag_ms: float, task: Optional[str], samples: Counter) -> None:
+        self.stalls += 1
+        self.stall_ms.record(lag_ms)
+
+        leaves: Counter = Counter()
+        for stack, hits in samples.items():
+            leaves[stack[-1]] += hits
+        top_stacks: List[dict] = [
+            {"samples": hits, "stack": list(stack)}
+            for stack, hits in samples.most_common(3)
+        ]
+
+        self.last_stall = {
+            "lag_ms": round(lag_ms, 2),
+            "threshold_ms": self.stall_threshold_ms,
+            "task": task,
+            "samples": sum(samples.values()),
+            "hot_frame": leaves.most_common(1)[0][0] if leaves else None,
+            "top_stacks": top_stacks,
+        }
+        logger.warning("event_loop_stall", **self.last_stall)
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopLagMonitor(
+            interval_ms=settings.loop_monitor_interval_ms,
+            stall_threshold_ms=settings.loop_stall_threshold_ms,
+            sample_interval_ms=settings.loop_stall_sample_interval_ms,
+        )
+    return _monitor
+
+
+def _collect_loop_metrics():
+    if _monitor is None:
+        return []
+    return [
+        histogram("saletech_event_loop_lag_seconds", "Event-loop scheduling lag.", _monitor.lag_ms),
+        gauge("saletech_event_loop_lag_last_seconds", "Most recent event-loop lag sample.", _monitor.last_lag_ms / 1000),
+        counter("saletech_event_loop_stalls_total", "Loop stalls over the stall threshold.", _monitor.stalls),
+        histogram("saletech_event_loop_stall_seconds", "Duration of loop stalls.", _monitor.stall_ms),
+    ]
+
+
+register_collector("event_loop", _collect_loop_metrics)
@@ -0,0 +1,139 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.logger import get_logger
+
+
+logger = get_logger("saletech.metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket bounds (ms) used for exposition; chosen so most fall on
+# LatencyHistogram bucket edges and aggregate exactly across workers.
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 20, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+Labels = Optional[Dict[str, str]]
+
+
+class MetricFamily:
+    """One metric name with HELP/TYPE and its samples, built at scrape time."""
+
+    __slots__ = ("name", "type", "help", "samples")
+
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.samples: List[Tuple[str, Labels, float]] = []
+
+    def add(self, value: float, labels: Labels = None, suffix: str = "") -> "MetricFamily":
+        self.samples.append((suffix, labels, value))
+        return self
+
+    def add_histogram(
+        self,
+        histogram: LatencyHistogram,
+        labels: Labels = None,
+        buckets_ms: Iterable[float] = DEFAULT_BUCKETS_MS,
+    ) -> "MetricFamily":
+        """Expose a LatencyHistogram (ms) as a Prometheus histogram in seconds."""
+        labels = labels or {}
+        for bound_ms, count in zip(buckets_ms, histogram.cumulative_counts(buckets_ms)):
+            self.add(count, {**labels, "le": _format_value(bound_ms / 1000)}, "_bucket")
+        self.add(histogram.count, {**labels, "le": "+Inf"}, "_bucket")
+        self.add(histogram.total / 1000, labels, "_sum")
+        self.add(histogram.count, labels, "_count")
+        return self
+
+
+def gauge(name: str, help_text: str, value: Optional[float] = None, labels: Labels = None) -> MetricFamily:
+    family = MetricFamily(name, "gauge", help_text)
+    return family.add(value, labels) if value is not None else family
+
+
+def counter(name: str, help_text: str, value: Optional[float] = None, labels: Labels = None) -> MetricFamily:
+    family = MetricFamily(name, "counter", help_text)
+    return family.add(value, labels) if value is not None else family
+
+
+def histogram(name: str, help_text: str, value: Optional[LatencyHistogram] = None, labels: Labels = None) -> MetricFamily:
+    family = MetricFamily(name, "histogram", help_text)
+    return family.add_histogram(value, labels) if value is not None else family
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """
+    Pull-based metrics registry.
+
+    Design:
+    - each subsystem registers a collector when its module loads; the
+      collector reads counters/histograms the subsystem already keeps, so
+      the hot path only ever increments an int or records a histogram
+      value (no per-request allocation)
+    - all formatting happens at scrape time, in render()
+    - a failing collector is logged and skipped, never fails the scrape
+    """
+
+    def __init__(self):
+        self._collectors: Dict[str, Collector] = {}
+
+    def register(self, name: str, collector: Collector) -> None:
+        # Keyed by name: re-importing a module replaces, never duplicates.
+        self._collectors[name] = collector
+
+    def unregister(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def collect(self) -> List[MetricFamily]:
+        families: List[MetricFamily] = []
+        for name, collector in list(self._collectors.items()):
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning("metrics_collector_failed", collector=name, error=str(e))
+        return families
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self.collect():
+            if not family.samples:
+                continue
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for suffix, labels, value in family.samples:
+                lines.append(f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def register_collector(name: str, collector: Collector) -> None:
+    REGISTRY.register(name, collector)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
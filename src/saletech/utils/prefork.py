@@ -0,0 +1,252 @@
+import asyncio
+import gc
+import os
+import signal
+import time
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from saletech.utils.errors import ConfigurationError
+from saletech.utils.lifespan import build_model_registry
+from saletech.utils.logger import get_logger, shutdown_logging
+
+
+logger = get_logger("saletech.prefork")
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """Resident bytes of one process, split into shared and private (Linux)."""
+    values = dict.fromkeys(_SMAPS_FIELDS, 0)
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in values:
+                values[key] = int(rest.split()[0]) * 1024
+
+    return {
+        "rss_bytes": values["Rss"],
+        "pss_bytes": values["Pss"],
+        "shared_bytes": values["Shared_Clean"] + values["Shared_Dirty"],
+        "private_bytes": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def memory_report(worker_pids: List[int], parent_pid: Optional[int] = None) -> dict:
+    """
+    Per-worker RSS versus shared bytes.
+
+    RSS counts a shared page in every process that maps it; PSS divides it
+    between the sharers. Summed RSS minus summed PSS is what the workers
+    would have duplicated had each loaded its own weights.
+    """
+    processes: Dict[int, Dict[str, int]] = {}
+    for pid in ([parent_pid] if parent_pid else []) + list(worker_pids):
+        try:
+            processes[pid] = process_memory(pid)
+        except OSError:
+            # Exited between listing and reading, or no smaps_rollup.
+            continue
+
+    rss_total = sum(p["rss_bytes"] for p in processes.values())
+    pss_total = sum(p["pss_bytes"] for p in processes.values())
+
+    return {
+        "parent": processes.get(parent_pid) if parent_pid else None,
+        "workers": {pid: processes[pid] for pid in worker_pids if pid in processes},
+        "rss_total_bytes": rss_total,
+        "pss_total_bytes": pss_total,
+        "shared_savings_bytes": rss_total - pss_total,
+    }
+
+
+def _check_cpu_only() -> None:
+    """
+    Pre-forking shares host memory; CUDA contexts do not survive fork().
+    """
+    cuda_models = []
+    if settings.preload_asr_model and settings.whisper_device == "cuda":
+        cuda_models.append("asr")
+    if settings.preload_llm_model and settings.llm_device == "cuda":
+        cuda_models.append("llm")
+
+    if cuda_models:
+        raise ConfigurationError(
+            "Pre-fork serving needs CPU models; set the device to 'cpu' or use per-worker loading",
+            context={"cuda_models": cuda_models},
+        )
+
+    # Keep 'auto' devices (VAD, LLM) off the GPU. torch is not imported
+    # yet, so this takes effect for the parent and every forked worker.
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+
+class PreforkServer:
+    """
+    Load models once, then fork uvicorn workers that share them.
+
+    Design:
+    - the parent runs the same model registry as the lifespan, so the
+      service singletons are already populated when workers fork; the
+      worker lifespan finds them loaded and its /ready flips immediately
+    - weights are shared copy-on-write: inference only reads them, and
+      gc.freeze() keeps the worker GC from dirtying the parent's object pages
+    - memory-mapped weights (the quantized LLM cache) are file-backed and
+      shared even across unrelated processes
+    - executor threads are stopped before fork and recreated in each worker
+      (registry.prepare_for_fork / after_fork)
+    - the parent only supervises: it respawns crashed workers from the
+      already-loaded image and logs a per-worker memory report after
+      start-up and on SIGUSR1
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        workers: int = settings.prefork_workers,
+        host: str = settings.host,
+        port: int = settings.port,
+        report_delay_seconds: float = settings.prefork_memory_report_delay_seconds,
+    ):
+        self.app = app
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.report_delay_seconds = report_delay_seconds
+
+        self._registry = None
+        self._config = None
+        self._socket = None
+        self._worker_pids: Dict[int, int] = {}  # pid -> worker index
+
+        self._stopping = False
+        self._report_requested = False
+
+    def run(self) -> None:
+        _check_cpu_only()
+
+        self._registry = build_model_registry()
+        asyncio.run(self._registry.load_all())
+        if not self._registry.ready:
+            raise ConfigurationError(
+                "Required models failed to load in the pre-fork parent",
+                context=self._registry.snapshot(),
+            )
+
+        import uvicorn
+
+        self._config = uvicorn.Config(
+            self.app,
+            host=self.host,
+            port=self.port,
+            lifespan="on",
+            log_config=None,
+        )
+        self._socket = self._config.bind_socket()
+
+        self._registry.prepare_for_fork()
+        gc.collect()
+        gc.freeze()
+
+        for index in range(self.workers):
+            self._spawn(index)
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGUSR1, self._handle_report)
+
+        logger.info(
+            "prefork_started",
+            workers=list(self._worker_pids),
+            host=self.host,
+            port=self.port,
+        )
+
+        try:
+            self._supervise()
+        finally:
+            self._socket.close()
+            logger.info("prefork_stopped")
+
+    def memory_report(self) -> dict:
+        return memory_report(list(self._worker_pids), parent_pid=os.getpid())
+
+    # ------------------------------------------------------------------
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                logger.error("prefork_worker_crashed", worker=index, exc_info=True)
+                exit_code = 1
+            finally:
+                # os._exit skips atexit: flush queued log records first.
+                shutdown_logging()
+                os._exit(exit_code)
+
+        self._worker_pids[pid] = index
+
+    def _run_worker(self) -> None:
+        import uvicorn
+
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGUSR1):
+            signal.signal(sig, signal.SIG_DFL)
+
+        self._registry.after_fork()
+        uvicorn.Server(self._config).run(sockets=[self._socket])
+
+    def _supervise(self) -> None:
+        report_at = time.monotonic() + self.report_delay_seconds
+
+        while self._worker_pids:
+            self._reap()
+
+            if self._report_requested or (report_at and time.monotonic() >= report_at):
+                self._report_requested = False
+                report_at = 0.0
+                logger.info("prefork_memory_report", **self.memory_report())
+
+            time.sleep(0.5)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            index = self._worker_pids.pop(pid, None)
+            if index is None:
+                continue
+
+            if self._stopping:
+                logger.info("prefork_worker_stopped", worker=index, pid=pid)
+                continue
+
+            logger.warning(
+                "prefork_worker_exited",
+                worker=index,
+                pid=pid,
+                exit_code=os.waitstatus_to_exitcode(status),
+            )
+            self._spawn(index)
+
+    def _handle_stop(self, signum, frame) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.info("prefork_stopping", signal=signal.Signals(signum).name)
+        for pid in list(self._worker_pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _handle_report(self, signum, frame) -> None:
+        self._report_requested = True
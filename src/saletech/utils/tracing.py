@@ -0,0 +1,232 @@
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+import structlog
+
+from saletech.models.schemas import SessionMetrics
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.metrics import MetricFamily, gauge, register_collector
+
+
+# Per-utterance stages, in pipeline order. Durations are milliseconds.
+#   vad               VAD inference summed over the utterance's frames
+#   speech            first speech frame -> end-of-turn
+#   finalize          speech buffer concatenation on the EOT frame
+#   asr_queue         waiting for an ASR slot
+#   asr_decode        Whisper decode
+#   llm_ttft          LLM request -> first token
+#   writer_enqueue    handing the transcript record to the writer thread
+#                     (waits only when the session's queue is full; the disk
+#                     commit happens after, off the event loop)
+#   eot_to_transcript end-of-turn -> transcript handed to the writer (user-perceived)
+STAGES = (
+    "vad",
+    "speech",
+    "finalize",
+    "asr_queue",
+    "asr_decode",
+    "llm_ttft",
+    "writer_enqueue",
+    "eot_to_transcript",
+)
+
+_current_trace: ContextVar[Optional["UtteranceTrace"]] = ContextVar(
+    "saletech_utterance_trace", default=None
+)
+
+
+def current_trace() -> Optional["UtteranceTrace"]:
+    """Trace of the utterance being processed by the calling task, if any."""
+    return _current_trace.get()
+
+
+class UtteranceTrace:
+    """
+    Stage timings for one utterance, on the monotonic perf_counter clock.
+
+    Services do not take a trace argument: the pipeline activates the trace
+    in a context variable, services look it up with current_trace(), and
+    structlog's merge_contextvars stamps utterance_id on every log line
+    emitted while it is active.
+    """
+
+    __slots__ = ("utterance_id", "session_id", "marks", "stages")
+
+    def __init__(self, session_id: str, utterance_id: Optional[str] = None):
+        self.utterance_id = utterance_id or uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.marks: Dict[str, float] = {}
+        self.stages: Dict[str, float] = {}
+
+    def mark(self, name: str, at: Optional[float] = None) -> None:
+        self.marks[name] = time.perf_counter() if at is None else at
+
+    def add(self, stage: str, duration_ms: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + duration_ms
+
+    def between(self, stage: str, start_mark: str, end_mark: str) -> None:
+        start = self.marks.get(start_mark)
+        end = self.marks.get(end_mark)
+        if start is not None and end is not None:
+            self.stages[stage] = (end - start) * 1000
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, (time.perf_counter() - start) * 1000)
+
+    @contextmanager
+    def activate(self) -> Iterator["UtteranceTrace"]:
+        token = _current_trace.set(self)
+        with structlog.contextvars.bound_contextvars(utterance_id=self.utterance_id):
+            try:
+                yield self
+            finally:
+                _current_trace.reset(token)
+
+    def as_dict(self) -> dict:
+        return {
+            "utterance_id": self.utterance_id,
+            "session_id": self.session_id,
+            "stages_ms": dict(self.stages),
+        }
+
+
+class StageHistograms:
+    """One LatencyHistogram per stage; mergeable across sessions and workers."""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, stages: Dict[str, float]) -> None:
+        for stage, value in stages.items():
+            self.record_value(stage, value)
+
+    def record_value(self, stage: str, value_ms: float) -> None:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+        histogram.record(value_ms)
+
+    def merge(self, other: "StageHistograms") -> "StageHistograms":
+        for stage, histogram in other.histograms.items():
+            self.histograms.setdefault(stage, LatencyHistogram()).merge(histogram)
+        return self
+
+    def summary(self) -> dict:
+        return {stage: h.summary() for stage, h in self.histograms.items()}
+
+
+# Per-utterance stages plus "vad_frame" (VAD inference per frame).
+_worker_stats = StageHistograms()
+_session_tracers: Dict[str, "SessionTracer"] = {}
+
+
+class SessionTracer:
+    """
+    Per-session utterance tracing.
+
+    Design:
+    - start_utterance() opens a trace on the first speech frame; finish()
+      closes it once the last stage for this pipeline has run
+    - per-frame VAD time goes straight into SessionMetrics.vad_latencies_ms
+      and the worker "vad_frame" histogram (record_vad_frame)
+    - finished traces fill the SessionMetrics asr / llm histograms, keep
+      the last `history` breakdowns for queries, and feed per-session and
+      worker-wide stage histograms
+    - tracers register themselves by session id so the API can query any
+      live session; close() unregisters
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        metrics: Optional[SessionMetrics] = None,
+        history: int = 50,
+    ):
+        self.session_id = session_id
+        self.metrics = metrics or SessionMetrics(session_id=session_id)
+        self.history = history
+
+        self.recent: List[dict] = []
+        self.stats = StageHistograms()
+
+        _session_tracers[session_id] = self
+
+    def start_utterance(self, utterance_id: Optional[str] = None) -> UtteranceTrace:
+        return UtteranceTrace(self.session_id, utterance_id)
+
+    def record_vad_frame(self, duration_ms: float) -> None:
+        self.metrics.vad_latencies_ms.record(duration_ms)
+        _worker_stats.record_value("vad_frame", duration_ms)
+
+    def finish(self, trace: UtteranceTrace) -> None:
+        stages = trace.stages
+
+        self.metrics.total_utterances += 1
+        if "asr_queue" in stages or "asr_decode" in stages:
+            self.metrics.asr_latencies_ms.record(
+                stages.get("asr_queue", 0.0) + stages.get("asr_decode", 0.0)
+            )
+        if "llm_ttft" in stages:
+            self.metrics.llm_latencies_ms.record(stages["llm_ttft"])
+
+        self.recent.append(trace.as_dict())
+        if len(self.recent) > self.history:
+            del self.recent[0]
+
+        self.stats.record(stages)
+        _worker_stats.record(stages)
+
+    def summary(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "utterances": self.metrics.total_utterances,
+            "stages": self.stats.summary(),
+            "vad_frame": self.metrics.vad_latencies_ms.summary(),
+            "recent": list(self.recent),
+        }
+
+    def close(self) -> None:
+        if _session_tracers.get(self.session_id) is self:
+            del _session_tracers[self.session_id]
+
+
+def session_latency(session_id: str) -> Optional[dict]:
+    tracer = _session_tracers.get(session_id)
+    return tracer.summary() if tracer is not None else None
+
+
+def worker_stage_histograms() -> StageHistograms:
+    """Live worker-wide histograms (snapshot before shipping elsewhere)."""
+    return _worker_stats
+
+
+def worker_latency() -> dict:
+    return {
+        "active_sessions": len(_session_tracers),
+        "stages": _worker_stats.summary(),
+    }
+
+
+def _collect_tracing_metrics():
+    stages = MetricFamily(
+        "saletech_utterance_stage_seconds",
+        "histogram",
+        "Per-utterance pipeline stage latency (vad_frame is per VAD frame).",
+    )
+    for stage, stage_histogram in _worker_stats.histograms.items():
+        stages.add_histogram(stage_histogram, {"stage": stage})
+    return [
+        gauge("saletech_sessions_active", "Live sessions and transcription pipelines.", len(_session_tracers)),
+        stages,
+    ]
+
+
+register_collector("tracing", _collect_tracing_metrics)
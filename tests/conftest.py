@@ -0,0 +1,81 @@
+import sys
+import types
+
+import pytest
+
+
+class _PreloadedASR:
+    def __init__(self):
+        self.forked = False
+
+    async def initialize(self):
+        pass
+
+    def after_fork(self):
+        self.forked = True
+
+
+class _PreloadedVAD:
+    async def initialize(self):
+        pass
+
+
+@pytest.fixture
+def preloaded_models(monkeypatch):
+    """Registry loaders build fakes instead of Whisper / Silero (no LLM)."""
+    import saletech.services.streaming_asr as streaming_asr
+    from config.settings import settings
+    from saletech.services.vad_adv_service import VADService
+
+    monkeypatch.setattr(streaming_asr, "StreamingASR", _PreloadedASR)
+    monkeypatch.setattr(streaming_asr, "_asr_instance", None)
+    monkeypatch.setattr(VADService, "_vad_model", None)
+    monkeypatch.setitem(
+        sys.modules, "saletech.media.vad.vad_model", types.SimpleNamespace(AdvancedVadModel=_PreloadedVAD)
+    )
+    monkeypatch.setattr(settings, "preload_vad_model", True)
+    monkeypatch.setattr(settings, "preload_asr_model", True)
+    monkeypatch.setattr(settings, "preload_llm_model", False)
+
+
+class _Segment:
+    text = "hello there"
+    avg_logprob = -0.2
+
+
+class _FakeWhisper:
+    def transcribe(self, audio, **kwargs):
+        return iter([_Segment()]), None
+
+
+@pytest.fixture
+def fake_whisper():
+    """Stands in for a faster-whisper model: every decode says "hello there"."""
+    return _FakeWhisper()
+
+
+@pytest.fixture
+def recording_pipeline(monkeypatch):
+    """/ws/transcribe builds this instead of a TranscriptionPipeline; `.frames` holds what it was fed."""
+    import saletech.transcriber.pipeline as pipeline_module
+
+    class _RecordingPipeline:
+        frames = []
+
+        def __init__(self, session_id):
+            self.session_id = session_id
+
+        async def initialize(self):
+            pass
+
+        async def process_frame(self, audio):
+            _RecordingPipeline.frames.append(audio)
+
+        async def flush(self):
+            pass
+
+        async def shutdown(self):
+            return {}
+
+    monkeypatch.setattr(pipeline_module, "TranscriptionPipeline", _RecordingPipeline)
+    return _RecordingPipeline
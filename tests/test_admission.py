@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import pytest
+
+from saletech.core.admission import DEGRADED, NORMAL, SHEDDING, AdmissionController
+from saletech.core.session_manager import SessionManager
+from saletech.core.session_store import MemorySessionStore
+from saletech.utils.errors import SessionRejectedError
+
+
+def _controller(**kwargs):
+    return AdmissionController(targets={"asr_queue_ms": 300.0, "loop_lag_ms": 20.0}, **kwargs)
+
+
+def test_degrades_before_shedding_with_hysteresis():
+    controller = _controller()
+
+    controller.sample({"asr_queue_ms": 90.0, "loop_lag_ms": 2.0})
+    assert controller.mode == NORMAL
+    controller.sample({"asr_queue_ms": 240.0, "loop_lag_ms": 2.0})
+    assert controller.mode == DEGRADED
+    controller.sample({"asr_queue_ms": 90.0, "loop_lag_ms": 30.0})
+    assert (controller.mode, controller.pressure) == (SHEDDING, 1.5)
+
+    decision = asyncio.run(controller.check())
+    assert not decision.admitted
+    assert decision.reason == "loop_lag_ms"
+    assert decision.retry_after == 8  # 5 s scaled by 1.5x overload
+
+    controller.sample({"loop_lag_ms": 19.0})  # just under the threshold: stays
+    assert controller.mode == SHEDDING
+    controller.sample({"loop_lag_ms": 15.0})
+    assert controller.mode == DEGRADED
+    assert asyncio.run(controller.check()).admitted
+
+
+def test_rejection_points_at_least_loaded_peer():
+    store = MemorySessionStore()
+    busy = _controller(store=store, worker_id="a", advertise_url="http://a:8000")
+    idle = _controller(store=store, worker_id="b", advertise_url="http://b:8000")
+    warm = _controller(store=store, worker_id="c", advertise_url="http://c:8000")
+    idle.sample({"loop_lag_ms": 2.0})
+    warm.sample({"loop_lag_ms": 10.0})
+    busy.sample({"loop_lag_ms": 40.0})
+
+    async def scenario():
+        manager = SessionManager(store=store, admission=busy, max_sessions=10)
+        with pytest.raises(SessionRejectedError) as rejected:
+            await manager.create_session()
+        return rejected.value
+
+    error = asyncio.run(scenario())
+    assert error.preferred_worker == "http://b:8000"
+    assert error.retry_after == 10
+
+
+def test_transcriber_websocket_is_refused_while_shedding(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+
+    import saletech.core.admission as admission
+    import saletech.transcriber.pipeline as pipeline_module
+    from saletech.api.transcriber import WS_TRY_AGAIN_LATER, router
+
+    class _NeverBuilt:
+        def __init__(self, session_id):
+            raise AssertionError("refused stream must not build a pipeline")
+
+    controller = _controller()
+    controller.sample({"loop_lag_ms": 40.0})
+    monkeypatch.setattr(admission, "_controller", controller)
+    monkeypatch.setattr(pipeline_module, "TranscriptionPipeline", _NeverBuilt)
+    app = FastAPI()
+    app.include_router(router)
+
+    with TestClient(app).websocket_connect("/ws/transcribe") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+
+    assert closed.value.code == WS_TRY_AGAIN_LATER
+    assert json.loads(closed.value.reason) == {"retry_after": 10, "preferred_worker": None, "reason": "loop_lag_ms"}
+    assert controller.rejected == 1
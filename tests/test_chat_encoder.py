@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("torch")
+tokenizers = pytest.importorskip("tokenizers")
+transformers = pytest.importorskip("transformers")
+
+from saletech.services.chat_encoder import IncrementalChatEncoder
+from saletech.services.llm import LLMWithKVCache
+
+SPECIAL_TOKENS = ["<|im_start|>", "<|im_end|>", "<|system|>", "<|user|>", "<|assistant|>", "</s>"]
+
+# Append-only (Qwen / ChatML): every turn can be encoded on its own.
+CHATML = (
+    "{% for m in messages %}<|im_start|>{{ m['role'] }}\n{{ m['content'] }}<|im_end|>\n{% endfor %}"
+    "{% if add_generation_prompt %}<|im_start|>assistant\n{% endif %}"
+)
+# The last message is left open, so appending one rewrites the one before it.
+OPEN_LAST = (
+    "{% for m in messages %}<|{{ m['role'] }}|>{{ m['content'] }}{% if not loop.last %}</s>{% endif %}{% endfor %}"
+    "{% if add_generation_prompt %}<|assistant|>{% endif %}"
+)
+
+TURNS = [
+    ("Hi, what does the starter plan cost?", "The starter plan is 499 a month."),
+    ("And the team plan?", "Team is 1299 a month for up to ten seats."),
+    ("Can I try it first?", "Yes, there is a fourteen day trial."),
+]
+
+
+def _tokenizer(template):
+    """A small byte-level BPE trained in memory, so merges can cross segment edges."""
+    model = tokenizers.Tokenizer(tokenizers.models.BPE())
+    model.pre_tokenizer = tokenizers.pre_tokenizers.ByteLevel(add_prefix_space=False)
+    model.decoder = tokenizers.decoders.ByteLevel()
+    trainer = tokenizers.trainers.BpeTrainer(
+        vocab_size=400,
+        special_tokens=SPECIAL_TOKENS,
+        initial_alphabet=tokenizers.pre_tokenizers.ByteLevel.alphabet(),
+    )
+    corpus = [text for turn in TURNS for text in turn] + ["system user assistant probe content\n"]
+    model.train_from_iterator(corpus * 20, trainer)
+    return transformers.PreTrainedTokenizerFast(
+        tokenizer_object=model,
+        additional_special_tokens=SPECIAL_TOKENS,
+        chat_template=template,
+    )
+
+
+@pytest.mark.parametrize("template, incremental, end_of_turn", [(CHATML, True, "<|im_end|>"), (OPEN_LAST, False, "</s>")])
+def test_prompt_ids_match_the_full_template_over_several_turns(template, incremental, end_of_turn):
+    tokenizer = _tokenizer(template)
+    service = LLMWithKVCache()
+    service.tokenizer = tokenizer
+    service._encoder = IncrementalChatEncoder(tokenizer)
+    assert service._encoder.incremental is incremental
+
+    messages = [{"role": "system", "content": "You are a sales agent."}]
+    for turn, (question, reply) in enumerate(TURNS):
+        messages = messages + [{"role": "user", "content": question}]
+        prompt_ids, reused = service._encode_prompt("s", messages)
+
+        rendered = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        assert prompt_ids == tokenizer(rendered, add_special_tokens=False)["input_ids"]
+        if turn and incremental:
+            assert reused == len(service._session_input_ids["s"])
+
+        # What generate() would leave behind: the reply, stopped on end of turn.
+        new_ids = tokenizer(reply, add_special_tokens=False)["input_ids"] + tokenizer.convert_tokens_to_ids([end_of_turn])
+        service._session_caches["s"] = object()
+        service._store_turn_state("s", messages, prompt_ids, new_ids)
+        messages = service._session_messages["s"]
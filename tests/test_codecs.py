@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config.settings import settings
+from saletech.api.transcriber import router
+from saletech.media.codecs import (
+    ALAW_TABLE,
+    PLC_FADE_FRAMES,
+    ULAW_TABLE,
+    create_decoder,
+    encode_g711,
+    opus_available,
+)
+from saletech.media.framing import AudioFrame, decode_message, encode_message
+from saletech.utils.errors import FramingError
+
+
+def test_g711_tables_match_the_reference_decoder():
+    audioop = pytest.importorskip("audioop")
+    codes = bytes(range(256))
+    for table, reference in ((ULAW_TABLE, audioop.ulaw2lin), (ALAW_TABLE, audioop.alaw2lin)):
+        expected = np.frombuffer(reference(codes, 2), dtype=np.int16) / 32768
+        assert np.array_equal(table, expected.astype(np.float32))
+
+
+def test_g711_decode_round_trips_within_quantisation_error():
+    audio = (0.5 * np.sin(np.linspace(0, 40 * np.pi, settings.chunk_size_samples))).astype(np.float32)
+    for codec in ("mulaw", "alaw"):
+        decoded = create_decoder(codec, len(audio)).decode(encode_g711(audio, codec))
+        assert decoded.dtype == np.float32
+        assert np.max(np.abs(decoded - audio)) < 0.02
+
+    with pytest.raises(FramingError):
+        payload = encode_g711(audio, "mulaw")[:-1]  # one byte short of its sample count
+        decode_message(encode_message([AudioFrame(0, 0.0, len(audio), "mulaw", payload)]))
+
+
+def test_concealment_fades_the_last_frame_then_goes_silent(monkeypatch):
+    monkeypatch.setattr(settings, "ws_max_concealed_frames", 6)
+    decoder = create_decoder("pcm16", 4)
+    decoder.decode(np.full(4, 16384, dtype=np.int16).tobytes())
+
+    frames = decoder.conceal(10)
+    assert len(frames) == 6  # capped
+    levels = [float(frame[0]) for frame in frames]
+    assert levels[:PLC_FADE_FRAMES] == [0.25, 0.125, 0.0625]
+    assert levels[PLC_FADE_FRAMES:] == [0.0] * (6 - PLC_FADE_FRAMES)
+    assert decoder.decode(b"\x00\x01\x02").shape == (4,)  # odd byte count: concealed, not raised
+
+
+@pytest.mark.skipif(not opus_available(), reason="opuslib/libopus not installed")
+def test_opus_decoder_streams_and_conceals():
+    import opuslib
+
+    samples = settings.chunk_size_samples
+    encoder = opuslib.Encoder(settings.sample_rate, 1, opuslib.APPLICATION_VOIP)
+    decoder = create_decoder("opus", samples, settings.sample_rate)
+    pcm = (8000 * np.sin(np.arange(samples) / 8)).astype(np.int16).tobytes()
+
+    assert decoder.decode(encoder.encode(pcm, samples)).shape == (samples,)
+    assert [frame.shape for frame in decoder.conceal(2)] == [(samples,)] * 2
+
+
+def test_lost_mulaw_frames_are_concealed_in_the_stream(recording_pipeline):
+    app = FastAPI()
+    app.include_router(router)
+    samples = settings.chunk_size_samples
+
+    def frame(seq, level):
+        payload = encode_g711(np.full(samples, level, dtype=np.float32), "mulaw")
+        return AudioFrame(seq, 1_700_000_000.0 + seq * 0.02, samples, "mulaw", payload)
+
+    with TestClient(app).websocket_connect("/ws/transcribe") as ws:
+        ws.send_json({"type": "hello", "version": 1, "codecs": ["mulaw"], "sample_rates": [16000]})
+        assert ws.receive_json()["codec"] == "mulaw"
+        ws.send_bytes(encode_message([frame(0, 0.5), frame(3, 0.25)]))  # 1 and 2 lost
+
+    levels = [float(audio[0]) for audio in recording_pipeline.frames]
+    assert len(levels) == 4  # every 20 ms slot is filled, so VAD time stays true
+    assert levels[0] == pytest.approx(0.5, abs=0.02)
+    assert levels[1] == pytest.approx(levels[0] / 2) and levels[2] == pytest.approx(levels[0] / 4)
+    assert levels[3] == pytest.approx(0.25, abs=0.02)
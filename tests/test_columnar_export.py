@@ -0,0 +1,117 @@
+import asyncio
+import os
+from datetime import date, datetime, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from saletech.transcriber.columnar import (
+    ColumnarSink,
+    daily_percentile,
+    export_transcripts,
+    read_utterances,
+)
+from saletech.transcriber.store import SegmentStore, compact_segments
+from saletech.transcriber.writer import TranscriptIO, TranscriptWriter
+
+
+DAY1 = datetime(2026, 10, 18, 12, tzinfo=timezone.utc).timestamp()
+DAY2 = datetime(2026, 10, 19, 12, tzinfo=timezone.utc).timestamp()
+
+
+def _payload(session_id, n, ts, latency):
+    return {
+        "session_id": session_id,
+        "utterance_id": f"{session_id}-{n}",
+        "vad_start_ts": ts - 2,
+        "vad_end_ts": ts - 1,
+        "speech_duration_ms": 1000.0,
+        "asr_latency_ms": latency,
+        "text": "hello",
+        "confidence": 0.9,
+        "timestamp": ts,
+    }
+
+
+def _write_segments(root, records):
+    store = SegmentStore(str(root), max_bytes=2000)
+    io = TranscriptIO(flush_records=8)
+
+    async def scenario():
+        writers = {}
+        for record in records:
+            writer = writers.get(record["session_id"])
+            if writer is None:
+                writer = writers[record["session_id"]] = TranscriptWriter(
+                    record["session_id"], str(root), io=io, store=store
+                )
+            await writer.write(record)
+        await asyncio.gather(*(w.close() for w in writers.values()))
+
+    asyncio.run(scenario())
+    store.close()
+
+
+def test_export_partitions_by_date_and_filters_push_down(tmp_path):
+    records = [_payload("a", n, DAY1 + n, 100.0 + n) for n in range(20)]
+    records += [_payload("b", n, DAY2 + n, 200.0 + n) for n in range(20)]
+    _write_segments(tmp_path / "src", records)
+    out = tmp_path / "out"
+
+    summary = export_transcripts(str(tmp_path / "src"), str(out))
+
+    assert summary["rows"] == 40
+    assert sorted(os.listdir(out)) == ["_exported.json", "date=2026-10-18", "date=2026-10-19"]
+
+    table = read_utterances(str(out), start_date=date(2026, 10, 19))
+    assert set(table["session_id"].to_pylist()) == {"b"}
+    assert table.schema.field("timestamp").type == pa.timestamp("us", tz="UTC")
+
+    only_a = read_utterances(str(out), session_ids=["a"], columns=["utterance_id"])
+    assert only_a.num_rows == 20
+
+    p95 = daily_percentile(str(out), "asr_latency_ms", 95)
+    assert p95["2026-10-18"] == pytest.approx(118.0, abs=1.0)
+    assert p95["2026-10-19"] == pytest.approx(218.0, abs=1.0)
+
+    # Reruns export nothing new, including after compaction.
+    compact_segments(str(tmp_path / "src"), min_age_seconds=0)
+    assert export_transcripts(str(tmp_path / "src"), str(out))["rows"] == 0
+
+
+def test_live_sink_writes_parquet_from_io_thread(tmp_path):
+    sink = ColumnarSink(str(tmp_path / "live"), flush_rows=5, flush_interval=60)
+    io = TranscriptIO(sink=sink)
+
+    async def scenario():
+        writer = TranscriptWriter("s", str(tmp_path / "jsonl"), io=io, layout="files")
+        for n in range(12):
+            await writer.write(_payload("s", n, DAY1 + n, 50.0))
+        await writer.close()
+
+    asyncio.run(scenario())
+    sink.flush()
+
+    assert read_utterances(str(tmp_path / "live")).num_rows == 12
+
+
+def test_compacting_exported_with_unexported_segments_exports_each_row_once(tmp_path):
+    source, out = tmp_path / "src", tmp_path / "out"
+    _write_segments(source, [_payload("a", n, DAY1 + n, 100.0) for n in range(20)])
+    assert export_transcripts(str(source), str(out))["rows"] == 20
+
+    # Sealed after the export, then merged with the exported segments.
+    _write_segments(source, [_payload("a", n, DAY1 + n, 100.0) for n in range(20, 30)])
+    _write_segments(source, [_payload("b", n, DAY2 + n, 200.0) for n in range(5)])
+    compact_segments(str(source), min_age_seconds=0)
+    assert len([f for f in os.listdir(source) if f.endswith(".jsonl")]) == 1
+
+    assert export_transcripts(str(source), str(out))["rows"] == 15
+    ids = read_utterances(str(out), columns=["utterance_id"])["utterance_id"].to_pylist()
+    assert sorted(ids) == sorted([f"a-{n}" for n in range(30)] + [f"b-{n}" for n in range(5)])
+
+    # Compacting the compacted segment again keeps where each row came from.
+    _write_segments(source, [_payload("c", 0, DAY2, 300.0)])
+    compact_segments(str(source), min_age_seconds=0)
+    assert export_transcripts(str(source), str(out))["rows"] == 1
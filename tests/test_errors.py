@@ -1,5 +1,5 @@
 import pytest
-from src.saletech.utils.errors import (
+from saletech.utils.errors import (
     SaleTechException,
     SessionNotFoundError,
     ValidationError,
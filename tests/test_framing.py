@@ -0,0 +1,109 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config.settings import settings
+from saletech.api.transcriber import router
+from saletech.media.framing import (
+    AudioFrame,
+    SequenceTracker,
+    decode_message,
+    encode_message,
+    negotiate,
+)
+from saletech.utils.errors import FramingError
+
+
+def _pcm_frame(seq, value=0):
+    samples = settings.chunk_size_samples
+    payload = np.full(samples, value, dtype=np.int16).tobytes()
+    return AudioFrame(seq, 1_700_000_000.25 + seq * 0.02, samples, "pcm16", payload)
+
+
+def test_batched_message_round_trips_and_rejects_malformed():
+    frames = [_pcm_frame(seq, seq) for seq in range(4)]
+    message = encode_message(frames)
+
+    decoded = decode_message(message)
+    assert [f.seq for f in decoded] == [0, 1, 2, 3]
+    assert decoded[2].payload == frames[2].payload
+    assert decoded[3].timestamp == pytest.approx(frames[3].timestamp, abs=1e-6)
+
+    for bad in (message[:-1], message + b"\0", b"\x02" + message[1:]):
+        with pytest.raises(FramingError):
+            decode_message(bad)
+    with pytest.raises(FramingError):
+        decode_message(message, max_frames=2)
+
+
+def test_sequence_tracker_counts_gaps_and_drops_late_frames_across_wrap():
+    tracker = SequenceTracker()
+    top = 2**32 - 2
+    assert [tracker.accept(seq) for seq in (top, top + 1, 0)] == [0, 0, 0]
+    assert tracker.accept(3) == 2  # 1 and 2 lost
+    assert tracker.accept(2) == -1  # arrived late
+    assert tracker.accept(3) == -1  # duplicate
+    assert tracker.metrics == {"received": 4, "lost": 2, "late": 2}
+
+
+def test_handshake_batches_more_frames_under_load():
+    hello = {"type": "hello", "version": 1, "codecs": ["speex", "pcm16"], "sample_rates": [48000, 16000]}
+    assert negotiate(hello)["codec"] == "pcm16"
+    assert negotiate(hello)["frames_per_message"] == settings.ws_frames_per_message
+    assert negotiate(hello, under_load=True)["frames_per_message"] == settings.ws_frames_per_message_under_load
+    assert negotiate({**hello, "max_frames_per_message": 2}, under_load=True)["frames_per_message"] == 2
+
+    with pytest.raises(FramingError):
+        negotiate({**hello, "codecs": ["speex"]})
+    with pytest.raises(FramingError):
+        negotiate({**hello, "sample_rates": [8000]})
+
+
+def test_websocket_frames_reach_the_pipeline_in_order(recording_pipeline):
+    app = FastAPI()
+    app.include_router(router)
+
+    with TestClient(app).websocket_connect("/ws/transcribe") as ws:
+        ws.send_json({"type": "hello", "version": 1, "codecs": ["pcm16"], "sample_rates": [16000]})
+        ready = ws.receive_json()
+        assert ready["type"] == "ready" and ready["frame_samples"] == settings.chunk_size_samples
+
+        ws.send_bytes(encode_message([_pcm_frame(0, 100), _pcm_frame(1, 200)]))
+        ws.send_bytes(encode_message([_pcm_frame(1, 999), _pcm_frame(3, 300)]))  # dup, then a gap
+
+    # seq 2 was lost: concealed as frame 1 at half gain
+    assert [round(float(f[0]) * 32768) for f in recording_pipeline.frames] == [100, 200, 100, 300]
+
+
+def test_websocket_rejects_frames_off_the_negotiated_stream(recording_pipeline):
+    from starlette.websockets import WebSocketDisconnect
+
+    from saletech.api.transcriber import WS_INVALID_PAYLOAD, WS_PROTOCOL_ERROR
+
+    app = FastAPI()
+    app.include_router(router)
+    hello = {"type": "hello", "version": 1, "codecs": ["mulaw"], "sample_rates": [16000]}
+    samples = settings.chunk_size_samples
+
+    def close_code(*messages):
+        with TestClient(app).websocket_connect("/ws/transcribe") as ws:
+            for message in messages:
+                if isinstance(message, bytes):
+                    ws.send_bytes(message)
+                else:
+                    ws.send_text(message)
+            with pytest.raises(WebSocketDisconnect) as closed:
+                while True:
+                    ws.receive_json()
+        return closed.value.code
+
+    hello_text = json.dumps(hello)
+    pcm_on_mulaw = encode_message([_pcm_frame(0)])
+    short_frame = encode_message([AudioFrame(0, 0.0, samples // 2, "mulaw", bytes(samples // 2))])
+    assert close_code(hello_text, pcm_on_mulaw) == WS_INVALID_PAYLOAD
+    assert close_code(hello_text, short_frame) == WS_INVALID_PAYLOAD
+    assert close_code(hello_text, "not audio") == WS_PROTOCOL_ERROR
+    assert close_code("[1, 2]") == WS_PROTOCOL_ERROR
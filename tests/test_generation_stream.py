@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from saletech.services.generation_stream import AsyncTokenStreamer, CancelGenerationCriteria
+
+
+class _WordTokenizer:
+    """Every id decodes to one word, so the streamer emits text per token."""
+
+    def decode(self, ids, **kwargs):
+        return "".join(f"w{int(i)} " for i in ids)
+
+
+def _tiny_qwen():
+    config = transformers.Qwen2Config(
+        vocab_size=128,
+        hidden_size=64,
+        intermediate_size=128,
+        num_hidden_layers=1,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        max_position_embeddings=256,
+    )
+    torch.manual_seed(0)
+    model = transformers.AutoModelForCausalLM.from_config(config).eval()
+    model.generation_config.eos_token_id = None
+    model.generation_config.pad_token_id = 0
+    return model
+
+
+PROMPT = torch.tensor([[5, 17, 42, 9]])
+
+
+def test_streamer_delivers_tokens_from_the_generate_thread_to_the_loop():
+    model = _tiny_qwen()
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        streamer = AsyncTokenStreamer(_WordTokenizer(), loop, queue)
+        outputs = {}
+
+        def generate():
+            outputs["ids"] = model.generate(PROMPT, max_new_tokens=12, do_sample=False, streamer=streamer)
+
+        worker = threading.Thread(target=generate)
+        worker.start()
+        chunks = []
+        while (chunk := await asyncio.wait_for(queue.get(), timeout=30)) is not None:
+            chunks.append(chunk)
+        worker.join()
+        return chunks, outputs["ids"]
+
+    chunks, ids = asyncio.run(scenario())
+
+    # Prompt skipped, every new token delivered in order, then the end marker.
+    assert "".join(chunks) == _WordTokenizer().decode(ids[0, PROMPT.shape[1]:])
+    assert len(chunks) > 1
+
+
+def test_cancel_stops_generate_within_one_token():
+    model = _tiny_qwen()
+    cancel = threading.Event()
+
+    class _CancelAfter:
+        """Sets the cancel event as the Nth new token is streamed."""
+
+        def __init__(self, tokens):
+            self.tokens = tokens
+            self.puts = 0
+
+        def put(self, value):
+            self.puts += 1  # the first put is the prompt
+            if self.puts - 1 == self.tokens:
+                cancel.set()
+
+        def end(self):
+            pass
+
+    streamer = _CancelAfter(3)
+    ids = model.generate(
+        PROMPT,
+        max_new_tokens=40,
+        do_sample=False,
+        streamer=streamer,
+        stopping_criteria=transformers.StoppingCriteriaList([CancelGenerationCriteria(cancel)]),
+    )
+
+    assert 3 <= ids.shape[1] - PROMPT.shape[1] <= 3 + 1
+    assert not CancelGenerationCriteria(threading.Event())(ids, None).any()
@@ -0,0 +1,82 @@
+import json
+import random
+
+import numpy as np
+import pytest
+from saletech.models.schemas import SessionMetrics
+from saletech.utils.histogram import LatencyHistogram
+
+
+def _lognormal_samples(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(3.0, 0.8) for _ in range(n)]
+
+
+def test_percentiles_track_exact_values():
+    samples = _lognormal_samples(20000)
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(value)
+
+    exact = np.percentile(samples, [50, 95, 99], method="higher")
+    approx = histogram.percentiles((50, 95, 99))
+
+    for true_value, estimate in zip(exact, approx):
+        assert estimate == pytest.approx(true_value, rel=0.02)
+
+    assert histogram.count == len(samples)
+    assert histogram.min == min(samples)
+    assert histogram.max == max(samples)
+
+
+def test_memory_is_fixed_and_out_of_range_values_clamp():
+    histogram = LatencyHistogram()
+    for value in (0.0, 1e-6, 5.0, 1e9):
+        histogram.record(value)
+
+    assert len(histogram._counts) == LatencyHistogram.NUM_BUCKETS
+    assert histogram.percentile(100) == 1e9
+    assert histogram.percentile(0) == 0.0
+
+
+def test_merged_snapshots_equal_single_histogram():
+    samples = _lognormal_samples(5000)
+    whole = LatencyHistogram()
+    parts = [LatencyHistogram(), LatencyHistogram()]
+    for i, value in enumerate(samples):
+        whole.record(value)
+        parts[i % 2].record(value)
+
+    # Ship one part as JSON, as a worker would.
+    shipped = LatencyHistogram.from_dict(json.loads(json.dumps(parts[1].to_dict())))
+    merged = parts[0].snapshot().merge(shipped)
+
+    assert merged.summary() == pytest.approx(whole.summary())
+
+
+def test_session_metrics_percentiles_and_serialization():
+    metrics = SessionMetrics(session_id="s1")
+    assert metrics.get_latency_p95("vad") is None
+
+    for value in range(1, 101):
+        metrics.vad_latencies_ms.record(float(value))
+
+    assert metrics.get_latency_p95("vad") == pytest.approx(95.0, rel=0.02)
+    dumped = metrics.model_dump()
+    assert dumped["vad_latencies_ms"]["count"] == 100
+    json.dumps(metrics.model_dump(mode="json"))
+
+
+def test_since_gives_windowed_percentiles():
+    histogram = LatencyHistogram()
+    for _ in range(1000):
+        histogram.record(5.0)
+    earlier = histogram.snapshot()
+    for _ in range(100):
+        histogram.record(400.0)
+
+    window = histogram.since(earlier)
+
+    assert window.count == 100
+    assert window.percentile(50) == pytest.approx(400.0, rel=0.02)
+    assert histogram.percentile(50) == pytest.approx(5.0, rel=0.02)
@@ -0,0 +1,52 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Loaded by the model registry on startup, never at import time.
+HEAVY_MODULES = ("torch", "transformers", "faster_whisper", "ctranslate2", "webrtcvad")
+
+# Generous: FastAPI + pydantic alone is ~0.5s on a cold CI runner.
+IMPORT_BUDGET_SECONDS = 3.0
+
+
+def _import_app(log_dir):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(ROOT / "src"), str(ROOT)])
+    env["SALETECH_LOG_DIR"] = str(log_dir)
+
+    code = (
+        "import sys, saletech.main; "
+        f"print('loaded=' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_app_import_does_not_load_ml_stack(tmp_path):
+    result = _import_app(tmp_path)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    loaded = result.stdout.strip().splitlines()[-1]
+    assert loaded == "loaded=", f"heavy modules imported eagerly: {loaded}"
+
+
+def test_app_import_within_budget(tmp_path):
+    result = _import_app(tmp_path)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    match = re.search(r"\|\s+(\d+)\s+\|\s+saletech\.main$", result.stderr, re.MULTILINE)
+    assert match, "saletech.main missing from -X importtime output"
+
+    cumulative_seconds = int(match.group(1)) / 1e6
+    assert cumulative_seconds < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from saletech.services.llm_quantization import (
+    Int4WeightOnlyLinear,
+    model_memory_bytes,
+    parse_cpu_list,
+    quantize_model,
+)
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list("0-3,8, 10-11") == {0, 1, 2, 3, 8, 10, 11}
+
+
+# 32 output features run on the packed int4 kernel where torch has it; 24
+# (not a multiple of 16) always take the dequantizing path.
+@pytest.mark.parametrize("out_features", [32, 24])
+def test_int4_linear_matches_float_linear(out_features):
+    torch.manual_seed(0)
+    linear = torch.nn.Linear(128, out_features)
+    q = Int4WeightOnlyLinear(linear, group_size=64)
+
+    x = torch.randn(4, 128)
+    expected = linear(x)
+    relative_error = (q(x) - expected).norm() / expected.norm()
+
+    assert relative_error < 0.1
+    assert q.packed_weight.numel() == out_features * 128 // 2
+    assert (q.dequantize() - linear.weight).norm() / linear.weight.norm() < 0.1
+
+
+@pytest.mark.parametrize("mode", ["int8_dynamic", "int4_weight_only"])
+def test_quantize_model_shrinks_weights(mode):
+    model = torch.nn.Sequential(torch.nn.Linear(256, 256), torch.nn.ReLU(), torch.nn.Linear(256, 64))
+    float_bytes = model_memory_bytes(model)
+
+    quantized = quantize_model(model, mode)
+
+    assert quantized(torch.randn(2, 256)).shape == (2, 64)
+    assert model_memory_bytes(quantized) < float_bytes / 2
+
+
+def test_int4_keeps_lm_head_and_tied_weights_in_float():
+    class TinyLM(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.embed = torch.nn.Embedding(64, 128)
+            self.proj = torch.nn.Linear(128, 128)
+            self.tied_out = torch.nn.Linear(128, 64, bias=False)
+            self.tied_out.weight = self.embed.weight
+            self.lm_head = torch.nn.Linear(128, 64)
+
+    model = quantize_model(TinyLM(), "int4_weight_only")
+
+    assert isinstance(model.proj, Int4WeightOnlyLinear)
+    assert type(model.tied_out) is torch.nn.Linear
+    assert model.tied_out.weight is model.embed.weight
+    assert type(model.lm_head) is torch.nn.Linear
+
+
+def test_int4_decode_step_is_not_slower_than_float():
+    linear = torch.nn.Linear(2048, 2048)
+    q = Int4WeightOnlyLinear(linear)
+    if not q.uses_kernel:
+        pytest.skip("torch has no packed int4 CPU kernel")
+    x = torch.randn(1, 2048)
+
+    def best_of(layer, runs=20):
+        best = float("inf")
+        for _ in range(runs):
+            start = time.perf_counter()
+            layer(x)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    with torch.no_grad():
+        best_of(linear), best_of(q)  # warm up
+        # Margin for timer noise on shared CI machines; the kernel is usually
+        # about 2x faster than the float matmul at this size.
+        assert best_of(q) < 1.5 * best_of(linear)
@@ -0,0 +1,104 @@
+from saletech.models.schemas import ConversationMessage, MessageRole
+from saletech.services.llm import LLMWithKVCache
+from saletech.services.response_cache import ResponseCache
+
+
+class _CharTokenizer:
+    """One token per character, so token counts are easy to reason about."""
+
+    def encode(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, ids, skip_special_tokens=False):
+        return "".join(chr(i) for i in ids)
+
+
+class _CroppableCache:
+    def __init__(self, length):
+        self.length = length
+
+    def crop(self, length):
+        self.length = length
+
+
+def _service_after_reply(prompt, reply):
+    service = LLMWithKVCache()
+    service.tokenizer = _CharTokenizer()
+    ids = service.tokenizer.encode(prompt + reply)
+    service._session_input_ids["s"] = ids
+    service._session_reply_starts["s"] = len(prompt)
+    service._session_caches["s"] = _CroppableCache(len(ids))
+    service._session_messages["s"] = [
+        {"role": "user", "content": prompt},
+        {"role": "assistant", "content": reply},
+    ]
+    return service
+
+
+def test_truncation_keeps_heard_sentences_across_paragraph_breaks():
+    reply = "Hello!\n\nHow are you?  We have a demo slot on Thursday."
+
+    service = _service_after_reply("Hi", reply)
+    # What the session says was spoken: stripped sentence chunks joined by spaces.
+    assert service.truncate_session_cache("s", "Hello! How are you? We have a demo slot on Thursday.") == 0
+    assert service._session_caches["s"].length == len("Hi" + reply)
+
+    service = _service_after_reply("Hi", reply)
+    dropped = service.truncate_session_cache("s", "Hello! How are you?")
+    kept = len("Hi" + "Hello!\n\nHow are you?  ")
+    assert dropped == len("Hi" + reply) - kept
+    assert service._session_caches["s"].length == kept
+    assert service._session_messages["s"][-1]["content"] == "Hello!\n\nHow are you?  "
+
+
+def test_response_cache_never_crosses_customer_names():
+    service = LLMWithKVCache()
+    service.response_cache = ResponseCache()
+    history = [ConversationMessage(role=MessageRole.USER, content="What's the price?")]
+
+    named = service._response_cache_key(history, None, "Priya Shah")
+    anonymous = service._response_cache_key(history, None)
+    assert named != anonymous
+
+    # A reply using part of the name is personal and is not cached at all.
+    service._store_cached_response(named, "Sure Priya, it is 499 a month.", "Priya Shah", 1.0)
+    assert service.response_cache.lookup(*named) is None
+
+    service._store_cached_response(named, "It is 499 a month.", "Priya Shah", 1.0)
+    assert service.response_cache.lookup(*service._response_cache_key(history, None, "Sam")) == "It is 499 a month."
+    # Generated with a name in the prompt, so an anonymous caller never gets it.
+    assert service.response_cache.lookup(*anonymous) is None
+
+
+class _CharEncoder:
+    """Append-only template: every message encodes on its own."""
+
+    incremental = True
+    generation_prompt_ids = [0]
+
+    def encode_message(self, message):
+        return [ord(c) for c in message["content"]]
+
+    def encode_full(self, messages):
+        return [i for m in messages for i in self.encode_message(m)] + self.generation_prompt_ids
+
+    def close_assistant(self, token_ids):
+        return []
+
+
+def test_multi_line_reply_keeps_the_cache_for_the_next_turn():
+    reply = "Two plans:\n\n- Basic, 499 a month.\n- Team,  1299 a month."
+    service = _service_after_reply("Prices?", reply)
+    service._encoder = _CharEncoder()
+    cached = len(service._session_input_ids["s"])
+
+    # The session hands back the reply as the sentence chunks it spoke.
+    history = [
+        {"role": "user", "content": "Prices?"},
+        {"role": "assistant", "content": " ".join(reply.split())},
+        {"role": "user", "content": "Any discount?"},
+    ]
+    prompt_ids, reused = service._encode_prompt("s", history)
+
+    assert reused == cached
+    assert prompt_ids[cached:] == service._encoder.encode_message(history[-1]) + [0]
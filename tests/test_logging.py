@@ -0,0 +1,48 @@
+import json
+import logging
+
+import structlog
+
+from saletech.utils.logger import setup_logging, shutdown_logging
+
+
+def _records(log_dir):
+    (log_file,) = log_dir.glob("app_*.log")
+    return [json.loads(line) for line in log_file.read_text().splitlines()]
+
+
+def test_queue_mode_batches_samples_and_skips_hot_callsites(tmp_path):
+    setup_logging(
+        log_dir=str(tmp_path),
+        mode="queue",
+        hot_loggers=["saletech.audio"],
+        sample_rates={"frame_dropped": 10},
+    )
+    try:
+        frame = structlog.get_logger("saletech.audio.frame_buffer")
+        for i in range(25):
+            frame.warning("frame_dropped", index=i)
+
+        cold = structlog.get_logger("saletech.lifespan")
+        cold.debug("below_level")
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            cold.exception("cold_failure")
+        logging.getLogger("uvicorn.error").info("started %s", "server")
+    finally:
+        shutdown_logging()
+
+    records = _records(tmp_path)
+    events = [r["event"] for r in records]
+
+    dropped = [r for r in records if r["event"] == "frame_dropped"]
+    assert [r["index"] for r in dropped] == [0, 10, 20]
+    assert all(r["sample_rate"] == 10 and "lineno" not in r for r in dropped)
+
+    failure = next(r for r in records if r["event"] == "cold_failure")
+    assert failure["func_name"] == "test_queue_mode_batches_samples_and_skips_hot_callsites"
+    assert "ZeroDivisionError" in failure["exception"]
+
+    assert "below_level" not in events
+    assert "started server" in events
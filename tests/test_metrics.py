@@ -0,0 +1,157 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from saletech.api.metrics import router
+from saletech.utils.histogram import LatencyHistogram
+from saletech.utils.loop_monitor import LoopLagMonitor
+from saletech.utils.metrics import MetricsRegistry, REGISTRY, counter, gauge, histogram
+
+
+def _samples(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = value
+    return samples
+
+
+def test_render_text_exposition():
+    latency = LatencyHistogram()
+    for value in (0.5, 3.0, 3.0, 40.0, 20000.0):
+        latency.record(value)
+
+    registry = MetricsRegistry()
+    registry.register("test", lambda: [
+        gauge("t_queue_depth", "Queue depth.", 3),
+        counter("t_frames_total", "Frames.", 10, {"kind": 'a"b'}),
+        histogram("t_latency_seconds", "Latency.", latency, {"stage": "asr"}),
+    ])
+
+    text = registry.render()
+    assert "# TYPE t_latency_seconds histogram" in text
+
+    samples = _samples(text)
+    assert samples["t_queue_depth"] == "3"
+    assert samples['t_frames_total{kind="a\\"b"}'] == "10"
+    assert samples['t_latency_seconds_bucket{stage="asr",le="0.001"}'] == "1"
+    assert samples['t_latency_seconds_bucket{stage="asr",le="0.005"}'] == "3"
+    assert samples['t_latency_seconds_bucket{stage="asr",le="0.05"}'] == "4"
+    assert samples['t_latency_seconds_bucket{stage="asr",le="10.0"}'] == "4"
+    assert samples['t_latency_seconds_bucket{stage="asr",le="+Inf"}'] == "5"
+    assert samples['t_latency_seconds_count{stage="asr"}'] == "5"
+    assert float(samples['t_latency_seconds_sum{stage="asr"}']) == latency.total / 1000
+
+
+def test_failing_collector_does_not_break_scrape():
+    registry = MetricsRegistry()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.register("broken", broken)
+    registry.register("ok", lambda: [gauge("t_ok", "Fine.", 1)])
+
+    assert _samples(registry.render()) == {"t_ok": "1"}
+
+
+def _blocking_call():
+    time.sleep(0.08)
+
+
+def test_loop_monitor_samples_stalled_callback():
+    async def scenario():
+        monitor = LoopLagMonitor(interval_ms=5, stall_threshold_ms=20, sample_interval_ms=2)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        _blocking_call()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(scenario())
+
+    assert monitor.lag_ms.count >= 2
+    assert monitor.stalls == 1
+    assert monitor.stall_ms.max >= 60
+
+    stall = monitor.last_stall
+    assert stall["samples"] > 5
+    assert stall["hot_frame"].endswith("_blocking_call")
+    assert "scenario" in stall["task"]
+
+
+def test_metrics_endpoint_serves_registry():
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert response.text == REGISTRY.render()
+
+
+def test_ingress_buffer_metrics_count_attempts_and_drops():
+    from saletech.media.buffer.frame_chunking import AudioIngressBuffer
+
+    async def scenario():
+        buffer = AudioIngressBuffer(max_size=2)
+        for _ in range(3):
+            buffer.put_nowait(b"\x00\x01" * 160)
+        await asyncio.sleep(0)  # frames are enqueued via call_soon_threadsafe
+        return buffer.metrics
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["frames_attempted"] == 3
+    assert metrics["frames_dropped"] == 1
+    assert metrics["drop_rate"] == 1 / 3
+    assert metrics["queue_size"] == 2
+
+
+class _AlwaysSpeech:
+    def detect_speech(self, audio, background_noise):
+        return True, 0.9, {"energy": 0.1}
+
+
+def test_asr_histograms_move_after_a_websocket_utterance(tmp_path, monkeypatch, fake_whisper):
+    import numpy as np
+
+    import saletech.services.streaming_asr as streaming_asr
+    from config.settings import settings
+    from saletech.api.transcriber import router as transcriber_router
+    from saletech.media.framing import AudioFrame, encode_message
+    from saletech.services.vad_adv_service import VADService
+
+    monkeypatch.chdir(tmp_path)
+    asr = streaming_asr.StreamingASR()
+    asr.model = fake_whisper
+    asr._initialized = True
+    monkeypatch.setattr(streaming_asr, "_asr_instance", asr)
+    monkeypatch.setattr(VADService, "_vad_model", _AlwaysSpeech())
+
+    app = FastAPI()
+    app.include_router(router)
+    app.include_router(transcriber_router)
+    client = TestClient(app)
+
+    def decoded():
+        samples = _samples(client.get("/metrics").text)
+        return int(samples.get("saletech_asr_decode_seconds_count", 0))
+
+    before = decoded()
+    samples = settings.chunk_size_samples
+    payload = np.full(samples, 3000, dtype=np.int16).tobytes()
+    frames = [AudioFrame(seq, 1_700_000_000.0 + seq * 0.02, samples, "pcm16", payload) for seq in range(40)]
+    with client.websocket_connect("/ws/transcribe") as ws:
+        ws.send_json({"type": "hello", "version": 1, "codecs": ["pcm16"], "sample_rates": [16000]})
+        ws.receive_json()
+        for frame in frames:
+            ws.send_bytes(encode_message([frame]))
+    # Closing flushes the buffered speech as one utterance through the ASR.
+
+    assert decoded() == before + 1
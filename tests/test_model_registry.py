@@ -0,0 +1,127 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from saletech.services.model_registry import ModelRegistry
+
+
+class _FakeModel:
+    def __init__(self):
+        self.timings = {"load_ms": 1.0, "warmup_ms": 2.0}
+
+
+@pytest.mark.asyncio
+async def test_models_load_concurrently_and_report_timings():
+    registry = ModelRegistry()
+
+    async def slow_loader():
+        await asyncio.sleep(0.1)
+        return _FakeModel()
+
+    registry.register("vad", slow_loader)
+    registry.register("asr", slow_loader)
+
+    assert not registry.ready
+    start = time.time()
+    await registry.load_all()
+
+    assert time.time() - start < 0.18
+    assert registry.ready
+    snapshot = registry.snapshot()
+    assert snapshot["models"]["asr"]["timings"]["warmup_ms"] == 2.0
+    assert isinstance(registry.get("vad"), _FakeModel)
+
+
+@pytest.mark.asyncio
+async def test_required_model_failure_blocks_readiness():
+    registry = ModelRegistry()
+
+    async def broken_loader():
+        raise RuntimeError("no weights")
+
+    async def ok_loader():
+        return _FakeModel()
+
+    registry.register("llm", broken_loader)
+    registry.register("vad", ok_loader)
+    await registry.load_all()
+
+    assert not registry.ready
+    assert registry.snapshot()["models"]["llm"]["status"] == "failed"
+    assert registry.get("llm") is None
+
+
+@pytest.mark.asyncio
+async def test_fork_hooks_reach_loaded_models():
+    registry = ModelRegistry()
+
+    class _ForkAwareModel:
+        def __init__(self):
+            self.calls = []
+
+        def prepare_for_fork(self):
+            self.calls.append("prepare")
+
+        def after_fork(self):
+            self.calls.append("after")
+
+    async def loader():
+        return _ForkAwareModel()
+
+    async def plain_loader():
+        return _FakeModel()
+
+    registry.register("llm", loader)
+    registry.register("vad", plain_loader)
+    await registry.load_all()
+
+    registry.prepare_for_fork()
+    registry.after_fork()
+
+    assert registry.get("llm").calls == ["prepare", "after"]
+
+
+@pytest.mark.asyncio
+async def test_transcription_pipeline_reuses_preloaded_models(tmp_path, monkeypatch, preloaded_models):
+    from saletech.transcriber.pipeline import TranscriptionPipeline
+    from saletech.utils.lifespan import build_model_registry
+
+    monkeypatch.chdir(tmp_path)
+    registry = build_model_registry()
+    await registry.load_all()
+
+    pipeline = TranscriptionPipeline(session_id="registry-session")
+    await pipeline.initialize()
+
+    assert pipeline.asr_service is registry.get("asr")
+    assert pipeline.vad_service._vad_model is registry.get("vad")
+    await pipeline.shutdown()
+
+
+def test_shutdown_waits_for_cancelled_loads_before_cleanup(monkeypatch):
+    import saletech.utils.lifespan as lifespan_module
+
+    events = []
+
+    class _SlowRegistry:
+        async def load_all(self):
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                await asyncio.sleep(0.01)  # a loader unwinding
+                events.append("load_cancelled")
+                raise
+
+        async def cleanup(self):
+            events.append("cleanup")
+
+    monkeypatch.setattr(lifespan_module, "build_model_registry", _SlowRegistry)
+
+    async def scenario():
+        async with lifespan_module.lifespan(SimpleNamespace(state=SimpleNamespace())):
+            await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert events == ["load_cancelled", "cleanup"]
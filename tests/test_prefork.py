@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+from saletech.utils.prefork import memory_report
+
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or not os.path.exists("/proc/self/smaps_rollup"),
+    reason="memory report reads /proc/<pid>/smaps_rollup",
+)
+
+
+def test_forked_worker_reports_parent_pages_as_shared():
+    weights = bytearray(b"\x01" * (32 * 1024 * 1024))  # resident, like loaded weights
+
+    ready_r, ready_w = os.pipe()
+    release_r, release_w = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        os.write(ready_w, b"x")
+        os.read(release_r, 1)
+        os._exit(0)
+
+    try:
+        os.read(ready_r, 1)
+        report = memory_report([pid], parent_pid=os.getpid())
+    finally:
+        os.write(release_w, b"x")
+        os.waitpid(pid, 0)
+
+    worker = report["workers"][pid]
+    assert worker["shared_bytes"] >= len(weights)
+    assert worker["private_bytes"] < len(weights)
+    assert worker["pss_bytes"] < worker["rss_bytes"]
+    assert report["shared_savings_bytes"] >= len(weights)
+
+
+def test_exited_workers_are_skipped():
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    report = memory_report([pid])
+    assert report["workers"] == {}
+    assert report["parent"] is None
+
+
+def test_forked_worker_transcribes_with_the_parents_models(tmp_path, monkeypatch, preloaded_models):
+    import asyncio
+
+    from saletech.transcriber.pipeline import TranscriptionPipeline
+    from saletech.utils.lifespan import build_model_registry
+
+    monkeypatch.chdir(tmp_path)
+
+    registry = build_model_registry()
+    asyncio.run(registry.load_all())
+    registry.prepare_for_fork()
+
+    result_r, result_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            registry.after_fork()
+            pipeline = TranscriptionPipeline(session_id="forked-session")
+            asyncio.run(pipeline.initialize())
+            shared = (
+                pipeline.asr_service is registry.get("asr")
+                and pipeline.asr_service.forked
+                and pipeline.vad_service._vad_model is registry.get("vad")
+            )
+            os.write(result_w, b"1" if shared else b"0")
+        finally:
+            os._exit(0)
+
+    os.waitpid(pid, 0)
+    assert os.read(result_r, 1) == b"1"
@@ -0,0 +1,50 @@
+from saletech.services.response_cache import ResponseCache
+
+
+def test_exact_and_approximate_hits():
+    cache = ResponseCache(similarity_threshold=0.8)
+    ctx = ResponseCache.context_key("product", [])
+    cache.store("What's the price?", ctx, "It is 499 a month.", generation_seconds=1.5, now=0.0)
+
+    assert cache.lookup("what's the price", ctx, now=1.0) == "It is 499 a month."
+    assert cache.lookup("um, what is the price?", ctx, now=1.0) == "It is 499 a month."
+    assert cache.lookup("do you have a demo", ctx, now=1.0) is None
+
+    metrics = cache.metrics
+    assert metrics["hits"] == 2
+    assert metrics["misses"] == 1
+    assert metrics["saved_gpu_seconds"] == 3.0
+
+
+def test_context_scoping_ttl_and_lru():
+    cache = ResponseCache(max_entries=2, ttl_seconds=10.0)
+    ctx_a = ResponseCache.context_key("product a", [])
+    ctx_b = ResponseCache.context_key("product b", [])
+
+    cache.store("price", ctx_a, "A price", generation_seconds=1.0, now=0.0)
+    assert cache.lookup("price", ctx_b, now=1.0) is None
+    assert cache.lookup("price", ctx_a, now=11.0) is None
+
+    cache.store("price", ctx_a, "A price", generation_seconds=1.0, now=20.0)
+    cache.store("demo", ctx_a, "Sure", generation_seconds=1.0, now=20.0)
+    cache.lookup("price", ctx_a, now=21.0)
+    cache.store("refund", ctx_a, "30 days", generation_seconds=1.0, now=21.0)
+
+    assert cache.lookup("demo", ctx_a, now=22.0) is None
+    assert cache.lookup("price", ctx_a, now=22.0) == "A price"
+
+
+def test_near_miss_questions_are_not_served_from_cache():
+    cache = ResponseCache()  # default threshold
+    ctx = ResponseCache.context_key("product", [])
+    cache.store("What is the price of the basic plan", ctx, "Basic is 499 a month.", generation_seconds=1.0, now=0.0)
+    cache.store("Can I cancel my subscription", ctx, "Yes, any time.", generation_seconds=1.0, now=0.0)
+
+    assert cache.lookup("what is the price of the premium plan", ctx, now=1.0) is None
+    assert cache.lookup("can I not cancel my subscription", ctx, now=1.0) is None
+    assert cache.lookup("can't I cancel my subscription", ctx, now=1.0) is None
+    assert cache.lookup("what is the price of the basic plan for 5 seats", ctx, now=1.0) is None
+
+    # Paraphrases with the same key terms still hit.
+    assert cache.lookup("what's the price of the basic plan?", ctx, now=1.0) == "Basic is 499 a month."
+    assert cache.lookup("um, can I cancel my subscription", ctx, now=1.0) == "Yes, any time."
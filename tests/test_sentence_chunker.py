@@ -0,0 +1,47 @@
+from saletech.services.sentence_chunker import SentenceChunker
+
+
+def _stream(chunker, text, step=3):
+    chunks = []
+    for i in range(0, len(text), step):
+        chunks.extend(chunker.push(text[i:i + step]))
+    tail = chunker.flush()
+    if tail:
+        chunks.append(tail)
+    return chunks
+
+
+def test_splits_sentences_from_token_stream():
+    chunks = _stream(SentenceChunker(), "Hi there! Our plan costs Rs. 499 per month. Want a demo?")
+    assert chunks == ["Hi there!", "Our plan costs Rs. 499 per month.", "Want a demo?"]
+
+
+def test_numbers_and_abbreviations_are_not_boundaries():
+    chunks = _stream(
+        SentenceChunker(),
+        "Version 2.5 is live, e.g. for Dr. Mehta's team at 1,00,000 seats. Done.",
+    )
+    assert chunks == [
+        "Version 2.5 is live, e.g. for Dr. Mehta's team at 1,00,000 seats.",
+        "Done.",
+    ]
+
+
+def test_hinglish_danda_and_clause_split():
+    chunker = SentenceChunker(min_clause_chars=10)
+    chunks = _stream(chunker, "Haan bilkul, demo abhi book kar sakte hain। Kal chalega?")
+    assert chunks == ["Haan bilkul,", "demo abhi book kar sakte hain।", "Kal chalega?"]
+
+
+def test_waits_for_lookahead_before_emitting():
+    chunker = SentenceChunker()
+    assert chunker.push("It costs 3.") == []
+    assert chunker.push("5 lakh. ") == ["It costs 3.5 lakh."]
+
+
+def test_max_chars_fallback_cuts_at_space():
+    chunker = SentenceChunker(max_chars=20)
+    chunks = chunker.push("this reply has no punctuation at all and keeps going")
+    assert chunks
+    assert all(len(c) <= 20 for c in chunks)
+    assert " ".join(chunks + [chunker.flush()]) == "this reply has no punctuation at all and keeps going"
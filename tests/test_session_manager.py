@@ -0,0 +1,197 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from saletech.core.session_manager import SessionManager
+from saletech.core.session_reaper import SessionReaper
+from saletech.media.buffer.frame_chunking import AudioIngressBuffer
+from saletech.models.schemas import SessionState
+from saletech.utils.errors import SessionRejectedError
+
+
+def test_sessions_spread_over_shards_and_respect_limit():
+    async def scenario():
+        manager = SessionManager(shards=4, max_sessions=40)
+        sessions = [await manager.create_session() for _ in range(40)]
+        with pytest.raises(SessionRejectedError) as rejected:
+            await manager.create_session()
+        assert rejected.value.retry_after > 0
+
+        assert len(manager) == 40
+        assert sum(1 for shard in manager._shards if shard.sessions) > 1
+        assert await manager.get_session(sessions[7].session_id) is sessions[7]
+
+        await manager.close_session(sessions[7].session_id)
+        assert await manager.get_session(sessions[7].session_id) is None
+        assert sessions[7].state == SessionState.TERMINATED
+        assert len(manager) == 39
+
+    asyncio.run(scenario())
+
+
+def test_cleanup_expires_only_idle_sessions():
+    async def scenario():
+        manager = SessionManager(shards=4, max_sessions=100)
+        sessions = [await manager.create_session() for _ in range(10)]
+        start = time.monotonic()
+
+        # Touched sessions have stale heap entries; they must survive.
+        for session in sessions[:7]:
+            await manager.update_state(session.session_id, SessionState.LISTENING)
+            manager._last_active[session.session_id] = start + 50
+
+        expired = await manager.cleanup_inactive_sessions(timeout_seconds=30, now=start + 60)
+
+        assert sorted(expired) == sorted(s.session_id for s in sessions[7:])
+        assert len(manager) == 7
+        # Survivors were re-queued at their real last activity.
+        assert await manager.cleanup_inactive_sessions(timeout_seconds=30, now=start + 60) == {}
+        assert len(await manager.cleanup_inactive_sessions(timeout_seconds=30, now=start + 81)) == 7
+
+    asyncio.run(scenario())
+
+
+class _Pipeline:
+    def __init__(self):
+        self.shut_down = False
+
+    async def shutdown(self):
+        self.shut_down = True
+        return {"buffer_bytes": 3200, "writers_closed": 1}
+
+
+def test_reaper_releases_expired_session_resources():
+    async def scenario():
+        manager = SessionManager(shards=2, max_sessions=10)
+        idle = await manager.create_session()
+        idle.pipeline = pipeline = _Pipeline()
+        busy = await manager.create_session()
+        reaper = SessionReaper(manager, interval_seconds=60, timeout_seconds=30)
+
+        manager._last_active[busy.session_id] += 100
+        report = await reaper.sweep(now=time.monotonic() + 60)
+
+        assert pipeline.shut_down and idle.pipeline is None
+        assert report["sessions"] == 1
+        assert report["buffer_bytes"] == 3200
+        assert report["writers_closed"] == 1
+        assert reaper.bytes_reclaimed == 3200 and reaper.handles_closed == 1
+        assert await manager.get_session(busy.session_id) is busy
+
+    asyncio.run(scenario())
+
+
+class _SilentVAD:
+    def detect_speech(self, audio):
+        return False, 0.0, False, {}
+
+
+def test_session_audio_keeps_it_from_expiring():
+    async def scenario():
+        manager = SessionManager(shards=2, max_sessions=10)
+        session = await manager.create_session()
+        session._vad_service, session._asr_service, session._llm_service = _SilentVAD(), object(), object()
+        ingress = AudioIngressBuffer()
+        await session.start(ingress)
+        start = time.monotonic()
+
+        manager._last_active[session.session_id] = start - 60
+        ingress.put_nowait(np.zeros(320, dtype=np.int16).tobytes())
+        await asyncio.sleep(0.05)
+
+        assert await manager.cleanup_inactive_sessions(timeout_seconds=30, now=start) == {}
+        await session.stop()
+        await manager.close_session(session.session_id)
+
+    asyncio.run(scenario())
+
+
+def test_transcriber_stream_is_a_managed_session(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+
+    import saletech.core.admission as admission
+    import saletech.transcriber.pipeline as pipeline_module
+    from saletech.api.transcriber import WS_GOING_AWAY, router
+
+    pipelines = []
+
+    class _StreamPipeline(_Pipeline):
+        def __init__(self, session_id):
+            super().__init__()
+            self.frames = 0
+            pipelines.append(self)
+
+        async def initialize(self):
+            pass
+
+        async def process_frame(self, audio):
+            self.frames += 1
+
+        async def flush(self):
+            pass
+
+    monkeypatch.setattr(admission, "_controller", None)
+    monkeypatch.setattr(pipeline_module, "TranscriptionPipeline", _StreamPipeline)
+    manager = SessionManager(shards=2, max_sessions=10)
+    app = FastAPI()
+    app.include_router(router)
+    app.state.session_manager = manager
+
+    frame = np.zeros(512, dtype=np.int16).tobytes()
+    with TestClient(app) as client, client.websocket_connect("/ws/transcribe") as ws:
+        ws.send_bytes(frame)
+        deadline = time.monotonic() + 5
+        while not (pipelines and pipelines[0].frames) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(manager) == 1
+        (session,) = [session for shard in manager._shards for session in shard.sessions.values()]
+        assert session.pipeline is pipelines[0]
+
+        # Each message marks the session active.
+        manager._last_active[session.session_id] = 0.0
+        ws.send_bytes(frame)
+        while pipelines[0].frames < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert manager._last_active[session.session_id] > 0.0
+
+        # A silent stream is reaped like any session, and the socket closed.
+        client.portal.call(manager.cleanup_inactive_sessions, 30, time.monotonic() + 60)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_bytes()
+
+    assert closed.value.code == WS_GOING_AWAY
+    assert pipelines[0].shut_down
+    assert len(manager) == 0
+
+
+def test_transcriber_stream_gives_its_session_back_when_the_pipeline_fails(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    import saletech.core.admission as admission
+    import saletech.transcriber.pipeline as pipeline_module
+    from saletech.api.transcriber import router
+
+    class _BrokenPipeline(_Pipeline):
+        def __init__(self, session_id):
+            super().__init__()
+
+        async def initialize(self):
+            raise RuntimeError("model failed to load")
+
+    monkeypatch.setattr(admission, "_controller", None)
+    monkeypatch.setattr(pipeline_module, "TranscriptionPipeline", _BrokenPipeline)
+    manager = SessionManager(shards=2, max_sessions=10)
+    app = FastAPI()
+    app.include_router(router)
+    app.state.session_manager = manager
+
+    with pytest.raises(RuntimeError, match="model failed to load"):
+        with TestClient(app).websocket_connect("/ws/transcribe") as ws:
+            ws.receive_json()
+
+    assert len(manager) == 0
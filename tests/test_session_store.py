@@ -0,0 +1,152 @@
+import asyncio
+
+from saletech.core.session_manager import SessionManager
+from saletech.core.session_store import RedisSessionStore
+from saletech.models.schemas import ConversationMessage, MessageRole, SessionState
+
+
+class FakeRedis:
+    """In-process stand-in for the redis.asyncio commands the store uses."""
+
+    def __init__(self, data=None):
+        self.data = {} if data is None else data  # share it to simulate a restart
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def hget(self, key, field):
+        self.round_trips += 1
+        return self.data.get(key, {}).get(field)
+
+    async def hgetall(self, key):
+        self.round_trips += 1
+        return dict(self.data.get(key, {}))
+
+    async def lrange(self, key, start, end):
+        self.round_trips += 1
+        return list(self.data.get(key, []))[start:None if end == -1 else end + 1]
+
+    async def delete(self, *keys):
+        self.round_trips += 1
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def aclose(self):
+        pass
+
+    def _hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    def _hincrby(self, key, field, amount):
+        fields = self.data.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + amount)
+        return int(fields[field])
+
+    def _expire(self, key, seconds):
+        return key in self.data
+
+    def _rpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        items.extend(values)
+        return len(items)
+
+    def _ltrim(self, key, start, end):
+        items = self.data.get(key, [])
+        items[:] = items[start:None if end == -1 else end + 1]
+        return True
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [getattr(self.redis, "_" + name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+def test_session_resumes_after_worker_restart_without_per_frame_round_trips():
+    data = {}
+
+    async def first_worker():
+        redis = FakeRedis(data)
+        manager = SessionManager(store=RedisSessionStore(redis, history_limit=3))
+        session = await manager.create_session(metadata={"campaign": "q4"})
+        for _ in range(100):
+            await manager.update_state(session.session_id, SessionState.LISTENING)
+        for n in range(4):
+            await manager.add_message(
+                session.session_id, ConversationMessage(role=MessageRole.USER, content=f"turn {n}")
+            )
+        assert redis.round_trips == 1  # only the create
+
+        await manager.close_all_sessions()
+        assert redis.round_trips == 2  # one pipelined flush for all of it
+        return session.session_id
+
+    async def second_worker(session_id):
+        manager = SessionManager(store=RedisSessionStore(FakeRedis(data)))
+        return await manager.get_session(session_id)
+
+    session_id = asyncio.run(first_worker())
+    resumed = asyncio.run(second_worker(session_id))
+
+    assert resumed.state == SessionState.LISTENING
+    assert resumed.metadata == {"campaign": "q4"}
+    assert [m.content for m in resumed.conversation] == ["turn 1", "turn 2", "turn 3"]
+
+
+def test_cached_reads_are_revalidated_by_version():
+    data = {}
+    writer = RedisSessionStore(FakeRedis(data))
+    reader = RedisSessionStore(FakeRedis(data))
+
+    async def scenario():
+        await writer.save("s", {"state": "idle"})
+        assert (await reader.load("s"))["state"] == "idle"
+        assert (await reader.load("s"))["version"] == 1
+        assert (reader.cache_misses, reader.cache_hits) == (1, 1)
+
+        writer.touch("s", {"state": "speaking"})
+        assert (await reader.load("s"))["state"] == "idle"  # not flushed yet
+        await writer.flush()
+        record = await reader.load("s")
+        assert (record["state"], record["version"]) == ("speaking", 2)
+        assert reader.cache_misses == 2
+
+        await writer.delete("s")
+        assert await reader.load("s") is None
+
+    asyncio.run(scenario())
+
+
+def test_delete_during_a_flush_does_not_resurrect_the_session():
+    data = {}
+    redis = FakeRedis(data)
+    store = RedisSessionStore(redis)
+    in_flight = asyncio.Event()
+
+    class _SlowPipeline(_FakePipeline):
+        async def execute(self):
+            in_flight.set()
+            await asyncio.sleep(0.01)
+            return await super().execute()
+
+    redis.pipeline = lambda transaction=True: _SlowPipeline(redis)
+
+    async def scenario():
+        store.touch("s", {"state": "speaking"})
+        store.append_history("s", [ConversationMessage(role=MessageRole.USER, content="bye")])
+        flushing = asyncio.create_task(store.flush())
+        await in_flight.wait()
+        await store.delete("s")  # session closed while its writes are in flight
+        await flushing
+
+    asyncio.run(scenario())
+
+    assert data == {}
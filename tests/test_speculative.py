@@ -0,0 +1,59 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from saletech.services.speculative import SpeculativeDecoder
+
+
+def _tiny_qwen(seed, layers):
+    config = transformers.Qwen2Config(
+        vocab_size=128,
+        hidden_size=64,
+        intermediate_size=128,
+        num_hidden_layers=layers,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        max_position_embeddings=256,
+    )
+    torch.manual_seed(seed)
+    model = transformers.AutoModelForCausalLM.from_config(config).eval()
+    model.generation_config.eos_token_id = None
+    model.generation_config.pad_token_id = 0
+    return model
+
+
+def _noisy_copy(model, seed, scale):
+    """The same model with a perturbed output head: agrees with it often, not always."""
+    draft = _tiny_qwen(0, layers=model.config.num_hidden_layers)
+    draft.load_state_dict(model.state_dict())
+    torch.manual_seed(seed)
+    with torch.no_grad():
+        draft.lm_head.weight.add_(scale * torch.randn_like(draft.lm_head.weight))
+    return draft
+
+
+def test_greedy_speculative_matches_plain_generate_across_turns():
+    target = _tiny_qwen(0, layers=2)
+    draft = _noisy_copy(target, seed=2, scale=0.01)
+    decoder = SpeculativeDecoder(target, draft, num_draft_tokens=4, eos_token_ids=[])
+    prompt = torch.tensor([[5, 17, 42, 9, 77, 3]])
+
+    result = decoder.generate(prompt, max_new_tokens=24, temperature=0.0, top_p=1.0)
+    expected = target.generate(prompt, max_new_tokens=24, do_sample=False)
+
+    assert result.sequences.tolist() == expected.tolist()
+    # Drafts were both accepted and rejected, so both cache crops were exercised.
+    assert 0 < result.accepted_tokens < result.drafted_tokens
+
+    # Next turn on the cropped caches: still token for token the same.
+    follow_up = torch.cat([result.sequences, torch.tensor([[11, 64]])], dim=1)
+    second = decoder.generate(
+        follow_up,
+        max_new_tokens=16,
+        temperature=0.0,
+        top_p=1.0,
+        past_key_values=result.past_key_values,
+        draft_past_key_values=result.draft_past_key_values,
+    )
+    assert second.sequences.tolist() == target.generate(follow_up, max_new_tokens=16, do_sample=False).tolist()
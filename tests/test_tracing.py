@@ -0,0 +1,81 @@
+import asyncio
+
+import numpy as np
+import pytest
+from saletech.services.streaming_asr import StreamingASR
+from saletech.transcriber.pipeline import TranscriptionPipeline
+from saletech.utils.tracing import (
+    SessionTracer,
+    current_trace,
+    session_latency,
+    worker_latency,
+)
+
+
+class _ScriptedVAD:
+    """Speech for `speech_frames` frames, then one silent end-of-turn frame."""
+
+    def __init__(self, speech_frames: int):
+        self.remaining = speech_frames
+
+    def detect_speech(self, pcm):
+        if self.remaining > 0:
+            self.remaining -= 1
+            return True, 0.9, False, {}
+        return False, 0.1, True, {}
+
+
+@pytest.mark.asyncio
+async def test_trace_propagates_through_awaits_and_fills_metrics():
+    tracer = SessionTracer("trace-session")
+    trace = tracer.start_utterance()
+
+    async def service_call():
+        await asyncio.sleep(0)
+        current_trace().add("asr_decode", 12.0)
+
+    with trace.activate():
+        await service_call()
+    assert current_trace() is None
+
+    tracer.finish(trace)
+
+    assert tracer.metrics.total_utterances == 1
+    assert tracer.metrics.asr_latencies_ms.count == 1
+    assert tracer.metrics.get_latency_p95("asr") == pytest.approx(12.0, rel=0.02)
+    assert session_latency("trace-session")["recent"][0]["utterance_id"] == trace.utterance_id
+
+    tracer.close()
+    assert session_latency("trace-session") is None
+
+
+@pytest.mark.asyncio
+async def test_pipeline_records_every_stage_per_utterance(tmp_path, monkeypatch, fake_whisper):
+    monkeypatch.chdir(tmp_path)
+
+    asr = StreamingASR()
+    asr.model = fake_whisper
+    asr._initialized = True
+
+    pipeline = TranscriptionPipeline(session_id="pipeline-session")
+    pipeline.vad_service = _ScriptedVAD(speech_frames=15)
+    pipeline.asr_service = asr
+    pipeline._initialized = True
+
+    frame = np.full(320, 0.1, dtype=np.float32)
+    for _ in range(16):
+        await pipeline.process_frame(frame)
+
+    summary = session_latency("pipeline-session")
+    assert summary["utterances"] == 1
+
+    stages = summary["recent"][0]["stages_ms"]
+    for stage in ("vad", "speech", "finalize", "asr_queue", "asr_decode", "writer_enqueue", "eot_to_transcript"):
+        assert stage in stages
+        assert stages[stage] >= 0.0
+
+    assert pipeline.tracer.metrics.vad_latencies_ms.count == 16
+    assert worker_latency()["stages"]["asr_decode"]["count"] >= 1
+
+    await pipeline.shutdown()
+    assert session_latency("pipeline-session") is None
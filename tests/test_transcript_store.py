@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+
+from saletech.transcriber.store import SegmentStore, compact_segments
+from saletech.transcriber.writer import TranscriptIO, TranscriptWriter
+
+
+def _append(store, session_id, n, ts):
+    line = json.dumps({"session_id": session_id, "n": n, "timestamp": ts}) + "\n"
+    store.append(session_id, line.encode(), ts=ts)
+
+
+def _segments(root):
+    return sorted(f for f in os.listdir(root) if f.endswith(".jsonl"))
+
+
+def test_sessions_multiplexed_into_rolling_indexed_segments(tmp_path):
+    store = SegmentStore(str(tmp_path), max_bytes=400)
+    for n in range(30):
+        for session_id in ("a", "b", "c"):
+            _append(store, session_id, n, ts=1000.0 + n)
+
+    assert len(_segments(tmp_path)) > 3  # rolled, not one file per session
+    assert [r["n"] for r in store.read_session("b")] == list(range(30))
+    assert [r["n"] for r in store.read_session("a", start_ts=1010.0, end_ts=1012.0)] == [10, 11, 12]
+
+    store.close()
+    reopened = SegmentStore(str(tmp_path), max_bytes=400)
+    assert sorted(reopened.sessions()) == ["a", "b", "c"]
+    assert [r["n"] for r in reopened.read_session("c")] == list(range(30))
+
+
+def test_unsealed_segment_of_dead_writer_is_recovered(tmp_path):
+    # Active segment of a worker that crashed: no index, torn last line.
+    orphan = tmp_path / "seg-00000000000000000001-999999999.jsonl"
+    lines = [json.dumps({"session_id": "a", "n": n, "timestamp": 5.0 + n}) + "\n" for n in range(3)]
+    orphan.write_text("".join(lines) + '{"session_id": "a", "n"')
+
+    store = SegmentStore(str(tmp_path))
+
+    assert [r["n"] for r in store.read_session("a")] == [0, 1, 2]
+    assert (tmp_path / "seg-00000000000000000001-999999999.idx").exists()
+
+
+def test_orphan_with_a_reused_pid_is_recovered_but_a_live_writer_is_not(tmp_path):
+    # Crashed before a restart that gave this very process the same pid.
+    orphan = tmp_path / f"seg-00000000000000000001-{os.getpid()}.jsonl"
+    orphan.write_text(json.dumps({"session_id": "a", "n": 0, "timestamp": 5.0}) + "\n")
+    writer = SegmentStore(str(tmp_path))
+    _append(writer, "b", 0, ts=6.0)  # active segment, locked by `writer`
+
+    reader = SegmentStore(str(tmp_path))
+
+    assert [r["n"] for r in reader.read_session("a")] == [0]
+    assert reader.sessions() == ["a"]
+    assert not (tmp_path / (writer._active_name + ".idx")).exists()
+    writer.close()
+
+
+def test_unknown_session_lookups_do_not_rescan_the_directory(tmp_path, monkeypatch):
+    store = SegmentStore(str(tmp_path), refresh_interval_seconds=60.0)
+    refreshes = []
+    monkeypatch.setattr(store, "refresh", lambda: refreshes.append(1))
+
+    for _ in range(5):
+        assert store.read_session("missing") == []
+    assert refreshes == []
+
+
+def test_compaction_merges_old_segments_per_session(tmp_path):
+    store = SegmentStore(str(tmp_path), max_bytes=300)
+    for n in range(20):
+        for session_id in ("a", "b"):
+            _append(store, session_id, n, ts=float(n))
+    store.close()
+    before = len(_segments(tmp_path))
+
+    summary = compact_segments(str(tmp_path), min_age_seconds=0)
+
+    assert summary["segments_in"] == before
+    assert len(_segments(tmp_path)) == 1
+    reader = SegmentStore(str(tmp_path))
+    assert [r["n"] for r in reader.read_session("a")] == list(range(20))
+    # One contiguous run per session after compaction.
+    (name,) = reader._index["b"]
+    entry = reader._load_entry(name, "b")
+    assert entry["offsets"][-1] - entry["offsets"][0] + entry["lengths"][-1] == sum(entry["lengths"])
+
+    # A long-lived reader holding the pre-compaction index re-reads it.
+    assert [r["n"] for r in store.read_session("b")] == list(range(20))
+
+
+def test_writer_appends_to_shared_store(tmp_path):
+    store = SegmentStore(str(tmp_path))
+    io = TranscriptIO(flush_records=4, flush_interval=0.01)
+
+    async def scenario():
+        writers = [TranscriptWriter(f"s{i}", str(tmp_path), io=io, store=store) for i in range(5)]
+        for n in range(10):
+            for writer in writers:
+                await writer.write({"session_id": writer.session_id, "n": n})
+        await asyncio.gather(*(writer.close() for writer in writers))
+
+    asyncio.run(scenario())
+
+    assert len(_segments(tmp_path)) == 1
+    assert [r["n"] for r in store.read_session("s3")] == list(range(10))
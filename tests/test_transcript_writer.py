@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from saletech.transcriber.writer import TranscriptIO, TranscriptWriter
+from saletech.utils.errors import AudioProcessingError
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_close_drains_every_record_in_order(tmp_path):
+    io = TranscriptIO(flush_records=8, flush_interval=10.0, fsync="close")
+
+    async def scenario():
+        writers = [TranscriptWriter(f"s{i}", str(tmp_path), io=io, layout="files") for i in range(3)]
+        for n in range(50):
+            for writer in writers:
+                await writer.write({"session_id": writer.session_id, "n": n, "text": "héllo"})
+        await asyncio.gather(*(writer.close() for writer in writers))
+        return writers
+
+    writers = asyncio.run(scenario())
+
+    for writer in writers:
+        records = _lines(writer.file_path)
+        assert [r["n"] for r in records] == list(range(50))
+        assert records[0]["text"] == "héllo"
+    assert io.records_written == 150
+    assert io.fsyncs == 3
+    # Group commit: far fewer flushes than records.
+    assert io.commits < 40
+
+
+def test_flush_interval_commits_without_close(tmp_path):
+    io = TranscriptIO(flush_records=1000, flush_interval=0.02)
+
+    async def scenario():
+        writer = TranscriptWriter("s", str(tmp_path), io=io, layout="files")
+        await writer.write({"n": 1})
+        await asyncio.sleep(0.2)
+        records = _lines(writer.file_path)
+        await writer.close()
+        return records
+
+    assert asyncio.run(scenario()) == [{"n": 1}]
+
+
+class _SlowFile:
+    """File stand-in whose writes block until released (a stalled disk)."""
+
+    def __init__(self, real):
+        self.real = real
+        self.gate = threading.Event()
+        self.closed = False
+
+    def write(self, data):
+        self.gate.wait()
+        return self.real.write(data)
+
+    def flush(self):
+        self.real.flush()
+
+    def fileno(self):
+        return self.real.fileno()
+
+    def close(self):
+        self.closed = True
+        self.real.close()
+
+
+def test_write_applies_backpressure_when_disk_is_slow(tmp_path):
+    io = TranscriptIO(flush_records=1, flush_interval=0.01)
+
+    async def scenario():
+        writer = TranscriptWriter("s", str(tmp_path), io=io, max_pending=2, layout="files")
+        slow = writer._file = _SlowFile(writer._file)
+
+        await writer.write({"n": 0})
+        await writer.write({"n": 1})
+        blocked = asyncio.create_task(writer.write({"n": 2}))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+
+        slow.gate.set()
+        await asyncio.wait_for(blocked, 1.0)
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert [r["n"] for r in _lines(writer.file_path)] == [0, 1, 2]
+
+
+def test_write_after_close_is_rejected(tmp_path):
+    async def scenario():
+        writer = TranscriptWriter("s", str(tmp_path), io=TranscriptIO())
+        await writer.close()
+        with pytest.raises(AudioProcessingError):
+            await writer.write({"n": 1})
+
+    asyncio.run(scenario())
+
+
+class _GateSink:
+    """Columnar sink stand-in that holds the I/O thread until opened."""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+
+    def add(self, record):
+        self.entered.set()
+        self.gate.wait(5)
+
+    def deadline(self):
+        return None
+
+    def maybe_flush(self):
+        pass
+
+
+def test_cancelled_flush_does_not_stop_the_io_thread(tmp_path):
+    sink = _GateSink()
+    io = TranscriptIO(sink=sink)
+
+    async def scenario():
+        first = TranscriptWriter("a", str(tmp_path), io=io, layout="files")
+        await first.write({"n": 0})
+        assert await asyncio.to_thread(sink.entered.wait, 5)
+
+        # The barrier is queued behind the held write, then its waiter goes away.
+        pending = asyncio.create_task(first.flush())
+        await asyncio.sleep(0.05)
+        pending.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+
+        # Another session's records are queued right behind the dead barrier.
+        second = TranscriptWriter("b", str(tmp_path), io=io, layout="files", max_pending=1)
+        await second.write({"n": 0})
+        blocked = asyncio.create_task(second.write({"n": 1}))
+        await asyncio.sleep(0.05)
+        sink.gate.set()
+
+        await asyncio.wait_for(blocked, timeout=5)
+        await asyncio.wait_for(second.write({"n": 2}), timeout=5)
+        await asyncio.wait_for(second.close(), timeout=5)
+        await asyncio.wait_for(first.close(), timeout=5)
+        return second.file_path
+
+    path = asyncio.run(scenario())
+
+    assert io._thread.is_alive()
+    assert [r["n"] for r in _lines(path)] == [0, 1, 2]
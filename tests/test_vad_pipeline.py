@@ -1,7 +1,7 @@
 import pytest
 import pytest_asyncio
 import numpy as np
-from src.saletech.services.vad_adv_service import VADService
+from saletech.services.vad_adv_service import VADService
 
 @pytest.mark.asyncio
 async def test_vad_service_smoke():
@@ -0,0 +1,172 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from config.settings import settings
+from saletech.core.session import VoiceSession
+from saletech.core.stages import stage_totals
+from saletech.media.buffer.frame_chunking import AudioIngressBuffer
+from saletech.models.schemas import MessageRole, SessionState
+
+FRAME = 320  # 20ms at 16kHz
+SPEECH = np.full(FRAME, 0.5 * 32767).astype(np.int16).tobytes()
+SILENCE = np.zeros(FRAME, dtype=np.int16).tobytes()
+
+
+class _LoudnessVAD:
+    """Speech while the frame is loud; the first quiet frame after speech ends the turn."""
+
+    def __init__(self):
+        self.in_speech = False
+        self.utterance = 0
+        self.speech_frames_at = {}  # utterance -> times its frames went through VAD
+
+    def detect_speech(self, audio):
+        loud = float(np.abs(audio).max()) > 0.1
+        if loud:
+            if not self.in_speech:
+                self.utterance += 1
+            self.in_speech = True
+            self.speech_frames_at.setdefault(self.utterance, []).append(time.perf_counter())
+            return True, 0.9, False, {}
+        end_of_turn, self.in_speech = self.in_speech, False
+        return False, 0.1, end_of_turn, {}
+
+
+class _Transcript:
+    def __init__(self, text):
+        self.text = text
+        self.confidence = 0.9
+
+
+class _SlowASR:
+    def __init__(self):
+        self.calls = []  # (start, end)
+
+    async def transcribe(self, audio, session_id=None, language=None):
+        start = time.perf_counter()
+        await asyncio.sleep(0.1)
+        self.calls.append((start, time.perf_counter()))
+        return _Transcript(f"question {len(self.calls)}")
+
+
+class _EchoLLM:
+    async def generate_sentences(self, session_id, conversation_history, customer_name=None):
+        question = conversation_history[-1].content
+        for chunk in (f"About {question}.", "Anything else?"):
+            await asyncio.sleep(0)
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_stages_overlap_and_reply_in_order(monkeypatch):
+    monkeypatch.setattr(settings, "barge_in_enabled", False)
+    vad, asr = _LoudnessVAD(), _SlowASR()
+    session = VoiceSession("staged-session")
+    session._vad_service, session._asr_service, session._llm_service = vad, asr, _EchoLLM()
+
+    spoken = []
+
+    async def on_output(chunk):
+        spoken.append(chunk)
+
+    ingress = AudioIngressBuffer()
+    await session.start(ingress, on_output=on_output)
+
+    for _ in range(2):
+        for frame in [SPEECH] * 15 + [SILENCE] * 2:
+            ingress.put_nowait(frame)
+            await asyncio.sleep(0.005)  # frames arrive in real time, not all at once
+    await session.stop()
+
+    # VAD kept consuming utterance 2 while utterance 1 was being transcribed.
+    asr_start, asr_end = asr.calls[0]
+    assert any(asr_start < t < asr_end for t in vad.speech_frames_at[2])
+
+    assert spoken == ["About question 1.", "Anything else?", "About question 2.", "Anything else?"]
+    assert [(m.role, m.content) for m in session.conversation] == [
+        (MessageRole.USER, "question 1"),
+        (MessageRole.ASSISTANT, "About question 1. Anything else?"),
+        (MessageRole.USER, "question 2"),
+        (MessageRole.ASSISTANT, "About question 2. Anything else?"),
+    ]
+    assert session.state == SessionState.LISTENING
+    assert session.tracer.metrics.total_utterances == 2
+    assert stage_totals()["asr"]["items"] >= 2
+    await session.close()
+
+
+class _RamblingLLM:
+    """Twenty sentences per reply, until cancelled; records cache truncation."""
+
+    def __init__(self):
+        self.cancelled = False
+        self.truncated = []
+
+    async def generate_sentences(self, session_id, conversation_history, customer_name=None):
+        self.cancelled = False
+        for n in range(20):
+            if self.cancelled:
+                return
+            await asyncio.sleep(0.005)
+            yield f"Point {n}."
+
+    def cancel_generation(self, session_id):
+        self.cancelled = True
+        return True
+
+    def truncate_session_cache(self, session_id, spoken_text):
+        self.truncated.append(spoken_text)
+        return 1
+
+
+async def _feed(ingress, frames):
+    for frame in frames:
+        ingress.put_nowait(frame)
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_barge_in_silences_reply_and_keeps_only_what_was_spoken(monkeypatch):
+    monkeypatch.setattr(settings, "barge_in_grace_period_ms", 0)
+    monkeypatch.setattr(settings, "barge_in_delay_ms", 100)
+    llm = _RamblingLLM()
+    session = VoiceSession("barge-in-session")
+    session._vad_service, session._asr_service, session._llm_service = _LoudnessVAD(), _SlowASR(), llm
+
+    spoken = []
+
+    async def on_output(chunk):
+        await asyncio.sleep(0.02)  # synthesis + playback
+        spoken.append(chunk)
+
+    states = []
+    session.on_state = lambda s: states.append(s.state)
+
+    ingress = AudioIngressBuffer()
+    await session.start(ingress, on_output=on_output)
+
+    await _feed(ingress, [SPEECH] * 15 + [SILENCE] * 2)
+    while len(spoken) < 3:
+        await asyncio.sleep(0.005)
+    await _feed(ingress, [SPEECH] * 15 + [SILENCE] * 2)  # caller talks over the reply
+    await session.stop()
+
+    first_reply = session.conversation[1]
+    assert first_reply.role == MessageRole.ASSISTANT
+    assert llm.truncated == [first_reply.content]
+    # History holds exactly what was played; nothing of the reply played after the cut.
+    cut = spoken.index("Point 0.", 1)
+    assert 3 <= cut < 20
+    assert first_reply.content == " ".join(spoken[:cut])
+
+    # Back to listening once the cut reply is trimmed, before the next turn.
+    interrupted = states.index(SessionState.INTERUPTED)
+    assert states[interrupted + 1] == SessionState.LISTENING
+
+    assert session.metrics.interruptions == 1
+    assert session.metrics.barge_in_latencies_ms.count == 1
+    assert session.metrics.get_latency_percentile("barge_in", 50) < settings.barge_in_target_ms
+    await session.close()